@@ -2,10 +2,10 @@ import os
 
 from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
-from channels.auth import AuthMiddlewareStack
 from channels.security.websocket import AllowedHostsOriginValidator
 
 import chat_module.routing
+from chat_module.middleware import CachedAuthMiddlewareStack
 
 
 try:
@@ -22,7 +22,7 @@ django_asgi_app = get_asgi_application()
 application = ProtocolTypeRouter({
     'http': django_asgi_app,
     'websocket': AllowedHostsOriginValidator(
-        AuthMiddlewareStack(
+        CachedAuthMiddlewareStack(
             URLRouter([
                 *chat_module.routing.websocket_urlpatterns,
             ])
@@ -20,7 +20,6 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'channels',
-    'django_render_partial',
     'home_module',
     'account_module',
     'product_module',
@@ -122,6 +121,39 @@ MEDIA_URL = '/medias/'
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Cache Configuration
+# 'default' is shared by every process: Redis when REDIS_URL is set,
+# process-local memory otherwise (development only). 'tiered' puts a small
+# per-process LRU in front of it for cached queries and fragments; see
+# home_module.utils.tiered_cache and home_module.services.query_cache.
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    SHARED_CACHE = {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': REDIS_URL,
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+        },
+    }
+else:
+    SHARED_CACHE = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+
+CACHES = {
+    'default': SHARED_CACHE,
+    'tiered': {
+        'BACKEND': 'home_module.utils.tiered_cache.TieredCache',
+        'LOCATION': 'default',
+        'TIMEOUT': 60 * 10,
+        'OPTIONS': {
+            'LOCAL_MAX_ENTRIES': 1000,
+            'LOCAL_TIMEOUT': 5,
+        },
+    },
+}
+
 # Email Configuration
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
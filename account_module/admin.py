@@ -1,9 +1,12 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.db import transaction
 from django.utils.translation import gettext_lazy as _
 from django.utils.html import format_html
+from django.utils import timezone
 
-from .models import User
+from .models import OutgoingEmail, User
+from .services.user_cache import CachedUserLoader
 
 
 @admin.register(User)
@@ -102,14 +105,69 @@ class CustomUserAdmin(UserAdmin):
 
     get_avatar.short_description = _('Avatar')
     
+    @staticmethod
+    def invalidate_cached_users(queryset):
+        # update() sends no post_save, which is what normally moves
+        # CachedUserLoader to a new version.
+        user_ids = list(queryset.values_list('pk', flat=True))
+        transaction.on_commit(
+            lambda: [CachedUserLoader.invalidate(user_id) for user_id in user_ids]
+        )
+
     def activate_users(self, request, queryset):
+        self.invalidate_cached_users(queryset)
         updated = queryset.update(is_active=True)
         self.message_user(request, '{} users activated.'.format(updated))
 
     activate_users.short_description = _('Activate selected users')
     
     def verify_emails(self, request, queryset):
+        self.invalidate_cached_users(queryset)
         updated = queryset.update(is_email_verified=True)
         self.message_user(request, '{} emails verified.'.format(updated))
 
-    verify_emails.short_description = _('Verify selected emails')
\ No newline at end of file
+    verify_emails.short_description = _('Verify selected emails')
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+
+    list_display = (
+        'subject',
+        'to',
+        'status',
+        'attempts',
+        'created_at',
+        'sent_at'
+    )
+
+    list_filter = (
+        'status',
+        'created_at'
+    )
+
+    search_fields = (
+        'subject',
+        'to'
+    )
+
+    ordering = ('-created_at',)
+
+    readonly_fields = (
+        'attempts',
+        'last_error',
+        'created_at',
+        'sent_at'
+    )
+
+    actions = ['retry_emails']
+
+    def retry_emails(self, request, queryset):
+        updated = queryset.exclude(status=OutgoingEmail.SENT).update(
+            status=OutgoingEmail.PENDING,
+            attempts=0,
+            next_attempt_at=timezone.now()
+        )
+        self.message_user(request, '{} emails queued for another attempt.'.format(updated))
+
+    retry_emails.short_description = _('Retry selected emails')
@@ -5,3 +5,6 @@ class AccountModuleConfig(AppConfig):
 
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'account_module'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -2,9 +2,12 @@ from typing import Any
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
 from django.contrib.auth.base_user import AbstractBaseUser
-from django.db.models import Q
+from django.db.models import Value
+from django.db.models.functions import Lower
 from django.contrib.auth.hashers import make_password
 
+from .services.user_cache import CachedUserLoader
+
 
 User = get_user_model()
 
@@ -20,22 +23,48 @@ class EmailOrUsernameBackend(ModelBackend):
         if username is None or password is None:
             return None
 
+        user = self.find_user(username)
+        if user is None:
+            # Run the password hasher once to prevent timing attacks
+            make_password(password)
+            return None
+
+        if user.check_password(password):
+            return user
+
+        return None
+
+    @staticmethod
+    def lookup_queryset(field, identifier):
+        # Compares lower(field) with lower(identifier), which is exactly the
+        # expression of the functional indexes on User, so the lookup is an
+        # index probe. (iexact compiles to UPPER() on PostgreSQL and would
+        # not use them.)
+        return User.objects.alias(
+            identifier_key=Lower(field)
+        ).filter(identifier_key=Lower(Value(identifier)))
+
+    @classmethod
+    def lookup(cls, field, identifier):
         try:
-            user = User.objects.get(
-                Q(email__iexact=username) | Q(username__iexact=username)
-            )
+            return cls.lookup_queryset(field, identifier).get()
+        except (User.DoesNotExist, User.MultipleObjectsReturned):
+            return None
 
-            if user.check_password(password):
+    @classmethod
+    def find_user(cls, identifier):
+        '''
+        Finds the user for a login identifier with a single index lookup:
+        by email if it looks like one, by username otherwise. Usernames may
+        contain "@" too, so a missed email lookup falls back to them.
+        '''
+        if '@' in identifier:
+            user = cls.lookup('email', identifier)
+            if user is not None:
                 return user
 
-        except User.DoesNotExist:
-            # Run the password hasher once to prevent timing attacks
-            make_password(password)
+        return cls.lookup('username', identifier)
 
-        return None
-    
     def get_user(self, user_id: int):
-        try:
-            return User.objects.get(pk=user_id)
-        except User.DoesNotExist:
-            return None
\ No newline at end of file
+        # Runs on every authenticated request and WebSocket connect.
+        return CachedUserLoader.get(user_id)
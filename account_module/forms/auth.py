@@ -5,8 +5,10 @@ from django.contrib.auth.forms import (
     PasswordResetForm,
     SetPasswordForm
 )
+from django.template import loader
 from django.utils.translation import gettext_lazy as _
 
+from ..services.email_outbox import EmailOutbox
 from .validators import StrongPasswordValidator
 
 
@@ -63,6 +65,24 @@ class CustomPasswordResetForm(PasswordResetForm):
         )
     )
 
+    def send_mail(self, subject_template_name, email_template_name, context,
+                  from_email, to_email, html_email_template_name=None):
+        # Rendered here like PasswordResetForm does, but queued in the
+        # outbox instead of sent during the request.
+        subject = ''.join(loader.render_to_string(subject_template_name, context).splitlines())
+        body = loader.render_to_string(email_template_name, context)
+        html_body = None
+        if html_email_template_name is not None:
+            html_body = loader.render_to_string(html_email_template_name, context)
+
+        EmailOutbox.enqueue(
+            subject=subject,
+            message=body,
+            from_email=from_email,
+            recipient_list=[to_email],
+            html_message=html_body,
+        )
+
 
 class CustomSetPasswordForm(SetPasswordForm):
 
@@ -0,0 +1,139 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+
+from account_module.backends import EmailOrUsernameBackend
+
+
+User = get_user_model()
+
+BENCH_DOMAIN = 'bench.invalid'
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a large users table and compare the old OR/iexact login lookup '
+        'with the indexed lookup of EmailOrUsernameBackend'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=1_000_000,
+            help='Number of benchmark users to seed (default: 1,000,000)',
+        )
+        parser.add_argument(
+            '--lookups',
+            type=int,
+            default=500,
+            help='Login lookups timed per strategy (default: 500)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Users inserted per query while seeding (default: 10000)',
+        )
+        parser.add_argument(
+            '--cleanup',
+            action='store_true',
+            help='Delete the benchmark users instead of benchmarking',
+        )
+
+    def handle(self, *args, **options):
+        if options['cleanup']:
+            deleted, _ = User.objects.filter(
+                email__endswith='@{}'.format(BENCH_DOMAIN)
+            ).delete()
+            self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} rows.'))
+            return
+
+        self.seed(options['users'], options['batch_size'])
+        identifiers = self.sample_identifiers(options['users'], options['lookups'])
+
+        strategies = [
+            ('OR of iexact (before)', self.old_lookup),
+            ('lower() index (after)', EmailOrUsernameBackend.find_user),
+        ]
+        for name, lookup in strategies:
+            timings = []
+            for identifier in identifiers:
+                started = time.perf_counter()
+                lookup(identifier)
+                timings.append((time.perf_counter() - started) * 1000)
+
+            timings.sort()
+            self.stdout.write(
+                f'{name}: mean {statistics.mean(timings):.3f} ms, '
+                f'p50 {timings[len(timings) // 2]:.3f} ms, '
+                f'p95 {timings[int(len(timings) * 0.95)]:.3f} ms'
+            )
+
+        self.stdout.write('\nQuery plans for an email identifier:')
+        email = identifiers[0]
+        self.stdout.write('before:\n' + self.old_queryset(email).explain())
+        self.stdout.write(
+            'after:\n' + EmailOrUsernameBackend.lookup_queryset('email', email).explain()
+        )
+
+    def seed(self, total, batch_size):
+        existing = User.objects.filter(
+            email__endswith='@{}'.format(BENCH_DOMAIN)
+        ).count()
+        if existing >= total:
+            self.stdout.write(f'Using {existing} existing benchmark users.')
+            return
+
+        # Hashing once keeps seeding fast; nobody logs in as these users.
+        password = make_password(None)
+        self.stdout.write(f'Seeding {total - existing} benchmark users...')
+        for start in range(existing, total, batch_size):
+            User.objects.bulk_create(
+                [
+                    User(
+                        email='user{}@{}'.format(number, BENCH_DOMAIN),
+                        username='Bench_User_{}'.format(number),
+                        password=password,
+                        phone_number='',
+                    )
+                    for number in range(start, min(start + batch_size, total))
+                ],
+                batch_size=batch_size
+            )
+            self.stdout.write(f'  {min(start + batch_size, total)}/{total}')
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE {}'.format(connection.ops.quote_name(User._meta.db_table)))
+
+    @staticmethod
+    def sample_identifiers(total, count):
+        '''Mixed-case emails and usernames, plus a share of unknown ones.'''
+        rng = random.Random(42)
+        identifiers = []
+        for _ in range(count):
+            number = rng.randrange(total)
+            kind = rng.random()
+            if kind < 0.45:
+                identifiers.append('User{}@{}'.format(number, BENCH_DOMAIN.upper()))
+            elif kind < 0.9:
+                identifiers.append('bench_user_{}'.format(number))
+            else:
+                identifiers.append('missing{}@{}'.format(number, BENCH_DOMAIN))
+        return identifiers
+
+    @staticmethod
+    def old_queryset(identifier):
+        return User.objects.filter(
+            Q(email__iexact=identifier) | Q(username__iexact=identifier)
+        )
+
+    @classmethod
+    def old_lookup(cls, identifier):
+        return list(cls.old_queryset(identifier)[:2])
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from account_module.utils.repository import EmailVerificationRepository
+
+
+class Command(BaseCommand):
+    help = 'Delete expired email verification tokens'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Tokens deleted per query (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        deleted = EmailVerificationRepository.purge_expired(options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Deleted {deleted} expired verification tokens.')
+        )
@@ -0,0 +1,75 @@
+import logging
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from account_module.services.email_outbox import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Send queued transactional emails from the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and send new emails as they are queued',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=5,
+            help='Sleep between checks in --loop mode, in seconds (default: 5)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Emails claimed and sent per batch (default: 100)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            self.send_due(options['batch_size'])
+            if not options['loop']:
+                return
+
+            close_old_connections()
+            time.sleep(options['interval'])
+
+    def send_due(self, batch_size):
+        # Only talk to the mail server when there is something to send.
+        if not EmailOutbox.due().exists():
+            return
+
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as e:
+            logger.error('Could not connect to the mail server: {}'.format(e))
+            return
+
+        totals = {'sent': 0, 'retried': 0, 'failed': 0}
+        started = time.monotonic()
+        try:
+            while True:
+                result = EmailOutbox.send_batch(connection, batch_size)
+                for outcome, count in result.items():
+                    totals[outcome] += count
+                if sum(result.values()) < batch_size:
+                    break
+        finally:
+            connection.close()
+
+        elapsed = time.monotonic() - started
+        summary = '{sent} sent, {retried} to retry, {failed} failed'.format(**totals)
+        logger.info(
+            'Outbox: {} in {:.2f}s ({:.1f} emails/s)'.format(
+                summary, elapsed, totals['sent'] / elapsed if elapsed else 0
+            )
+        )
+        self.stdout.write(self.style.SUCCESS(f'Outbox: {summary}.'))
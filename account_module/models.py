@@ -1,9 +1,11 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import (
     AbstractBaseUser,
     PermissionsMixin,
     BaseUserManager
 )
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 
@@ -135,6 +137,11 @@ class User(AbstractBaseUser, PermissionsMixin):
     class Meta:
         verbose_name = 'User'
         verbose_name_plural = 'Users'
+        indexes = [
+            # Case-insensitive login lookups; see EmailOrUsernameBackend.
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+            models.Index(Lower('username'), name='user_username_lower_idx'),
+        ]
 
     def __str__(self) -> str:
         return self.email
@@ -185,4 +192,111 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     def can_login(self):
         # Checks if the user has an active and verified account.
-        return self.is_active and self.is_email_verified
\ No newline at end of file
+        return self.is_active and self.is_email_verified
+
+
+class EmailVerificationToken(models.Model):
+    # An email verification link's token, shared by every worker process.
+    # Expired rows are removed by the purge_verification_tokens command.
+    token = models.CharField(
+        _('Token'),
+        max_length=64,
+        unique=True
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='verification_tokens',
+        verbose_name=_('User')
+    )
+    attempts = models.PositiveSmallIntegerField(
+        _('Attempts'),
+        default=0
+    )
+    created_at = models.DateTimeField(
+        _('Created at'),
+        default=timezone.now
+    )
+    expires_at = models.DateTimeField(
+        _('Expires at'),
+        db_index=True
+    )
+
+    class Meta:
+        verbose_name = 'Email Verification Token'
+        verbose_name_plural = 'Email Verification Tokens'
+
+    def __str__(self) -> str:
+        return '{} ({})'.format(self.token, self.user_id)
+
+
+class OutgoingEmail(models.Model):
+    # A transactional email waiting in the outbox. Requests only insert
+    # rows (see EmailOutbox.enqueue); the send_outbox command delivers them.
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (PENDING, _('Pending')),
+        (SENT, _('Sent')),
+        (FAILED, _('Failed')),
+    ]
+
+    subject = models.CharField(
+        _('Subject'),
+        max_length=255
+    )
+    body = models.TextField(
+        _('Body')
+    )
+    html_body = models.TextField(
+        _('HTML body'),
+        blank=True
+    )
+    from_email = models.CharField(
+        _('From'),
+        max_length=254
+    )
+    to = models.JSONField(
+        _('Recipients'),
+        default=list
+    )
+    status = models.CharField(
+        _('Status'),
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(
+        _('Attempts'),
+        default=0
+    )
+    next_attempt_at = models.DateTimeField(
+        _('Next attempt at'),
+        default=timezone.now
+    )
+    last_error = models.TextField(
+        _('Last error'),
+        blank=True
+    )
+    created_at = models.DateTimeField(
+        _('Created at'),
+        auto_now_add=True
+    )
+    sent_at = models.DateTimeField(
+        _('Sent at'),
+        blank=True,
+        null=True
+    )
+
+    class Meta:
+        verbose_name = 'Outgoing Email'
+        verbose_name_plural = 'Outgoing Emails'
+        indexes = [
+            # The worker's "what is due" query.
+            models.Index(fields=['status', 'next_attempt_at'], name='outgoing_email_due_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return '{} -> {}'.format(self.subject, ', '.join(self.to))
@@ -2,12 +2,13 @@ import logging
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
+from django.db import transaction
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from ..utils.verification_code_generator import VerificationCodeGenerator
+from .email_outbox import EmailOutbox
 from .email_verification import EmailVerificationService
 
 logger = logging.getLogger(__name__)
@@ -27,28 +28,29 @@ class EmailChangeService:
     def initiate_email_change(cls, request, user, new_email):
         """
         Starts the email change process.
-        It generates and sends a 6-digit code to the user's current email.
+        It generates a 6-digit code and queues it for the user's current email.
         """
         try:
             old_email_code = VerificationCodeGenerator.generate_6_digit_code()
 
-            # Store the verification data on the user model.
-            user.old_email_verification_code = old_email_code
-            user.pending_email = new_email
-            user.old_email_verified = False
-            user.email_change_initiated_at = timezone.now()
-            user.is_email_verified = False
-            user.save(
-                update_fields=[
-                    'old_email_verification_code',
-                    'pending_email',
-                    'old_email_verified',
-                    'email_change_initiated_at',
-                    'is_email_verified'
-                ]
-            )
+            with transaction.atomic():
+                # Store the verification data on the user model.
+                user.old_email_verification_code = old_email_code
+                user.pending_email = new_email
+                user.old_email_verified = False
+                user.email_change_initiated_at = timezone.now()
+                user.is_email_verified = False
+                user.save(
+                    update_fields=[
+                        'old_email_verification_code',
+                        'pending_email',
+                        'old_email_verified',
+                        'email_change_initiated_at',
+                        'is_email_verified'
+                    ]
+                )
 
-            cls._send_old_email_verification(user, old_email_code)
+                cls._send_old_email_verification(user, old_email_code)
 
             logger.info(
                 'Email change initiated for user {}: {} -> {}'.format(
@@ -67,7 +69,7 @@ class EmailChangeService:
 
     @classmethod
     def _send_old_email_verification(cls, user, code):
-        """Sends the 6-digit verification code to the user's current email."""
+        """Queues the 6-digit verification code for the user's current email."""
         subject = _('Verify Email Change Request')
         message = _(
             'Hello {username}!\n\n'
@@ -82,15 +84,14 @@ class EmailChangeService:
             site_name=getattr(settings, 'SITE_NAME', 'Plant Shop')
         )
 
-        send_mail(
+        EmailOutbox.enqueue(
             subject=subject,
             message=message,
             from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@example.com'),
             recipient_list=[user.email],
-            fail_silently=False,
         )
 
-        logger.info('Old email verification code sent to {}'.format(user.email))
+        logger.info('Old email verification code queued for {}'.format(user.email))
 
     @classmethod
     def verify_old_email(cls, user, code):
@@ -0,0 +1,140 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+
+class EmailOutbox:
+    """
+    A database-backed outbox for transactional email.
+
+    Requests call enqueue() instead of send_mail(), which only inserts a row,
+    so it commits or rolls back together with whatever the request changed
+    and never waits on the mail server. The send_outbox command claims due
+    rows in batches and sends them over one reused connection. Failed sends
+    are retried with exponential backoff until MAX_ATTEMPTS.
+    """
+    MAX_ATTEMPTS = 6
+    BACKOFF_BASE = timedelta(seconds=30)
+    BACKOFF_MAX = timedelta(hours=2)
+
+    # Claimed rows are pushed this far into the future, so a worker that
+    # dies mid-batch only delays its emails instead of losing them.
+    CLAIM_TIMEOUT = timedelta(minutes=5)
+
+    @classmethod
+    def enqueue(cls, subject, message, recipient_list, from_email=None, html_message=None):
+        """
+        Queues an email; takes the same arguments as send_mail().
+        """
+        return OutgoingEmail.objects.create(
+            subject=str(subject),
+            body=str(message),
+            html_body=html_message or '',
+            from_email=from_email or getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@example.com'),
+            to=list(recipient_list),
+        )
+
+    @classmethod
+    def due(cls):
+        return OutgoingEmail.objects.filter(
+            status=OutgoingEmail.PENDING,
+            next_attempt_at__lte=timezone.now()
+        )
+
+    @classmethod
+    def claim(cls, batch_size):
+        """
+        Reserves up to `batch_size` due emails for this worker.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            emails = list(
+                cls.due().select_for_update(skip_locked=True).order_by('next_attempt_at')[:batch_size]
+            )
+            if emails:
+                OutgoingEmail.objects.filter(
+                    pk__in=[email.pk for email in emails]
+                ).update(next_attempt_at=now + cls.CLAIM_TIMEOUT)
+        return emails
+
+    @classmethod
+    def backoff(cls, attempts):
+        return min(cls.BACKOFF_BASE * 2 ** (attempts - 1), cls.BACKOFF_MAX)
+
+    @classmethod
+    def _message(cls, email, connection):
+        message = EmailMultiAlternatives(
+            subject=email.subject,
+            body=email.body,
+            from_email=email.from_email,
+            to=email.to,
+            connection=connection,
+        )
+        if email.html_body:
+            message.attach_alternative(email.html_body, 'text/html')
+        return message
+
+    @classmethod
+    def _failed(cls, email, error):
+        """
+        Schedules a retry, or gives up after MAX_ATTEMPTS. Returns which.
+        """
+        attempts = email.attempts + 1
+        if attempts >= cls.MAX_ATTEMPTS:
+            outcome = 'failed'
+            changes = {'status': OutgoingEmail.FAILED}
+            logger.error('Giving up on email {} to {}: {}'.format(email.pk, email.to, error))
+        else:
+            outcome = 'retried'
+            changes = {'next_attempt_at': timezone.now() + cls.backoff(attempts)}
+            logger.warning('Email {} to {} failed, will retry: {}'.format(email.pk, email.to, error))
+
+        OutgoingEmail.objects.filter(pk=email.pk).update(
+            attempts=attempts,
+            last_error=str(error),
+            **changes
+        )
+        return outcome
+
+    @classmethod
+    def send_batch(cls, connection, batch_size=100):
+        """
+        Claims and sends one batch over an open mail connection.
+        Returns counts of 'sent', 'retried' and 'failed' emails.
+        """
+        result = {'sent': 0, 'retried': 0, 'failed': 0}
+        sent_ids = []
+
+        for email in cls.claim(batch_size):
+            try:
+                cls._message(email, connection).send()
+            except Exception as e:
+                result[cls._failed(email, e)] += 1
+                # The connection may be broken; later sends get a fresh one.
+                connection.close()
+                try:
+                    connection.open()
+                except Exception:
+                    pass
+            else:
+                sent_ids.append(email.pk)
+
+        if sent_ids:
+            OutgoingEmail.objects.filter(pk__in=sent_ids).update(
+                status=OutgoingEmail.SENT,
+                sent_at=timezone.now(),
+                attempts=F('attempts') + 1,
+                last_error=''
+            )
+            result['sent'] = len(sent_ids)
+
+        return result
@@ -2,7 +2,7 @@ import logging
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
+from django.db import transaction
 from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils.html import strip_tags
@@ -10,6 +10,7 @@ from django.utils.translation import gettext_lazy as _
 
 from ..utils.repository import EmailVerificationRepository
 from ..utils.token_generator import TokenGenerator
+from .email_outbox import EmailOutbox
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -25,7 +26,7 @@ class EmailVerificationService:
     @classmethod
     def send_verification_email(cls, request, user, target_email=None):
         """
-        Sends a verification email with a unique token.
+        Queues a verification email with a unique token.
         Can be used for both new user registration and email change confirmation.
 
         Args:
@@ -36,14 +37,10 @@ class EmailVerificationService:
                                          Defaults to None.
 
         Returns:
-            bool: True if the email was sent successfully, False otherwise.
+            bool: True if the email was queued successfully, False otherwise.
         """
         try:
             token = TokenGenerator.generate()
-            EmailVerificationRepository.store(user.id, token)
-
-            user.email_active_code = token
-            user.save(update_fields=['email_active_code'])
 
             email_to_send = target_email or user.email
             is_email_change = target_email is not None
@@ -78,15 +75,21 @@ class EmailVerificationService:
                 site_name=site_name
             )
 
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@example.com'),
-                recipient_list=[email_to_send],
-                fail_silently=False,
-            )
-
-            logger.info('Verification email sent successfully to {} for user {}'.format(email_to_send, user.id))
+            # The token and its email are saved together; the send_outbox
+            # command delivers the email.
+            with transaction.atomic():
+                EmailVerificationRepository.store(user.id, token)
+                user.email_active_code = token
+                user.save(update_fields=['email_active_code'])
+
+                EmailOutbox.enqueue(
+                    subject=subject,
+                    message=message,
+                    from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@example.com'),
+                    recipient_list=[email_to_send],
+                )
+
+            logger.info('Verification email queued for {} for user {}'.format(email_to_send, user.id))
             return True
 
         except Exception as e:
@@ -0,0 +1,84 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+
+User = get_user_model()
+
+
+class CachedUserLoader:
+    """
+    Loads the user behind an authenticated request from the cache.
+
+    AuthenticationMiddleware and the Channels auth middleware resolve the
+    session's user on every page view and WebSocket connect. Instead of a
+    full `User` row each time, only REQUEST_FIELDS are loaded (the rest,
+    such as verification codes and reset tokens, are deferred and fetched
+    on first access) and the instance is cached under its id and a version
+    stamp. Saving or deleting a user bumps the stamp (see
+    account_module.signals), so stale entries are never read again and
+    simply expire.
+    """
+    CACHE_PREFIX = 'user_'
+    VERSION_PREFIX = 'user_version_'
+    TIMEOUT = 60 * 30
+
+    # password is needed for the session auth hash check that runs on
+    # every request; the rest is what templates and permission checks use.
+    REQUEST_FIELDS = (
+        'id',
+        'email',
+        'username',
+        'avatar',
+        'password',
+        'is_active',
+        'is_staff',
+        'is_superuser',
+        'is_email_verified',
+        'last_login',
+    )
+
+    @classmethod
+    def _version_key(cls, user_id):
+        return '{}{}'.format(cls.VERSION_PREFIX, user_id)
+
+    @classmethod
+    def version(cls, user_id):
+        version = cache.get(cls._version_key(user_id))
+        if version is None:
+            # The stamp may have been evicted while instances cached under
+            # it are still there, so it must not start over at a number
+            # that was used before.
+            version = time.time_ns()
+            cache.add(cls._version_key(user_id), version, timeout=None)
+            version = cache.get(cls._version_key(user_id), version)
+        return version
+
+    @classmethod
+    def key(cls, user_id):
+        return '{}{}_{}'.format(cls.CACHE_PREFIX, user_id, cls.version(user_id))
+
+    @classmethod
+    def get(cls, user_id):
+        """
+        Returns the user with the given id, or None if there is none.
+        """
+        key = cls.key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = User.objects.only(*cls.REQUEST_FIELDS).filter(pk=user_id).first()
+            if user is not None:
+                cache.set(key, user, timeout=cls.TIMEOUT)
+        return user
+
+    @classmethod
+    def invalidate(cls, user_id):
+        """
+        Moves the user to a new version, orphaning the cached instance.
+        """
+        try:
+            cache.incr(cls._version_key(user_id))
+        except ValueError:
+            # No stamp: the next version() picks a new one anyway.
+            pass
@@ -0,0 +1,18 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .services.user_cache import CachedUserLoader
+
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    # After commit, so a concurrent request cannot cache the old row under
+    # the new version.
+    user_id = instance.pk
+    transaction.on_commit(lambda: CachedUserLoader.invalidate(user_id))
@@ -1,4 +1,39 @@
-from django.test import TestCase
+from datetime import timedelta
 
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.utils import timezone
 
-# No tests have been added yet. This is a good place to start!
+from .utils.quota import SlidingWindowQuota
+
+
+class SlidingWindowQuotaTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.actions = []
+        self.quota = SlidingWindowQuota(
+            'test',
+            limit=2,
+            window=timedelta(hours=1),
+            load=lambda user_id, since: [at for at in self.actions if at > since]
+        )
+
+    def act(self):
+        # Recorded after the action is stored, as on commit.
+        at = timezone.now()
+        self.actions.append(at)
+        self.quota.record(1, at)
+
+    def test_action_already_loaded_is_counted_once(self):
+        self.act()
+        self.assertTrue(self.quota.is_allowed(1))
+        self.act()
+        self.assertFalse(self.quota.is_allowed(1))
+
+    def test_reset_reloads_actions(self):
+        self.act()
+        self.act()
+        self.actions.pop()
+        self.quota.reset(1)
+        self.assertTrue(self.quota.is_allowed(1))
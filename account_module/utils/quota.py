@@ -0,0 +1,85 @@
+from django.core.cache import cache
+from django.utils import timezone
+
+
+class SlidingWindowQuota:
+    """
+    Allows each user at most `limit` actions in any sliding `window`.
+
+    The times of a user's recent actions are kept in a single cache entry,
+    so checking the quota is a cache read instead of a window query. When
+    the entry is missing (first check, eviction, reset) it is rebuilt from
+    `load(user_id, since)`, which returns the datetimes of the user's
+    actions after `since` from the source of truth; without a loader the
+    quota simply starts empty.
+
+    Callers either check and record separately (is_allowed, then record
+    once the action has happened) or use consume() to do both.
+    """
+    CACHE_PREFIX = 'quota_'
+
+    def __init__(self, name, limit, window, load=None):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.load = load
+
+    def _key(self, user_id):
+        return '{}{}_{}'.format(self.CACHE_PREFIX, self.name, user_id)
+
+    def _store(self, user_id, events):
+        # Only the newest `limit` actions can still block the next one.
+        cache.set(
+            self._key(user_id),
+            sorted(events)[-self.limit:],
+            timeout=int(self.window.total_seconds())
+        )
+
+    def _events(self, user_id, now):
+        since = now - self.window
+        events = cache.get(self._key(user_id))
+
+        if events is None:
+            events = list(self.load(user_id, since)) if self.load else []
+            self._store(user_id, events)
+
+        return [event for event in events if event > since]
+
+    def next_allowed_at(self, user_id):
+        """
+        Returns when the user may act again, or None if they may act now.
+        """
+        events = self._events(user_id, timezone.now())
+        if len(events) < self.limit:
+            return None
+        return sorted(events)[-self.limit] + self.window
+
+    def is_allowed(self, user_id):
+        return self.next_allowed_at(user_id) is None
+
+    def record(self, user_id, at=None):
+        """
+        Counts an action that has happened.
+        """
+        at = at or timezone.now()
+        events = self._events(user_id, timezone.now())
+        # Rebuilding a missing entry from load() can already include an
+        # action recorded after it was committed; count it once.
+        if at not in events:
+            events.append(at)
+        self._store(user_id, events)
+
+    def consume(self, user_id):
+        """
+        Records an action if the quota allows it. Returns whether it did.
+        """
+        if not self.is_allowed(user_id):
+            return False
+        self.record(user_id)
+        return True
+
+    def reset(self, user_id):
+        """
+        Drops the cached actions, so the next check reloads them.
+        """
+        cache.delete(self._key(user_id))
@@ -1,65 +1,83 @@
 from datetime import timedelta
 
-from django.core.cache import cache
+from django.db.models import F
 from django.utils import timezone
 
+from ..models import EmailVerificationToken
+
 
 class EmailVerificationRepository:
     """
-    A repository class that abstracts the caching mechanism for storing
-    email verification data. It provides a clean, centralized interface
-    for interacting with the cache for this specific purpose.
+    A repository class that abstracts the storage of email verification
+    data. It provides a clean, centralized interface for this specific
+    purpose.
+
+    Tokens live in the EmailVerificationToken table rather than the cache,
+    so a link issued by one worker process can be verified by any other,
+    and attempts are counted with a single atomic UPDATE. Expired rows are
+    ignored on read and deleted in batches by purge_expired().
     """
-    # Using the token as the cache key is a strategic choice.
-    # It allows us to retrieve the verification record with just the token,
-    # which is essential since the token is the only piece of information
-    # we'll have from the verification URL.
-    CACHE_PREFIX = 'email_verification_'
+    # The token is the lookup key, since it is the only piece of
+    # information we'll have from the verification URL.
     EXPIRY = timedelta(hours=24)
 
+    @classmethod
+    def _valid(cls, token):
+        return EmailVerificationToken.objects.filter(
+            token=token,
+            expires_at__gt=timezone.now()
+        )
+
     @classmethod
     def store(cls, user_id, token):
         """
-        Stores verification data in the cache.
+        Stores verification data, replacing the user's earlier tokens.
         """
-        key = '{}{}'.format(cls.CACHE_PREFIX, token)
-        cache.set(
-            key,
-            {
-                'user_id': user_id,
-                'created_at': timezone.now(),
-                'attempts': 0,
-            },
-            timeout=int(cls.EXPIRY.total_seconds())
+        now = timezone.now()
+        EmailVerificationToken.objects.filter(user_id=user_id).delete()
+        EmailVerificationToken.objects.create(
+            token=token,
+            user_id=user_id,
+            created_at=now,
+            expires_at=now + cls.EXPIRY
         )
 
     @classmethod
     def get(cls, token):
         """
-        Retrieves verification data from the cache.
+        Retrieves verification data, or None if the token is unknown or expired.
         """
-        key = '{}{}'.format(cls.CACHE_PREFIX, token)
-        return cache.get(key)
+        return cls._valid(token).values('user_id', 'created_at', 'attempts').first()
 
     @classmethod
     def delete(cls, token):
         """
-        Deletes verification data from the cache.
+        Deletes verification data.
         """
-        key = '{}{}'.format(cls.CACHE_PREFIX, token)
-        cache.delete(key)
+        EmailVerificationToken.objects.filter(token=token).delete()
 
     @classmethod
     def increment_attempts(cls, token):
         """
         Increments the attempt counter for a given verification token.
         """
-        key = '{}{}'.format(cls.CACHE_PREFIX, token)
-        data = cache.get(key)
+        if not cls._valid(token).update(attempts=F('attempts') + 1):
+            return 0
+        return cls._valid(token).values_list('attempts', flat=True).first() or 0
 
-        if data:
-            data['attempts'] += 1
-            cache.set(key, data, timeout=int(cls.EXPIRY.total_seconds()))
-            return data['attempts']
-
-        return 0 
\ No newline at end of file
+    @classmethod
+    def purge_expired(cls, batch_size=1000):
+        """
+        Deletes expired tokens in batches of `batch_size`, keeping each
+        DELETE short. Returns how many were deleted.
+        """
+        deleted = 0
+        while True:
+            expired_ids = list(
+                EmailVerificationToken.objects.filter(
+                    expires_at__lte=timezone.now()
+                ).values_list('pk', flat=True)[:batch_size]
+            )
+            if not expired_ids:
+                return deleted
+            deleted += EmailVerificationToken.objects.filter(pk__in=expired_ids).delete()[0]
@@ -1,9 +1,12 @@
 from django.contrib import admin
+from django.db import transaction
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from .models import Article, Comment, ArticleView
+from .models import ARTICLE_CREATION_QUOTA, Article, Comment
+from .services.comment_counter import ArticleCommentCounter
+from .services.publication import ArticlePublisher
 
 
 @admin.register(Article)
@@ -34,6 +37,8 @@ class ArticleAdmin(admin.ModelAdmin):
     }
     readonly_fields = [
         'view_count',
+        'unique_visitors',
+        'approved_comment_count',
         'created_at',
         'updated_at',
     ]
@@ -58,7 +63,7 @@ class ArticleAdmin(admin.ModelAdmin):
         ),
         (
             _('Statistics'), {
-                'fields': ('view_count', 'created_at', 'updated_at'),
+                'fields': ('view_count', 'unique_visitors', 'approved_comment_count', 'created_at', 'updated_at'),
                 'classes': ('collapse',)
             }
         )
@@ -81,20 +86,25 @@ class ArticleAdmin(admin.ModelAdmin):
     get_image.short_description = _('Image')
     
     def approve_articles(self, request, queryset):
-        updated = queryset.filter(status=Article.PENDING).update(status=Article.PUBLISHED)
-        self.message_user(request, f'{updated} articles approved and published.')
+        updated = ArticlePublisher.publish(queryset.filter(status=Article.PENDING))
+        self.message_user(request, f'{updated} articles approved and published or scheduled.')
 
     approve_articles.short_description = _('Approve and publish selected articles')
     
     def reject_articles(self, request, queryset):
-        updated = queryset.filter(status=Article.PENDING).update(status=Article.REJECTED)
+        rejected = queryset.filter(status=Article.PENDING)
+        author_ids = set(rejected.values_list('author_id', flat=True))
+        updated = rejected.update(status=Article.REJECTED)
+        # Rejected articles no longer count towards their author's quota.
+        for author_id in author_ids:
+            ARTICLE_CREATION_QUOTA.reset(author_id)
         self.message_user(request, f'{updated} articles rejected.')
 
     reject_articles.short_description = _('Reject selected articles')
     
     def publish_articles(self, request, queryset):
-        updated = queryset.update(status=Article.PUBLISHED)
-        self.message_user(request, f'{updated} articles published.')
+        updated = ArticlePublisher.publish(queryset)
+        self.message_user(request, f'{updated} articles published or scheduled.')
 
     publish_articles.short_description = _('Publish selected articles')
 
@@ -153,45 +163,30 @@ class CommentAdmin(admin.ModelAdmin):
 
     get_comment_preview.short_description = _('Comment')
     
+    def save_model(self, request, obj, form, change):
+        # Keep the article's approved comment counter in step with edits
+        # made through the change form.
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+
+            if not change:
+                if obj.is_approved:
+                    ArticleCommentCounter.adjust(obj.article_id, 1)
+            elif {'is_approved', 'article'} & set(form.changed_data):
+                if form.initial.get('is_approved'):
+                    ArticleCommentCounter.adjust(form.initial['article'], -1)
+                if obj.is_approved:
+                    ArticleCommentCounter.adjust(obj.article_id, 1)
+
     def approve_comments(self, request, queryset):
-        updated = queryset.update(is_approved=True)
+        updated = ArticleCommentCounter.set_approval(queryset, True)
         self.message_user(request, f'{updated} comments approved.')
 
     approve_comments.short_description = _('Approve selected comments')
     
     def disapprove_comments(self, request, queryset):
-        updated = queryset.update(is_approved=False)
+        updated = ArticleCommentCounter.set_approval(queryset, False)
         self.message_user(request, f'{updated} comments disapproved.')
 
     disapprove_comments.short_description = _('Disapprove selected comments')
 
-
-@admin.register(ArticleView)
-class ArticleViewAdmin(admin.ModelAdmin):
-    list_display = [
-        'article',
-        'ip_address',
-        'user',
-        'viewed_at',
-    ]
-    list_filter = [
-        'viewed_at',
-        'article',
-    ]
-    search_fields = [
-        'article__title',
-        'ip_address',
-        'user__email',
-    ]
-    readonly_fields = [
-        'article',
-        'ip_address',
-        'user',
-        'viewed_at',
-    ]
-
-    def has_add_permission(self, request):
-        return False
-
-    def has_change_permission(self, request, obj=None):
-        return False
\ No newline at end of file
@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from article_module.services.related_articles import RelatedArticles
+
+
+class Command(BaseCommand):
+    help = 'Recompute the content-similar related articles of every published article'
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        total = RelatedArticles.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Computed related articles for {total} articles '
+                f'in {time.monotonic() - started:.1f}s.'
+            )
+        )
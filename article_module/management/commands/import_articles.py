@@ -0,0 +1,321 @@
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from itertools import islice
+from urllib.request import urlopen
+
+from PIL import Image
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.text import Truncator
+
+from article_module.models import ARTICLE_CREATION_QUOTA, Article
+from article_module.services.article_cache import ArticleCache
+from article_module.services.article_search import ArticleInvertedIndex
+from article_module.services.related_articles import RelatedArticles
+from article_module.utils.slug_allocator import allocate_slugs
+
+
+User = get_user_model()
+
+MARKDOWN_EXTENSIONS = ('.md', '.markdown')
+IMAGE_MAX_SIZE = (1600, 1600)
+IMAGE_DOWNLOAD_TIMEOUT = 30
+
+
+def store_image(source, base_dir):
+    '''
+    Loads one featured image from a path or URL, checks that it is an image,
+    shrinks it to IMAGE_MAX_SIZE and saves it to the article image storage.
+    Runs on the image pool; returns the stored name.
+    '''
+    if source.startswith(('http://', 'https://')):
+        with urlopen(source, timeout=IMAGE_DOWNLOAD_TIMEOUT) as response:
+            data = response.read()
+    else:
+        with open(os.path.join(base_dir, source), 'rb') as image_file:
+            data = image_file.read()
+
+    with Image.open(BytesIO(data)) as image:
+        image.verify()
+
+    with Image.open(BytesIO(data)) as image:
+        if image.width > IMAGE_MAX_SIZE[0] or image.height > IMAGE_MAX_SIZE[1]:
+            image_format = image.format
+            image.thumbnail(IMAGE_MAX_SIZE)
+            if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+            buffer = BytesIO()
+            image.save(buffer, format=image_format, quality=85)
+            data = buffer.getvalue()
+
+    field = Article._meta.get_field('image')
+    name = field.generate_filename(None, os.path.basename(source.split('?')[0]))
+    return field.storage.save(name, ContentFile(data))
+
+
+class Command(BaseCommand):
+    help = 'Import articles from JSONL files or Markdown files (with optional front matter)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths',
+            nargs='+',
+            help='.jsonl files, Markdown files, or directories containing them',
+        )
+        parser.add_argument(
+            '--author',
+            required=True,
+            help='Email of the author for records that do not name one',
+        )
+        parser.add_argument(
+            '--status',
+            choices=[status for status, _ in Article.STATUS_CHOICES],
+            default=Article.PUBLISHED,
+            help='Status for records that do not set one (default: published)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Articles inserted per query (default: 500)',
+        )
+        parser.add_argument(
+            '--image-workers',
+            type=int,
+            default=8,
+            help='Featured images processed in parallel (default: 8)',
+        )
+        parser.add_argument(
+            '--skip-related',
+            action='store_true',
+            help='Do not recompute related articles after the import',
+        )
+
+    def handle(self, *args, **options):
+        default_author = User.objects.filter(email=options['author']).first()
+        if default_author is None:
+            raise CommandError(f'No user with email {options["author"]}.')
+
+        self.default_author = default_author
+        self.default_status = options['status']
+        self.authors = {default_author.email: default_author}
+        self.imported = 0
+        self.skipped = 0
+        self.author_ids = set()
+
+        records = (
+            record
+            for path in options['paths']
+            for record in self.read_path(path)
+        )
+
+        with ThreadPoolExecutor(
+            max_workers=options['image_workers'],
+            thread_name_prefix='article-import'
+        ) as image_pool:
+            while True:
+                batch = list(islice(records, options['batch_size']))
+                if not batch:
+                    break
+                self.import_batch(batch, image_pool)
+                self.stdout.write(f'  {self.imported} imported, {self.skipped} skipped')
+
+        # bulk_create sends no post_save signals, so do their work once here.
+        ArticleInvertedIndex.invalidate()
+        ArticleCache.invalidate()
+        for author_id in self.author_ids:
+            ARTICLE_CREATION_QUOTA.reset(author_id)
+        if self.imported and not options['skip_related']:
+            self.stdout.write('Recomputing related articles...')
+            RelatedArticles.rebuild()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Imported {self.imported} articles ({self.skipped} skipped).'
+            )
+        )
+
+    def read_path(self, path):
+        if os.path.isdir(path):
+            for directory, _, filenames in sorted(os.walk(path)):
+                for filename in sorted(filenames):
+                    if filename.endswith(('.jsonl', *MARKDOWN_EXTENSIONS)):
+                        yield from self.read_path(os.path.join(directory, filename))
+        elif path.endswith('.jsonl'):
+            yield from self.read_jsonl(path)
+        elif path.endswith(MARKDOWN_EXTENSIONS):
+            yield self.read_markdown(path)
+        else:
+            raise CommandError(f'Do not know how to import {path}.')
+
+    def read_jsonl(self, path):
+        base_dir = os.path.dirname(os.path.abspath(path))
+        with open(path, encoding='utf-8') as lines:
+            for line_number, line in enumerate(lines, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                source = f'{path}:{line_number}'
+                try:
+                    record = json.loads(line)
+                except ValueError as exc:
+                    self.skip(source, f'invalid JSON ({exc})')
+                    continue
+                if not isinstance(record, dict):
+                    self.skip(source, 'not a JSON object')
+                    continue
+                record['_source'] = source
+                record['_base_dir'] = base_dir
+                yield record
+
+    @staticmethod
+    def read_markdown(path):
+        '''
+        Reads one article from a Markdown file. Optional front matter between
+        "---" lines holds "key: value" pairs; the title falls back to the
+        first "# " heading and the summary to the first paragraph.
+        '''
+        with open(path, encoding='utf-8') as markdown_file:
+            text = markdown_file.read()
+
+        record = {}
+        front_matter = re.match(r'\A---\s*\n(.*?)\n---\s*\n', text, re.DOTALL)
+        if front_matter:
+            for line in front_matter.group(1).splitlines():
+                key, separator, value = line.partition(':')
+                if separator:
+                    record[key.strip()] = value.strip().strip('\'"')
+            text = text[front_matter.end():]
+
+        if 'title' not in record:
+            heading = re.search(r'^# +(.+?)\s*$', text, re.MULTILINE)
+            if heading:
+                record['title'] = heading.group(1)
+                text = text[:heading.start()] + text[heading.end():]
+            else:
+                record['title'] = os.path.splitext(os.path.basename(path))[0]
+
+        text = text.strip()
+        if 'summary' not in record:
+            first_paragraph = next(
+                (
+                    paragraph for paragraph in re.split(r'\n\s*\n', text)
+                    if paragraph.strip() and not paragraph.lstrip().startswith(('#', '!['))
+                ),
+                ''
+            )
+            record['summary'] = Truncator(' '.join(first_paragraph.split())).chars(300)
+
+        record['content'] = text
+        record['_source'] = path
+        record['_base_dir'] = os.path.dirname(os.path.abspath(path))
+        return record
+
+    def skip(self, source, reason):
+        self.skipped += 1
+        self.stderr.write(self.style.WARNING(f'Skipped {source}: {reason}'))
+
+    def resolve_authors(self, batch):
+        emails = {
+            record['author'] for record in batch
+            if record.get('author') and record['author'] not in self.authors
+        }
+        if emails:
+            for user in User.objects.filter(email__in=emails):
+                self.authors[user.email] = user
+
+    def build_article(self, record):
+        author = self.default_author
+        if record.get('author'):
+            author = self.authors.get(record['author'])
+            if author is None:
+                raise ValidationError(f'unknown author {record["author"]}')
+
+        status = record.get('status') or self.default_status
+        if status not in dict(Article.STATUS_CHOICES):
+            raise ValidationError(f'unknown status {status}')
+
+        publish_date = timezone.now()
+        if record.get('publish_date'):
+            publish_date = parse_datetime(str(record['publish_date']))
+            if publish_date is None:
+                raise ValidationError(f'invalid publish_date {record["publish_date"]}')
+            if timezone.is_naive(publish_date):
+                publish_date = timezone.make_aware(publish_date)
+
+        article = Article(
+            title=str(record.get('title', '')).strip(),
+            summary=str(record.get('summary', '')).strip(),
+            content=str(record.get('content', '')),
+            author=author,
+            status=status,
+            publish_date=publish_date,
+        )
+        article.clean_fields(exclude=['slug', 'image', 'author'])
+
+        # What Article.save would do; bulk_create skips save().
+        article.schedule_publication()
+        article.compile_content()
+        return article
+
+    def import_batch(self, batch, image_pool):
+        self.resolve_authors(batch)
+
+        articles = []
+        images = []
+        for record in batch:
+            try:
+                article = self.build_article(record)
+            except ValidationError as exc:
+                self.skip(record['_source'], '; '.join(exc.messages))
+                continue
+
+            articles.append(article)
+            images.append(
+                image_pool.submit(store_image, record['image'], record['_base_dir'])
+                if record.get('image') else None
+            )
+
+        if not articles:
+            return
+
+        for article, slug in zip(
+            articles,
+            allocate_slugs(Article.objects.all(), [article.title for article in articles])
+        ):
+            article.slug = slug
+
+        stored_images = []
+        for article, future in zip(articles, images):
+            if future is None:
+                continue
+            try:
+                article.image = future.result()
+                stored_images.append(article.image.name)
+            except Exception as exc:
+                self.stderr.write(self.style.WARNING(
+                    f'No image for "{article.title}": {exc}'
+                ))
+
+        try:
+            with transaction.atomic():
+                created = Article.objects.bulk_create(articles)
+                Article.objects.filter(
+                    pk__in=[article.pk for article in created]
+                ).update_search_vectors()
+        except Exception:
+            storage = Article._meta.get_field('image').storage
+            for name in stored_images:
+                storage.delete(name)
+            raise
+
+        self.imported += len(created)
+        self.author_ids.update(article.author_id for article in created)
@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from article_module.services.publication import ArticlePublisher
+
+
+class Command(BaseCommand):
+    help = 'Publish scheduled articles whose publish date has passed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and publish each article as soon as it is due',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=60,
+            help='Longest sleep between checks in --loop mode, in seconds (default: 60)',
+        )
+
+    def handle(self, *args, **options):
+        if not options['loop']:
+            self.publish_due()
+            return
+
+        self.stdout.write('Waiting for scheduled articles...')
+        while True:
+            self.publish_due()
+
+            # Sleep until the next article is due, but wake up regularly to
+            # notice articles scheduled in the meantime.
+            sleep_for = options['interval']
+            next_publication = ArticlePublisher.next_publication()
+            if next_publication is not None:
+                until_due = (next_publication - timezone.now()).total_seconds()
+                sleep_for = max(1, min(sleep_for, until_due))
+
+            close_old_connections()
+            time.sleep(sleep_for)
+
+    def publish_due(self):
+        published = ArticlePublisher.publish_due()
+        if published:
+            self.stdout.write(
+                self.style.SUCCESS(f'Published {len(published)} scheduled articles.')
+            )
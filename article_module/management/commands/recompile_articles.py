@@ -0,0 +1,125 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from article_module.models import Article
+from article_module.services.article_cache import ArticleCache
+from home_module.services.query_cache import QueryCache
+from article_module.utils.markdown_renderer import RENDERER_VERSION, content_hash, render_markdown
+
+
+def compile_batch(batch):
+    '''
+    Renders a batch of (pk, markdown) pairs in a worker process.
+    Workers never touch the database; the parent saves the results.
+    '''
+    return [
+        (pk, render_markdown(source), content_hash(source))
+        for pk, source in batch
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Recompile article Markdown to HTML for articles built by an older renderer version'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Recompile every article, not just outdated ones',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Number of worker processes (default: number of CPUs)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Articles rendered per worker task (default: 50)',
+        )
+
+    def handle(self, *args, **options):
+        articles = Article.objects.all()
+        if not options['all']:
+            articles = articles.exclude(content_renderer_version=RENDERER_VERSION)
+
+        total = articles.count()
+        if not total:
+            self.stdout.write(self.style.SUCCESS('All articles are up to date.'))
+            return
+
+        self.stdout.write(
+            f'Recompiling {total} articles with renderer version {RENDERER_VERSION} '
+            f'using {options["workers"]} workers...'
+        )
+
+        # Only the primary keys are read up front; each batch's Markdown is
+        # fetched just before it is handed to a worker.
+        pks = list(articles.order_by('pk').values_list('pk', flat=True))
+        pk_batches = [
+            pks[start:start + options['batch_size']]
+            for start in range(0, len(pks), options['batch_size'])
+        ]
+        # At most this many batches are fetched but not yet saved.
+        window = options['workers'] * 2
+
+        # Forked workers must not inherit open database connections, so
+        # close them and start the workers before the next query.
+        connections.close_all()
+
+        compiled = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            # A forking pool starts all of its workers on the first submit.
+            executor.submit(os.getpid).result()
+
+            pending = set()
+            for pk_batch in pk_batches:
+                if len(pending) >= window:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    compiled += self.save_results(done)
+                    self.stdout.write(f'  {compiled}/{total}')
+
+                batch = list(
+                    Article.objects.filter(pk__in=pk_batch).values_list('pk', 'content')
+                )
+                pending.add(executor.submit(compile_batch, batch))
+
+            compiled += self.save_results(pending)
+            self.stdout.write(f'  {compiled}/{total}')
+
+        # bulk_update sends no post_save signals, so do their work once here.
+        ArticleCache.invalidate()
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully recompiled {compiled} articles.')
+        )
+
+    @staticmethod
+    def save_results(futures):
+        saved = 0
+        now = timezone.now()
+        for future in futures:
+            results = future.result()
+            Article.objects.bulk_update(
+                [
+                    Article(
+                        pk=pk,
+                        content_html=html,
+                        content_hash=source_hash,
+                        content_renderer_version=RENDERER_VERSION,
+                        updated_at=now,
+                    )
+                    for pk, html, source_hash in results
+                ],
+                ['content_html', 'content_hash', 'content_renderer_version', 'updated_at']
+            )
+            # Cached pages of these articles show the old HTML.
+            QueryCache.invalidate(*(QueryCache.pk_tag(Article, pk) for pk, _, _ in results))
+            saved += len(results)
+        return saved
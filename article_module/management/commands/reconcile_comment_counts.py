@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from article_module.models import Article
+from article_module.services.comment_counter import ArticleCommentCounter
+
+
+class Command(BaseCommand):
+    help = 'Recompute Article.approved_comment_count from the approved comments'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'slugs',
+            nargs='*',
+            help='Only reconcile these articles (default: all articles)',
+        )
+
+    def handle(self, *args, **options):
+        articles = Article.objects.all()
+        if options['slugs']:
+            articles = articles.filter(slug__in=options['slugs'])
+
+        fixed = ArticleCommentCounter.reconcile(articles)
+
+        if fixed:
+            self.stdout.write(
+                self.style.WARNING(f'Fixed the comment count of {fixed} articles.')
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS('All comment counts are correct.'))
@@ -0,0 +1,65 @@
+# Generated by Django 5.1.2 on 2026-10-19 05:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from article_module.utils.hyperloglog import HyperLogLog
+
+
+def seed_visitor_sketches(apps, schema_editor):
+    '''
+    Folds the existing per-IP view rows into a sketch per article before the
+    table is dropped, so unique visitor counts carry over.
+    '''
+    Article = apps.get_model('article_module', 'Article')
+    ArticleView = apps.get_model('article_module', 'ArticleView')
+    ArticleVisitorSketch = apps.get_model('article_module', 'ArticleVisitorSketch')
+
+    sketches = {}
+    rows = ArticleView.objects.values_list(
+        'article_id', 'ip_address', 'user_id'
+    ).iterator()
+    for article_id, ip_address, user_id in rows:
+        if user_id:
+            visitor = 'user:{}'.format(user_id)
+        else:
+            visitor = 'ip:{}'.format(ip_address)
+        sketches.setdefault(article_id, HyperLogLog()).add(visitor)
+
+    for article_id, hll in sketches.items():
+        ArticleVisitorSketch.objects.create(
+            article_id=article_id,
+            registers=hll.to_bytes()
+        )
+        Article.objects.filter(pk=article_id).update(unique_visitors=hll.count())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article_module', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='unique_visitors',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='ArticleVisitorSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('registers', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='visitor_sketch', to='article_module.article')),
+            ],
+        ),
+        migrations.RunPython(
+            seed_visitor_sketches,
+            migrations.RunPython.noop
+        ),
+        migrations.DeleteModel(
+            name='ArticleView',
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.1.2 on 2026-10-19 05:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_comment_paths(apps, schema_editor):
+    '''Computes path, depth and thread for comments written before them.'''
+    Comment = apps.get_model('article_module', 'Comment')
+
+    # Parents always have smaller ids than their replies, so walking in id
+    # order sees every parent before its children.
+    nodes = {}
+    for comment in Comment.objects.order_by('pk').only('pk', 'parent_id').iterator():
+        segment = str(comment.pk).zfill(10)
+        parent = nodes.get(comment.parent_id)
+        if parent is None:
+            node = (segment, 0, comment.pk)
+        else:
+            node = (f'{parent[0]}/{segment}', parent[1] + 1, parent[2])
+        nodes[comment.pk] = node
+
+        Comment.objects.filter(pk=comment.pk).update(
+            path=node[0],
+            depth=node[1],
+            thread=node[2],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article_module', '0003_article_content_html'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='thread',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='thread_comments', to='article_module.comment', verbose_name='Thread'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['thread', 'path'], name='article_mod_thread__a19a25_idx'),
+        ),
+        migrations.RunPython(
+            fill_comment_paths,
+            migrations.RunPython.noop
+        ),
+    ]
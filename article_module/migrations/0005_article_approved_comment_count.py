@@ -0,0 +1,37 @@
+# Generated by Django 5.1.2 on 2026-10-19 05:43
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_approved_comments(apps, schema_editor):
+    Article = apps.get_model('article_module', 'Article')
+    Comment = apps.get_model('article_module', 'Comment')
+
+    approved_count = Comment.objects.filter(
+        article=OuterRef('pk'),
+        is_approved=True
+    ).order_by().values('article').annotate(total=Count('pk')).values('total')
+    Article.objects.update(
+        approved_comment_count=Coalesce(Subquery(approved_count), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article_module', '0004_comment_materialized_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='approved_comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(
+            count_approved_comments,
+            migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.2 on 2026-10-19 05:45
+
+import django.contrib.postgres.search
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+SEARCH_VECTOR_INDEX = GinIndex(
+    fields=['search_vector'],
+    name='article_search_vector_idx',
+)
+
+
+def add_search_vector_index(apps, schema_editor):
+    # tsvector values and GIN indexes only exist on PostgreSQL. Other
+    # backends leave the column empty and ArticleSearch uses its in-process
+    # index instead.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Article = apps.get_model('article_module', 'Article')
+    Article.objects.update(
+        search_vector=(
+            SearchVector('title', weight='A', config='english')
+            + SearchVector('summary', weight='B', config='english')
+            + SearchVector('content', weight='C', config='english')
+        )
+    )
+    schema_editor.add_index(Article, SEARCH_VECTOR_INDEX)
+
+
+def remove_search_vector_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Article = apps.get_model('article_module', 'Article')
+    schema_editor.remove_index(Article, SEARCH_VECTOR_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article_module', '0005_article_approved_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            add_search_vector_index,
+            remove_search_vector_index,
+        ),
+    ]
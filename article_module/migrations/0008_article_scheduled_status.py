@@ -0,0 +1,40 @@
+# Generated by Django 5.1.2 on 2026-10-19 05:51
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def schedule_future_articles(apps, schema_editor):
+    '''
+    Published articles dated in the future used to be hidden by a time
+    check in published(); they now wait as scheduled.
+    '''
+    Article = apps.get_model('article_module', 'Article')
+    Article.objects.filter(
+        status='published',
+        publish_date__gt=timezone.now()
+    ).update(status='scheduled')
+
+
+def unschedule_articles(apps, schema_editor):
+    Article = apps.get_model('article_module', 'Article')
+    Article.objects.filter(status='scheduled').update(status='published')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article_module', '0007_related_article'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='article',
+            name='status',
+            field=models.CharField(choices=[('draft', 'Draft'), ('pending', 'Pending Review'), ('scheduled', 'Scheduled'), ('published', 'Published'), ('rejected', 'Rejected')], default='draft', max_length=20, verbose_name='Status'),
+        ),
+        migrations.RunPython(
+            schedule_future_articles,
+            unschedule_articles
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.2 on 2026-10-19 05:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article_module', '0008_article_scheduled_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['status', 'updated_at'], name='article_mod_status_6aa536_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.2 on 2026-10-19 06:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article_module', '0009_article_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleTermVector',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='term_vector', serialize=False, to='article_module.article', verbose_name='Article')),
+                ('weights', models.JSONField(verbose_name='Term Weights')),
+            ],
+            options={
+                'verbose_name': 'Article Term Vector',
+                'verbose_name_plural': 'Article Term Vectors',
+            },
+        ),
+    ]
@@ -1,17 +1,50 @@
-from django.db import models
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import connections, models
 from django.utils.translation import gettext_lazy as _
-from django.utils.text import slugify
 from django.urls import reverse
 from django.utils import timezone
 from django.core.validators import MinLengthValidator
 from account_module.models import User
+from account_module.utils.quota import SlidingWindowQuota
 from datetime import timedelta
 
+from .utils.markdown_renderer import RENDERER_VERSION, content_hash, render_markdown
+from .utils.slug_allocator import allocate_slugs
+
+
+# Text search configuration shared by the stored Article.search_vector, its
+# GIN index (see migration 0006) and ArticleSearch.
+ARTICLE_SEARCH_CONFIG = 'english'
+
+# Fields that make up Article.search_vector, with their ts_rank weights.
+ARTICLE_SEARCH_WEIGHTS = {
+    'title': 'A',
+    'summary': 'B',
+    'content': 'C',
+}
+
+
+def article_search_vector():
+    vectors = [
+        SearchVector(field, weight=weight, config=ARTICLE_SEARCH_CONFIG)
+        for field, weight in ARTICLE_SEARCH_WEIGHTS.items()
+    ]
+    combined = vectors[0]
+    for vector in vectors[1:]:
+        combined = combined + vector
+    return combined
+
 
 class ArticleQuerySet(models.QuerySet):
 
     def published(self):
-        return self.filter(status=Article.PUBLISHED, publish_date__lte=timezone.now())
+        # Future-dated articles are SCHEDULED until ArticlePublisher flips
+        # them, so this does not depend on the current time and the result
+        # can be cached between publication events (see ArticleCache).
+        return self.filter(status=Article.PUBLISHED)
+
+    def scheduled(self):
+        return self.filter(status=Article.SCHEDULED)
 
     def pending(self):
         return self.filter(status=Article.PENDING)
@@ -19,6 +52,13 @@ class ArticleQuerySet(models.QuerySet):
     def draft(self):
         return self.filter(status=Article.DRAFT)
 
+    def update_search_vectors(self):
+        # The vectors are computed by the database from the saved columns.
+        # Other backends have no search_vector to fill; see ArticleSearch.
+        if connections[self.db].vendor != 'postgresql':
+            return 0
+        return self.update(search_vector=article_search_vector())
+
 
 class ArticleManager(models.Manager):
 
@@ -28,6 +68,9 @@ class ArticleManager(models.Manager):
     def published(self):
         return self.get_queryset().published()
 
+    def scheduled(self):
+        return self.get_queryset().scheduled()
+
     def pending(self):
         return self.get_queryset().pending()
 
@@ -38,12 +81,14 @@ class ArticleManager(models.Manager):
 class Article(models.Model):
     DRAFT = 'draft'
     PENDING = 'pending'
+    SCHEDULED = 'scheduled'
     PUBLISHED = 'published'
     REJECTED = 'rejected'
 
     STATUS_CHOICES = [
         (DRAFT, _('Draft')),
         (PENDING, _('Pending Review')),
+        (SCHEDULED, _('Scheduled')),
         (PUBLISHED, _('Published')),
         (REJECTED, _('Rejected')),
     ]
@@ -69,6 +114,25 @@ class Article(models.Model):
 
     content = models.TextField(verbose_name=_('Content'))
 
+    # Sanitized HTML compiled from the Markdown in `content` on save, so
+    # article pages never render Markdown per request.
+    content_html = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name=_('Content HTML'),
+    )
+
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+    )
+
+    content_renderer_version = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+    )
+
     image = models.ImageField(
         upload_to='images/articles/',
         blank=True,
@@ -103,7 +167,24 @@ class Article(models.Model):
         verbose_name=_('Rejection Reason'),
     )
 
+    # Weighted tsvector of title, summary and content, refreshed on save.
+    # Only populated on PostgreSQL; see ArticleSearch for other backends.
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+    )
+
+    # Both counters are written in batches by ArticleViewCounter, so they
+    # can lag the live traffic by up to its flush interval.
     view_count = models.PositiveIntegerField(default=0)
+    unique_visitors = models.PositiveIntegerField(default=0)
+
+    # Maintained by ArticleCommentCounter; see the reconcile_comment_counts
+    # command for repairing drift.
+    approved_comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
 
     objects = ArticleManager()
 
@@ -118,6 +199,8 @@ class Article(models.Model):
             models.Index(fields=['status', 'publish_date']),
             models.Index(fields=['author', 'status']),
             models.Index(fields=['slug']),
+            # max(updated_at) of published articles, for sitemaps and feeds
+            models.Index(fields=['status', 'updated_at']),
         ]
     
     def __str__(self):
@@ -125,21 +208,70 @@ class Article(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            base_slug = slugify(self.title)
-            slug = base_slug
-            counter = 1
-            while Article.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f'{base_slug}-{counter}'
-                counter += 1
-            self.slug = slug
+            self.slug = allocate_slugs(
+                Article.objects.exclude(pk=self.pk),
+                [self.title]
+            )[0]
+
+        self.schedule_publication()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'publish_date' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'status'}
+
+        if self.compile_content():
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {
+                    *update_fields,
+                    'content_html',
+                    'content_hash',
+                    'content_renderer_version',
+                }
         super().save(*args, **kwargs)
 
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or set(update_fields) & set(ARTICLE_SEARCH_WEIGHTS):
+            self.update_search_vector()
+
+    def update_search_vector(self):
+        # The vector is computed from the saved columns, so it needs a
+        # second statement after the row is written.
+        Article.objects.using(self._state.db).filter(pk=self.pk).update_search_vectors()
+
+    def schedule_publication(self):
+        '''
+        Keeps the status in line with the publish date: a published article
+        dated in the future waits as SCHEDULED, and a scheduled one whose
+        date was moved into the past is published right away.
+        '''
+        if self.status == self.PUBLISHED and self.publish_date > timezone.now():
+            self.status = self.SCHEDULED
+        elif self.status == self.SCHEDULED and self.publish_date <= timezone.now():
+            self.status = self.PUBLISHED
+
+    def compile_content(self):
+        '''
+        Recompiles content_html if the Markdown or the renderer changed.
+        Returns True if the compiled fields were updated.
+        '''
+        source_hash = content_hash(self.content)
+        if (
+            source_hash == self.content_hash
+            and self.content_renderer_version == RENDERER_VERSION
+        ):
+            return False
+
+        self.content_html = render_markdown(self.content)
+        self.content_hash = source_hash
+        self.content_renderer_version = RENDERER_VERSION
+        return True
+
     def get_absolute_url(self):
         return reverse('article_module:detail', kwargs={'slug': self.slug})
 
     @property
     def is_published(self):
-        return self.status == self.PUBLISHED and self.publish_date <= timezone.now()
+        return self.status == self.PUBLISHED
 
     @classmethod
     def can_user_create_article(cls, user):
@@ -149,13 +281,25 @@ class Article(models.Model):
         if user.is_staff or user.is_superuser:
             return True
 
-        last_24_hours = timezone.now() - timedelta(hours=24)
-        recent_articles = cls.objects.filter(
-            author=user,
-            created_at__gte=last_24_hours
-        ).exclude(status=cls.REJECTED)
+        return ARTICLE_CREATION_QUOTA.is_allowed(user.pk)
+
+
+def recent_article_dates(user_id, since):
+    # Rejected articles do not count towards the quota.
+    return Article.objects.filter(
+        author_id=user_id,
+        created_at__gte=since
+    ).exclude(status=Article.REJECTED).values_list('created_at', flat=True)
 
-        return not recent_articles.exists()
+
+# Non-staff authors may create one article per 24 hours. Kept current by
+# article_module.signals, so can_user_create_article is a cache read.
+ARTICLE_CREATION_QUOTA = SlidingWindowQuota(
+    'article_create',
+    limit=1,
+    window=timedelta(hours=24),
+    load=recent_article_dates,
+)
 
 
 class Comment(models.Model):
@@ -192,9 +336,40 @@ class Comment(models.Model):
         verbose_name=_('Approved'),
     )
 
+    # Materialized path: the zero-padded ids from the thread's top-level
+    # comment down to this one, e.g. '0000000012/0000000040'. Ids grow over
+    # time, so ordering a thread by path lists it depth-first with replies
+    # in the order they were written.
+    path = models.CharField(
+        max_length=255,
+        blank=True,
+        editable=False,
+        db_index=True,
+    )
+
+    depth = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+    )
+
+    thread = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='thread_comments',
+        verbose_name=_('Thread'),
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    PATH_SEGMENT_WIDTH = 10
+    # Keeps the path within max_length; replies below this depth are
+    # attached to the deepest allowed ancestor instead.
+    MAX_DEPTH = 20
+
     class Meta:
         ordering = [
             '-created_at',
@@ -204,41 +379,126 @@ class Comment(models.Model):
         indexes = [
             models.Index(fields=['article', 'is_approved']),
             models.Index(fields=['author', 'is_approved']),
+            models.Index(fields=['thread', 'path']),
         ]
 
     def __str__(self):
         return f'Comment by {self.author.username or self.author.email} on {self.article.title}'
 
+    def save(self, *args, **kwargs):
+        is_new = self.pk is None
+        super().save(*args, **kwargs)
+
+        if is_new:
+            # The path includes the comment's own id, so it can only be
+            # filled in once the row exists.
+            segment = str(self.pk).zfill(self.PATH_SEGMENT_WIDTH)
+            if self.parent_id:
+                parent = self.parent
+                self.path = f'{parent.path}/{segment}'
+                self.depth = parent.depth + 1
+                self.thread_id = parent.thread_id
+            else:
+                self.path = segment
+                self.depth = 0
+                self.thread_id = self.pk
+
+            Comment.objects.filter(pk=self.pk).update(
+                path=self.path,
+                depth=self.depth,
+                thread=self.thread_id,
+            )
+
     @property
     def is_reply(self):
         return self.parent is not None
 
 
-class ArticleView(models.Model):
-    article = models.ForeignKey(
+class ArticleVisitorSketch(models.Model):
+    '''
+    HyperLogLog registers of an article's distinct visitors.
+    Article.unique_visitors holds the estimate computed from them.
+    '''
+    article = models.OneToOneField(
         Article,
         on_delete=models.CASCADE,
-        related_name='article_views',
+        related_name='visitor_sketch',
     )
 
-    ip_address = models.GenericIPAddressField()
+    registers = models.BinaryField()
 
-    user = models.ForeignKey(
-        User,
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class RelatedArticle(models.Model):
+    '''
+    One of an article's nearest neighbours by content similarity.
+    Rows are computed by RelatedArticles (see services/related_articles.py).
+    '''
+    article = models.ForeignKey(
+        Article,
         on_delete=models.CASCADE,
-        null=True,
-        blank=True,
+        related_name='related_links',
+        verbose_name=_('Article'),
+    )
+
+    related = models.ForeignKey(
+        Article,
+        on_delete=models.CASCADE,
+        related_name='linked_from',
+        verbose_name=_('Related Article'),
     )
 
-    viewed_at = models.DateTimeField(auto_now_add=True)
+    score = models.FloatField(
+        verbose_name=_('Similarity'),
+    )
+
+    rank = models.PositiveSmallIntegerField(
+        verbose_name=_('Rank'),
+    )
 
     class Meta:
-        unique_together = [
+        ordering = [
             'article',
-            'ip_address',
+            'rank',
+        ]
+        verbose_name = _('Related Article')
+        verbose_name_plural = _('Related Articles')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['article', 'related'],
+                name='unique_related_article',
+            ),
         ]
         indexes = [
-            models.Index(fields=['article', 'viewed_at']),
+            models.Index(fields=['article', 'rank']),
         ]
 
-        
\ No newline at end of file
+    def __str__(self):
+        return f'{self.article_id} -> {self.related_id} ({self.score:.3f})'
+
+
+class ArticleTermVector(models.Model):
+    '''
+    A published article's L2-normalised TF-IDF vector, as {term: weight}.
+    Kept by RelatedArticles, so one changed article can be scored against
+    the others without reading and tokenizing the whole corpus.
+    '''
+    article = models.OneToOneField(
+        Article,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='term_vector',
+        verbose_name=_('Article'),
+    )
+
+    weights = models.JSONField(
+        verbose_name=_('Term Weights'),
+    )
+
+    class Meta:
+        verbose_name = _('Article Term Vector')
+        verbose_name_plural = _('Article Term Vectors')
+
+    def __str__(self):
+        return f'{self.article_id} ({len(self.weights)} terms)'
@@ -0,0 +1,88 @@
+from django.core.cache import cache
+from django.db.models import Min
+from django.utils import timezone
+
+from home_module.services.query_cache import QueryCache
+
+from ..models import Article
+
+
+class ArticleCache:
+    '''
+    Versioned cache for anything derived from the set of published articles.
+
+    Every key embeds a shared version number. invalidate() bumps it, which
+    orphans all cached article lists and pages at once. It runs when an
+    article enters or leaves the published set or a published article is
+    saved or deleted (see article_module.signals), and when
+    ArticlePublisher makes scheduled articles visible, so between those
+    events entries can live for TIMEOUT. Saves of drafts and articles
+    under review only bump the article's own tag.
+
+    As a guard against a scheduler that is late, or a cache that is not
+    shared between processes, no entry outlives the next scheduled
+    publish_date.
+
+    View and comment counters are written without saving the article, so
+    they can lag by up to TIMEOUT on cached pages.
+    '''
+    VERSION_KEY = 'article_cache_version'
+    KEY_PREFIX = 'article_cache_'
+    TIMEOUT = 60 * 60
+    NEXT_PUBLICATION_KEY = 'article_next_publication'
+
+    @classmethod
+    def version(cls):
+        version = cache.get(cls.VERSION_KEY)
+        if version is None:
+            # Not 1 again after an eviction; see QueryCache.seed_version.
+            seed = QueryCache.seed_version()
+            cache.add(cls.VERSION_KEY, seed, timeout=None)
+            version = cache.get(cls.VERSION_KEY, seed)
+        return version
+
+    @classmethod
+    def invalidate(cls):
+        try:
+            cache.incr(cls.VERSION_KEY)
+        except ValueError:
+            cache.add(cls.VERSION_KEY, QueryCache.seed_version(), timeout=None)
+        cls.forget_next_publication()
+        # Also covers bulk writes, which send no signals to home_module.
+        QueryCache.invalidate(QueryCache.model_tag(Article))
+
+    @classmethod
+    def forget_next_publication(cls):
+        '''Makes timeout() look up the next scheduled publication again.'''
+        cache.delete(cls.NEXT_PUBLICATION_KEY)
+
+    @classmethod
+    def key(cls, *parts):
+        return '{}{}_{}'.format(
+            cls.KEY_PREFIX,
+            cls.version(),
+            '_'.join(str(part) for part in parts)
+        )
+
+    @classmethod
+    def timeout(cls):
+        '''Seconds an entry may live: TIMEOUT, cut short by the next scheduled publication.'''
+        # False marks "nothing scheduled" so that it can be cached too.
+        next_publication = cache.get(cls.NEXT_PUBLICATION_KEY)
+        if next_publication is None:
+            next_publication = Article.objects.scheduled().aggregate(
+                next=Min('publish_date')
+            )['next'] or False
+            cache.set(cls.NEXT_PUBLICATION_KEY, next_publication, timeout=cls.TIMEOUT)
+
+        if not next_publication:
+            return cls.TIMEOUT
+
+        remaining = (next_publication - timezone.now()).total_seconds()
+        return max(1, min(cls.TIMEOUT, int(remaining)))
+
+    @classmethod
+    def get_or_set(cls, key, build):
+        # Through QueryCache for its per-process tier and stampede
+        # protection; the key already carries the version.
+        return QueryCache.get_or_set(key, build, timeout=cls.timeout)
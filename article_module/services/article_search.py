@@ -0,0 +1,193 @@
+import math
+import re
+import threading
+from collections import defaultdict
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from ..models import ARTICLE_SEARCH_CONFIG, Article
+
+
+class ArticleSearch:
+    '''
+    Ranked full-text search over articles.
+
+    On PostgreSQL, articles are matched against the stored, weighted
+    Article.search_vector (title A, summary B, content C) through its GIN
+    index, ranked with ts_rank and given ts_headline snippets. Other
+    backends (SQLite in tests and local runs) use ArticleInvertedIndex, an
+    in-process index with the same weights, and cut snippets in Python.
+    '''
+    SNIPPET_RADIUS = 100
+
+    # Matches are wrapped in these markers first, so the snippet can be
+    # HTML-escaped as a whole before the real <mark> tags are put back in.
+    START_SEL = '[[hl]]'
+    STOP_SEL = '[[/hl]]'
+
+    @staticmethod
+    def uses_full_text(using='default'):
+        return connections[using].vendor == 'postgresql'
+
+    @classmethod
+    def search(cls, queryset, query):
+        '''Narrows an Article queryset to matches, best match first.'''
+        query = query.strip()
+        if not query:
+            return queryset.none()
+
+        if cls.uses_full_text(queryset.db):
+            search_query = SearchQuery(query, config=ARTICLE_SEARCH_CONFIG, search_type='websearch')
+            return queryset.filter(
+                search_vector=search_query
+            ).annotate(
+                rank=SearchRank(F('search_vector'), search_query),
+                headline=SearchHeadline(
+                    'content',
+                    search_query,
+                    config=ARTICLE_SEARCH_CONFIG,
+                    start_sel=cls.START_SEL,
+                    stop_sel=cls.STOP_SEL,
+                    max_words=35,
+                    min_words=15,
+                    max_fragments=2,
+                    fragment_delimiter=' … ',
+                ),
+            ).order_by('-rank', '-publish_date')
+
+        ranked_ids = ArticleInvertedIndex.search(query)
+        if not ranked_ids:
+            return queryset.none()
+
+        return queryset.filter(pk__in=ranked_ids).annotate(
+            rank=Case(
+                *[When(pk=pk, then=Value(position)) for position, pk in enumerate(ranked_ids)],
+                output_field=IntegerField(),
+            )
+        ).order_by('rank')
+
+    @classmethod
+    def attach_snippets(cls, articles, query):
+        '''Sets `search_snippet` (safe HTML) on each article of a result page.'''
+        terms = ArticleInvertedIndex.tokenize(query)
+        for article in articles:
+            headline = getattr(article, 'headline', None)
+            if headline is None:
+                headline = cls._python_snippet(article.content, terms)
+            article.search_snippet = cls._render_snippet(headline)
+
+    @classmethod
+    def _python_snippet(cls, text, terms):
+        lowered = text.lower()
+        positions = [lowered.find(term) for term in terms]
+        positions = [position for position in positions if position >= 0]
+        start = max(min(positions, default=0) - cls.SNIPPET_RADIUS, 0)
+        end = start + cls.SNIPPET_RADIUS * 2
+
+        snippet = text[start:end]
+        if terms:
+            pattern = re.compile(
+                r'\b({})'.format('|'.join(re.escape(term) for term in terms)),
+                re.IGNORECASE
+            )
+            snippet = pattern.sub(
+                lambda match: f'{cls.START_SEL}{match.group(0)}{cls.STOP_SEL}',
+                snippet
+            )
+
+        prefix = '… ' if start > 0 else ''
+        suffix = ' …' if end < len(text) else ''
+        return f'{prefix}{snippet}{suffix}'
+
+    @classmethod
+    def _render_snippet(cls, snippet):
+        escaped = escape(snippet)
+        return mark_safe(
+            escaped.replace(cls.START_SEL, '<mark>').replace(cls.STOP_SEL, '</mark>')
+        )
+
+
+class ArticleInvertedIndex:
+    '''
+    An in-process inverted index used when PostgreSQL search is unavailable.
+
+    It is built from every article on first use and dropped whenever an
+    article is saved or deleted (see article_module.signals), so it is meant
+    for SQLite test and development runs, not for multi-process production.
+    Scores are TF-IDF with the same field weights as the PostgreSQL vector.
+    '''
+    FIELD_WEIGHTS = {
+        'title': 1.0,
+        'summary': 0.4,
+        'content': 0.2,
+    }
+    STOP_WORDS = {
+        'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in',
+        'is', 'it', 'of', 'on', 'or', 'that', 'the', 'to', 'with',
+    }
+
+    _lock = threading.Lock()
+    _postings = None
+    _document_count = 0
+
+    @classmethod
+    def tokenize(cls, text):
+        return [
+            token for token in re.findall(r'\w+', text.lower())
+            if token not in cls.STOP_WORDS
+        ]
+
+    @classmethod
+    def invalidate(cls):
+        with cls._lock:
+            cls._postings = None
+
+    @classmethod
+    def _build(cls):
+        postings = defaultdict(lambda: defaultdict(float))
+        document_count = 0
+
+        rows = Article.objects.values_list('pk', *cls.FIELD_WEIGHTS).iterator()
+        for pk, *fields in rows:
+            document_count += 1
+            for weight, text in zip(cls.FIELD_WEIGHTS.values(), fields):
+                for token in cls.tokenize(text):
+                    postings[token][pk] += weight
+
+        return postings, document_count
+
+    @classmethod
+    def search(cls, query):
+        '''Returns matching article ids, best match first.'''
+        with cls._lock:
+            if cls._postings is None:
+                cls._postings, cls._document_count = cls._build()
+            postings, document_count = cls._postings, cls._document_count
+
+        terms = cls.tokenize(query)
+        if not terms:
+            return []
+
+        scores = None
+        for term in terms:
+            documents = postings.get(term)
+            if not documents:
+                # Every term must match, like websearch_to_tsquery.
+                return []
+
+            idf = math.log(1 + document_count / len(documents))
+            term_scores = {pk: weight * idf for pk, weight in documents.items()}
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {
+                    pk: score + term_scores[pk]
+                    for pk, score in scores.items()
+                    if pk in term_scores
+                }
+
+        return sorted(scores, key=lambda pk: (-scores[pk], -pk))
@@ -0,0 +1,89 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from home_module.services.query_cache import QueryCache
+from ..models import Article, Comment
+
+
+class ArticleCommentCounter:
+    '''
+    Keeps Article.approved_comment_count in step with its approved comments.
+
+    Every write path that changes how many approved comments an article has
+    (posting a comment, approving or disapproving in the admin, deleting)
+    adjusts the counter with an F() expression in the same transaction as
+    the change, so list pages can show counts without a COUNT per card.
+    These updates send no post_save, so adjust() also bumps the article's
+    QueryCache tag itself, which drops its cached pages and ETags.
+    reconcile() recomputes the counters from scratch for anything that
+    bypassed these paths, such as raw SQL or queryset.update() elsewhere.
+    '''
+
+    @staticmethod
+    def adjust(article_id, delta):
+        if delta:
+            QueryCache.invalidate_on_commit(QueryCache.pk_tag(Article, article_id))
+
+        if delta > 0:
+            Article.objects.filter(pk=article_id).update(
+                approved_comment_count=F('approved_comment_count') + delta
+            )
+        elif delta < 0:
+            # Never let drift push the counter below zero.
+            Article.objects.filter(
+                pk=article_id,
+                approved_comment_count__gte=-delta
+            ).update(
+                approved_comment_count=F('approved_comment_count') + delta
+            )
+
+    @classmethod
+    def set_approval(cls, queryset, is_approved):
+        '''
+        Approves or disapproves the comments in queryset and moves the
+        affected articles' counters by the number that actually changed.
+        Returns the number of comments updated.
+        '''
+        with transaction.atomic():
+            changing = list(
+                queryset.exclude(is_approved=is_approved)
+                .select_for_update()
+                .values_list('pk', 'article_id')
+            )
+            if not changing:
+                return 0
+
+            Comment.objects.filter(
+                pk__in=[pk for pk, article_id in changing]
+            ).update(is_approved=is_approved)
+
+            # adjust() also drops the cached pages of these articles, so
+            # hidden comments stop being served.
+            delta = 1 if is_approved else -1
+            per_article = Counter(article_id for pk, article_id in changing)
+            for article_id, changed in per_article.items():
+                cls.adjust(article_id, delta * changed)
+
+        return len(changing)
+
+    @staticmethod
+    def reconcile(articles=None):
+        '''
+        Recomputes the counters with one UPDATE per call.
+        Returns the number of articles whose counter was wrong.
+        '''
+        if articles is None:
+            articles = Article.objects.all()
+
+        approved_count = Comment.objects.filter(
+            article=OuterRef('pk'),
+            is_approved=True
+        ).order_by().values('article').annotate(total=Count('pk')).values('total')
+        actual = Coalesce(Subquery(approved_count), 0)
+
+        return articles.annotate(actual_count=actual).exclude(
+            approved_comment_count=F('actual_count')
+        ).update(approved_comment_count=actual)
@@ -0,0 +1,95 @@
+from django.core.paginator import Paginator
+
+from ..models import Comment
+
+
+class CommentTree:
+    '''
+    Loads approved comment threads as nested trees.
+
+    A page of top-level comments and their replies down to INLINE_DEPTH
+    levels comes back from a single query ordered by (thread, path); the
+    tree is assembled in Python. Branches deeper than that are loaded on
+    demand through the comment_replies endpoint, one INLINE_DEPTH slice at
+    a time.
+
+    Every built node gets a `children` list and a `has_more_replies` flag
+    for replies that exist below the loaded depth. A reply whose parent is
+    not approved is hidden together with the rest of that branch.
+    '''
+    THREADS_PER_PAGE = 10
+    INLINE_DEPTH = 3
+
+    @classmethod
+    def _approved(cls, article):
+        return Comment.objects.filter(
+            article=article,
+            is_approved=True
+        ).select_related('author')
+
+    @classmethod
+    def page(cls, article, page_number):
+        '''Returns the page of top-level comments, each with its replies attached.'''
+        roots = Comment.objects.filter(
+            article=article,
+            is_approved=True,
+            depth=0
+        ).order_by('-pk')
+
+        paginator = Paginator(roots.values_list('pk', flat=True), cls.THREADS_PER_PAGE)
+        page = paginator.get_page(page_number)
+        if not paginator.count:
+            page.object_list = []
+            return page
+
+        # The page's thread ids go in as a subquery, so the threads and all
+        # of their loaded replies arrive in one ordered query. One level
+        # past INLINE_DEPTH is fetched only to know which branches go on.
+        page_root_ids = roots.values('pk')[page.start_index() - 1:page.end_index()]
+        rows = cls._approved(article).filter(
+            thread__in=page_root_ids,
+            depth__lte=cls.INLINE_DEPTH + 1,
+        ).order_by('-thread_id', 'path')
+
+        page.object_list = cls._build(rows, root_depth=0, max_depth=cls.INLINE_DEPTH)
+        return page
+
+    @classmethod
+    def branch(cls, comment):
+        '''Returns the replies below a comment, INLINE_DEPTH levels deep.'''
+        max_depth = comment.depth + cls.INLINE_DEPTH
+        rows = cls._approved(comment.article_id).filter(
+            thread_id=comment.thread_id,
+            path__startswith=f'{comment.path}/',
+            depth__lte=max_depth + 1,
+        ).order_by('path')
+
+        return cls._build(rows, root_depth=comment.depth + 1, max_depth=max_depth)
+
+    @staticmethod
+    def _build(rows, root_depth, max_depth):
+        roots = []
+        nodes = {}
+
+        for comment in rows:
+            if comment.depth > max_depth:
+                parent = nodes.get(comment.parent_id)
+                if parent is not None:
+                    parent.has_more_replies = True
+                continue
+
+            comment.children = []
+            comment.has_more_replies = False
+
+            if comment.depth == root_depth:
+                roots.append(comment)
+            else:
+                parent = nodes.get(comment.parent_id)
+                if parent is None:
+                    # The parent is unapproved, so this branch stays hidden.
+                    continue
+                parent.children.append(comment)
+
+            nodes[comment.pk] = comment
+
+        return roots
@@ -0,0 +1,88 @@
+import logging
+
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from ..models import Article
+from .article_cache import ArticleCache
+from .article_search import ArticleInvertedIndex
+from .related_articles import RelatedArticles
+
+logger = logging.getLogger(__name__)
+
+
+class ArticlePublisher:
+    '''
+    Moves articles into the published set.
+
+    publish_due() is the scheduler: it flips every SCHEDULED article whose
+    publish_date has passed to PUBLISHED. It is run by the
+    publish_scheduled_articles command, either from cron or as a long-running
+    worker with --loop. Because these are the only moments a scheduled
+    article becomes visible, they are also the only moments the article
+    cache has to be dropped for it.
+
+    Both paths use bulk updates, which send no post_save signals, so they
+    invalidate the cache and related-article neighbours themselves.
+    '''
+
+    @classmethod
+    def publish(cls, queryset):
+        '''
+        Publishes the given articles, or schedules those dated in the future.
+        Returns the number of articles changed.
+        '''
+        now = timezone.now()
+        with transaction.atomic():
+            live_ids = list(queryset.exclude(status=Article.PUBLISHED).filter(
+                publish_date__lte=now
+            ).values_list('pk', flat=True))
+            Article.objects.filter(pk__in=live_ids).update(
+                status=Article.PUBLISHED,
+                updated_at=now
+            )
+
+            scheduled = queryset.exclude(status=Article.SCHEDULED).filter(
+                publish_date__gt=now
+            ).update(status=Article.SCHEDULED, updated_at=now)
+
+            if live_ids or scheduled:
+                # A newly scheduled article also shortens how long cache
+                # entries may live, so the cache is dropped either way.
+                transaction.on_commit(lambda: cls._changed(live_ids))
+
+        return len(live_ids) + scheduled
+
+    @classmethod
+    def publish_due(cls):
+        '''Publishes scheduled articles whose time has come. Returns their ids.'''
+        with transaction.atomic():
+            due_ids = list(Article.objects.scheduled().filter(
+                publish_date__lte=timezone.now()
+            ).select_for_update(skip_locked=True).values_list('pk', flat=True))
+            if not due_ids:
+                return []
+
+            # updated_at moves too, so sitemaps and feeds see the change.
+            Article.objects.filter(
+                pk__in=due_ids,
+                status=Article.SCHEDULED
+            ).update(status=Article.PUBLISHED, updated_at=timezone.now())
+            transaction.on_commit(lambda: cls._changed(due_ids))
+
+        return due_ids
+
+    @staticmethod
+    def next_publication():
+        '''The publish_date of the next scheduled article, or None.'''
+        return Article.objects.scheduled().aggregate(
+            next=Min('publish_date')
+        )['next']
+
+    @staticmethod
+    def _changed(published_ids):
+        ArticleCache.invalidate()
+        ArticleInvertedIndex.invalidate()
+        for article_id in published_ids:
+            RelatedArticles.schedule_update(article_id)
@@ -0,0 +1,323 @@
+import logging
+import math
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Min, Q
+
+from home_module.services.query_cache import QueryCache
+from ..models import Article, ArticleTermVector, RelatedArticle
+from .article_cache import ArticleCache
+from .article_search import ArticleInvertedIndex
+
+logger = logging.getLogger(__name__)
+
+# One worker, so incremental updates of one process never race each
+# other; the shared lock in _run_update covers other processes.
+_update_executor = ThreadPoolExecutor(
+    max_workers=1,
+    thread_name_prefix='related-articles'
+)
+
+
+class _TermMatrix:
+    '''
+    Stored term vectors as a sparse row matrix in NumPy (CSR layout), so
+    an article is scored against all others in time proportional to the
+    number of stored weights rather than articles times vocabulary.
+    '''
+
+    def __init__(self, vectors):
+        self.ids = []
+        self.vocabulary = {}
+        columns = []
+        data = []
+        lengths = []
+        for pk, weights in vectors:
+            self.ids.append(pk)
+            lengths.append(len(weights))
+            for term, weight in weights.items():
+                columns.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                data.append(weight)
+
+        self.positions = {pk: row for row, pk in enumerate(self.ids)}
+        self.columns = np.array(columns, dtype=np.int64)
+        self.data = np.array(data, dtype=np.float32)
+        self.rows = np.repeat(np.arange(len(self.ids)), lengths)
+        self.ends = np.cumsum(lengths)
+
+    def dense(self, row):
+        start = self.ends[row - 1] if row else 0
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        vector[self.columns[start:self.ends[row]]] = self.data[start:self.ends[row]]
+        return vector
+
+    def scores(self, row):
+        '''Cosine similarity of the article at `row` with every article.'''
+        products = self.data * self.dense(row)[self.columns]
+        return np.bincount(self.rows, weights=products, minlength=len(self.ids))
+
+
+class RelatedArticles:
+    '''
+    Content-similarity neighbours of published articles.
+
+    Every published article becomes an L2-normalised TF-IDF vector over
+    its title, summary and content (title and summary terms count extra).
+    Cosine similarity is then a dot product, and each article's TOP_K most
+    similar articles are stored as RelatedArticle rows, so the detail page
+    reads them with one indexed query.
+
+    rebuild() recomputes everything (the compute_related_articles command)
+    over the MAX_FEATURES most common terms, and stores every vector as an
+    ArticleTermVector. update() refreshes a single article after it is
+    published, edited or withdrawn: it vectorizes only that article, with
+    document frequencies taken from the stored vectors, and scores it
+    against them. Then it re-ranks its own neighbours and those of every
+    article it enters or leaves. Vectors of untouched articles keep the
+    IDF weights of when they were computed until the next rebuild.
+    '''
+    TOP_K = 6
+    MIN_SCORE = 0.05
+    MAX_FEATURES = 5000
+    BLOCK_SIZE = 256
+    FIELD_WEIGHTS = {
+        'title': 3,
+        'summary': 2,
+        'content': 1,
+    }
+
+    # Saving one of these fields can change an article's neighbours.
+    TRACKED_FIELDS = {'title', 'summary', 'content', 'status', 'publish_date'}
+
+    # Serializes update() across processes.
+    LOCK_KEY = 'related_articles_update_lock'
+    LOCK_TIMEOUT = 60 * 5
+    LOCK_WAIT = 0.2
+
+    @classmethod
+    def _term_counts(cls, fields):
+        counts = Counter()
+        for weight, text in zip(cls.FIELD_WEIGHTS.values(), fields):
+            for token in ArticleInvertedIndex.tokenize(text):
+                counts[token] += weight
+        return counts
+
+    @classmethod
+    def _corpus(cls):
+        ids = []
+        term_counts = []
+        rows = Article.objects.published().order_by('pk').values_list(
+            'pk', *cls.FIELD_WEIGHTS
+        )
+        for pk, *fields in rows.iterator():
+            ids.append(pk)
+            term_counts.append(cls._term_counts(fields))
+        return ids, term_counts
+
+    @staticmethod
+    def _idf(documents, document_frequency):
+        return np.log((1 + documents) / (1 + document_frequency)) + 1
+
+    @classmethod
+    def _vectorize(cls, term_counts):
+        document_frequency = Counter()
+        for counts in term_counts:
+            document_frequency.update(counts.keys())
+
+        vocabulary = {
+            term: column
+            for column, (term, _) in enumerate(
+                document_frequency.most_common(cls.MAX_FEATURES)
+            )
+        }
+        frequencies = np.array(
+            [document_frequency[term] for term in vocabulary],
+            dtype=np.float32
+        )
+        idf = cls._idf(len(term_counts), frequencies)
+
+        matrix = np.zeros((len(term_counts), len(vocabulary)), dtype=np.float32)
+        for row, counts in enumerate(term_counts):
+            for term, count in counts.items():
+                column = vocabulary.get(term)
+                if column is not None:
+                    # Sublinear term frequency, so repetition saturates.
+                    matrix[row, column] = 1 + math.log(count)
+
+        matrix *= idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return matrix / norms, list(vocabulary)
+
+    @classmethod
+    def _weights(cls, article_id, vectors):
+        '''
+        The term vector of one article, weighted with the document
+        frequencies of the stored `vectors` plus the article itself.
+        '''
+        fields = Article.objects.filter(pk=article_id).values_list(*cls.FIELD_WEIGHTS).get()
+        counts = cls._term_counts(fields)
+
+        document_frequency = Counter()
+        for _, weights in vectors:
+            document_frequency.update(weights.keys() & counts.keys())
+
+        weights = {
+            term: (1 + math.log(count)) * float(
+                cls._idf(len(vectors) + 1, document_frequency[term] + 1)
+            )
+            for term, count in counts.items()
+        }
+        norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1
+        return {term: weight / norm for term, weight in weights.items()}
+
+    @classmethod
+    def _top(cls, ids, row, scores):
+        '''Builds the RelatedArticle rows of ids[row] from its scores against all articles.'''
+        k = min(cls.TOP_K, len(ids) - 1)
+        if k <= 0:
+            return []
+
+        scores[row] = -1
+        # argpartition finds the top k unordered; only those get sorted.
+        top = np.argpartition(-scores, k - 1)[:k]
+        links = []
+        for column in top[np.argsort(-scores[top])]:
+            score = float(scores[column])
+            if score < cls.MIN_SCORE:
+                break
+            links.append(RelatedArticle(
+                article_id=ids[row],
+                related_id=ids[column],
+                score=score,
+                rank=len(links) + 1,
+            ))
+        return links
+
+    @classmethod
+    def rebuild(cls):
+        '''Recomputes the neighbours of every published article. Returns their number.'''
+        ids, term_counts = cls._corpus()
+        matrix, terms = cls._vectorize(term_counts)
+
+        links = []
+        for start in range(0, len(ids), cls.BLOCK_SIZE):
+            block = matrix[start:start + cls.BLOCK_SIZE] @ matrix.T
+            for offset, scores in enumerate(block):
+                links.extend(cls._top(ids, start + offset, scores))
+
+        vectors = []
+        for pk, vector in zip(ids, matrix):
+            columns = np.flatnonzero(vector)
+            vectors.append(ArticleTermVector(
+                article_id=pk,
+                weights={terms[column]: float(vector[column]) for column in columns},
+            ))
+
+        with transaction.atomic():
+            RelatedArticle.objects.all().delete()
+            RelatedArticle.objects.bulk_create(links, batch_size=1000)
+            ArticleTermVector.objects.all().delete()
+            ArticleTermVector.objects.bulk_create(vectors, batch_size=500)
+        ArticleCache.invalidate()
+        QueryCache.invalidate(QueryCache.model_tag(RelatedArticle))
+        return len(ids)
+
+    @classmethod
+    def update(cls, article_id):
+        '''Refreshes the neighbours affected by one article changing.'''
+        is_published = Article.objects.published().filter(pk=article_id).exists()
+        if not is_published and not RelatedArticle.objects.filter(
+            Q(article_id=article_id) | Q(related_id=article_id)
+        ).exists():
+            # A draft that was never listed anywhere.
+            ArticleTermVector.objects.filter(article_id=article_id).delete()
+            return
+
+        vectors = list(
+            ArticleTermVector.objects.exclude(article_id=article_id).order_by('pk').values_list(
+                'article_id', 'weights'
+            )
+        )
+        if not vectors and Article.objects.published().exclude(pk=article_id).exists():
+            # No vectors stored yet, e.g. right after the upgrade that
+            # added them; one full pass creates them.
+            cls.rebuild()
+            return
+
+        if is_published:
+            vectors.append((article_id, cls._weights(article_id, vectors)))
+        matrix = _TermMatrix(vectors)
+        ids = matrix.ids
+
+        with transaction.atomic():
+            if is_published:
+                ArticleTermVector.objects.update_or_create(
+                    article_id=article_id,
+                    defaults={'weights': vectors[-1][1]},
+                )
+            else:
+                ArticleTermVector.objects.filter(article_id=article_id).delete()
+
+            # Articles listing it must be re-ranked whatever its new score.
+            affected = set(RelatedArticle.objects.filter(
+                related_id=article_id
+            ).values_list('article_id', flat=True))
+            affected.add(article_id)
+
+            if is_published:
+                scores = matrix.scores(matrix.positions[article_id])
+                floors = {
+                    row['article_id']: (row['links'], row['lowest'])
+                    for row in RelatedArticle.objects.values('article_id').annotate(
+                        links=Count('pk'),
+                        lowest=Min('score'),
+                    )
+                }
+                for row, score in enumerate(scores):
+                    if ids[row] == article_id or score < cls.MIN_SCORE:
+                        continue
+                    links, lowest = floors.get(ids[row], (0, 0))
+                    if links < cls.TOP_K or score > lowest:
+                        affected.add(ids[row])
+
+            links = []
+            for pk in affected:
+                row = matrix.positions.get(pk)
+                if row is not None:
+                    links.extend(cls._top(ids, row, matrix.scores(row)))
+            RelatedArticle.objects.filter(article_id__in=affected).delete()
+            RelatedArticle.objects.bulk_create(links, batch_size=1000)
+        ArticleCache.invalidate()
+        # Cached pages of the articles whose lists changed; see PageCache.
+        QueryCache.invalidate(*(QueryCache.pk_tag(Article, pk) for pk in affected))
+
+    @classmethod
+    def schedule_update(cls, article_id):
+        _update_executor.submit(cls._run_update, article_id)
+
+    @classmethod
+    def _run_update(cls, article_id):
+        # Runs on the update worker, so it manages its own DB connection
+        # and may wait for another process's update to finish.
+        while not cache.add(cls.LOCK_KEY, 1, timeout=cls.LOCK_TIMEOUT):
+            time.sleep(cls.LOCK_WAIT)
+        try:
+            cls.update(article_id)
+        except Exception:
+            logger.exception('Failed to update related articles of article %s', article_id)
+        finally:
+            cache.delete(cls.LOCK_KEY)
+            close_old_connections()
+
+    @staticmethod
+    def for_article(article, limit=3):
+        '''The article's stored neighbours that are still published, best first.'''
+        return Article.objects.published().filter(
+            linked_from__article=article
+        ).order_by('linked_from__rank')[:limit]
@@ -0,0 +1,153 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import F
+
+from ..models import Article, ArticleVisitorSketch
+from ..utils.hyperloglog import HyperLogLog
+
+logger = logging.getLogger(__name__)
+
+
+class ArticleViewCounter:
+    '''
+    Counts article views in memory and writes them to the database in batches.
+
+    Each view bumps an in-process counter and the visitor's HyperLogLog
+    register for the article; nothing touches the database on the request
+    path. Once FLUSH_INTERVAL seconds have passed or FLUSH_THRESHOLD views
+    are pending, the request that notices it flushes the buffer: view counts
+    are added with F() increments (no read-modify-write race between
+    processes) and the pending registers are merged into each article's
+    stored sketch under a row lock.
+
+    A failed flush puts its counts back into the buffer, and the buffer is
+    flushed at interpreter exit, so views are only lost if a process is
+    killed outright.
+    '''
+    FLUSH_INTERVAL = 30
+    FLUSH_THRESHOLD = 500
+
+    _lock = threading.Lock()
+    _pending_views = Counter()
+    # article id -> {register index: rank}, the sparse part of a sketch.
+    _pending_registers = defaultdict(dict)
+    _pending_total = 0
+    _last_flush = time.monotonic()
+
+    @staticmethod
+    def visitor_key(request, ip_address):
+        if request.user.is_authenticated:
+            return 'user:{}'.format(request.user.pk)
+        return 'ip:{}'.format(ip_address)
+
+    @classmethod
+    def record_view(cls, article_id, visitor):
+        index, rank = HyperLogLog.position(visitor)
+
+        with cls._lock:
+            cls._pending_views[article_id] += 1
+            registers = cls._pending_registers[article_id]
+            if rank > registers.get(index, 0):
+                registers[index] = rank
+
+            cls._pending_total += 1
+            flush_due = (
+                cls._pending_total >= cls.FLUSH_THRESHOLD
+                or time.monotonic() - cls._last_flush >= cls.FLUSH_INTERVAL
+            )
+
+        if flush_due:
+            cls.flush()
+
+    @classmethod
+    def _take_pending(cls):
+        with cls._lock:
+            views, registers = cls._pending_views, cls._pending_registers
+            cls._pending_views = Counter()
+            cls._pending_registers = defaultdict(dict)
+            cls._pending_total = 0
+            cls._last_flush = time.monotonic()
+        return views, registers
+
+    @classmethod
+    def _restore_pending(cls, views, registers):
+        with cls._lock:
+            cls._pending_views.update(views)
+            cls._pending_total += sum(views.values())
+            for article_id, article_registers in registers.items():
+                pending = cls._pending_registers[article_id]
+                for index, rank in article_registers.items():
+                    if rank > pending.get(index, 0):
+                        pending[index] = rank
+
+    @classmethod
+    def flush(cls):
+        views, registers = cls._take_pending()
+        if not views:
+            return
+
+        try:
+            with transaction.atomic():
+                cls._write_view_counts(views)
+                cls._write_sketches(registers)
+        except Exception:
+            logger.exception('Failed to flush %s buffered article views', sum(views.values()))
+            cls._restore_pending(views, registers)
+
+    @staticmethod
+    def _write_view_counts(views):
+        # Articles with the same number of pending views share one UPDATE.
+        by_increment = defaultdict(list)
+        for article_id, increment in views.items():
+            by_increment[increment].append(article_id)
+
+        for increment, article_ids in by_increment.items():
+            Article.objects.filter(pk__in=article_ids).update(
+                view_count=F('view_count') + increment
+            )
+
+    @staticmethod
+    def _write_sketches(registers):
+        article_ids = list(registers)
+
+        # Make sure every article has a sketch row before locking them;
+        # ignore_conflicts covers another process creating one first.
+        existing = set(ArticleVisitorSketch.objects.filter(
+            article_id__in=article_ids
+        ).values_list('article_id', flat=True))
+        ArticleVisitorSketch.objects.bulk_create(
+            [
+                ArticleVisitorSketch(
+                    article_id=article_id,
+                    registers=HyperLogLog().to_bytes()
+                )
+                for article_id in article_ids
+                if article_id not in existing
+            ],
+            ignore_conflicts=True
+        )
+
+        # Lock in a fixed order, so two flushing processes cannot each hold
+        # a row the other is waiting for.
+        sketches = list(ArticleVisitorSketch.objects.select_for_update().filter(
+            article_id__in=article_ids
+        ).order_by('article_id'))
+        estimates = []
+        for sketch in sketches:
+            hll = HyperLogLog(sketch.registers)
+            for index, rank in registers[sketch.article_id].items():
+                if rank > hll.registers[index]:
+                    hll.registers[index] = rank
+            sketch.registers = hll.to_bytes()
+            estimates.append(Article(pk=sketch.article_id, unique_visitors=hll.count()))
+
+        ArticleVisitorSketch.objects.bulk_update(sketches, ['registers'])
+        Article.objects.bulk_update(estimates, ['unique_visitors'])
+
+
+atexit.register(ArticleViewCounter.flush)
@@ -0,0 +1,72 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from home_module.services.query_cache import QueryCache
+from .models import ARTICLE_CREATION_QUOTA, Article, Comment
+from .services.article_cache import ArticleCache
+from .services.article_search import ArticleInvertedIndex
+from .services.comment_counter import ArticleCommentCounter
+from .services.related_articles import RelatedArticles
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_deleted_comment(sender, instance, **kwargs):
+    # Also runs for replies removed by a cascading delete.
+    if instance.is_approved:
+        ArticleCommentCounter.adjust(instance.article_id, -1)
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def invalidate_article_search_index(sender, **kwargs):
+    ArticleInvertedIndex.invalidate()
+
+
+@receiver(pre_save, sender=Article)
+def remember_article_status(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        instance._saved_status = None
+        return
+    instance._saved_status = Article.objects.filter(
+        pk=instance.pk
+    ).values_list('status', flat=True).first()
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def invalidate_article_cache(sender, instance, **kwargs):
+    QueryCache.invalidate_on_commit(QueryCache.instance_tag(instance))
+
+    # Drafts and articles under review appear on no shared page, so only
+    # entering or leaving the published set, or changing a published
+    # article, drops every cached list, feed and page.
+    statuses = {instance.status, instance.__dict__.pop('_saved_status', None)}
+    if Article.PUBLISHED in statuses:
+        transaction.on_commit(ArticleCache.invalidate)
+    elif Article.SCHEDULED in statuses:
+        # Cache entries must not outlive the next publication.
+        transaction.on_commit(ArticleCache.forget_next_publication)
+
+
+@receiver(post_save, sender=Article)
+def update_related_articles(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not set(update_fields) & RelatedArticles.TRACKED_FIELDS:
+        return
+    transaction.on_commit(lambda: RelatedArticles.schedule_update(instance.pk))
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def update_article_creation_quota(sender, instance, created=False, **kwargs):
+    # Only once committed, so a rolled-back create costs no quota.
+    if created:
+        transaction.on_commit(
+            lambda: ARTICLE_CREATION_QUOTA.record(instance.author_id, instance.created_at)
+        )
+    else:
+        # A rejection or deletion can give the author their quota back, and
+        # un-rejecting takes it again; reload from the database next time.
+        transaction.on_commit(lambda: ARTICLE_CREATION_QUOTA.reset(instance.author_id))
@@ -1,3 +1,57 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
 from django.test import TestCase
+from django.urls import reverse
+
+from .models import Article
+from .services.article_cache import ArticleCache
+from .services.related_articles import RelatedArticles
+
+
+class ArticleCacheInvalidationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        caches['tiered'].clear()
+        # Neighbour updates run on a worker thread outside the test's
+        # transaction.
+        patcher = mock.patch.object(RelatedArticles, 'schedule_update')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.author = get_user_model().objects.create_user(
+            username='writer', email='writer@example.com', password='secret'
+        )
+        self.article = self.create_article('Care', Article.PUBLISHED)
+        self.draft = self.create_article('Draft', Article.DRAFT)
+
+    def create_article(self, title, status):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Article.objects.create(
+                title=title, summary='Summary', content='Content', author=self.author, status=status
+            )
+
+    def save(self, article, **fields):
+        for name, value in fields.items():
+            setattr(article, name, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            article.save()
+
+    def test_draft_save_keeps_cache_and_not_modified(self):
+        url = reverse('article_module:detail', kwargs={'slug': self.article.slug})
+        etag = self.client.get(url)['ETag']
+        version = ArticleCache.version()
+
+        self.save(self.draft, title='Draft, revised')
+        self.save(self.draft, status=Article.PENDING)
+
+        self.assertEqual(ArticleCache.version(), version)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
 
-# Create your tests here.
+    def test_publication_events_drop_cache(self):
+        for fields in ({'status': Article.PUBLISHED}, {'title': 'Published, revised'},
+                       {'status': Article.REJECTED}):
+            version = ArticleCache.version()
+            self.save(self.draft, **fields)
+            self.assertNotEqual(ArticleCache.version(), version, fields)
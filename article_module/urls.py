@@ -13,4 +13,5 @@ urlpatterns = [
     path('<slug:slug>/', views.ArticleDetailView.as_view(), name='detail'),
     path('<slug:slug>/edit/', views.ArticleUpdateView.as_view(), name='update'),
     path('<slug:article_slug>/comment/', views.add_comment, name='add_comment'),
+    path('<slug:article_slug>/comments/<int:comment_id>/replies/', views.comment_replies, name='comment_replies'),
 ]
\ No newline at end of file
@@ -0,0 +1,63 @@
+import hashlib
+import math
+
+
+class HyperLogLog:
+    '''
+    A HyperLogLog sketch for estimating the number of distinct items.
+
+    With PRECISION = 12 the sketch is 4096 one-byte registers (4KB) no
+    matter how many items are added, and the estimate is typically within
+    about 1.6% of the true count. Sketches are merged by taking the
+    register-wise maximum, so partial sketches built in different places
+    can be combined without double counting.
+    '''
+    PRECISION = 12
+    REGISTER_COUNT = 1 << PRECISION
+    HASH_BITS = 64
+
+    def __init__(self, registers=None):
+        if registers is None:
+            self.registers = bytearray(self.REGISTER_COUNT)
+        else:
+            if len(registers) != self.REGISTER_COUNT:
+                raise ValueError('A sketch must have exactly {} registers.'.format(self.REGISTER_COUNT))
+            self.registers = bytearray(registers)
+
+    @classmethod
+    def position(cls, item):
+        '''Returns the (register index, rank) pair an item maps to.'''
+        digest = hashlib.blake2b(item.encode(), digest_size=8).digest()
+        value = int.from_bytes(digest, 'big')
+
+        index = value >> (cls.HASH_BITS - cls.PRECISION)
+        remaining_bits = cls.HASH_BITS - cls.PRECISION
+        remainder = value & ((1 << remaining_bits) - 1)
+        # Rank is the position of the first set bit in the remaining bits.
+        rank = remaining_bits - remainder.bit_length() + 1
+        return index, rank
+
+    def add(self, item):
+        index, rank = self.position(item)
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, registers):
+        '''Folds another sketch's registers into this one.'''
+        self.registers = bytearray(map(max, self.registers, registers))
+
+    def count(self):
+        m = self.REGISTER_COUNT
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -register for register in self.registers)
+
+        # Small cardinalities are estimated much better by linear counting
+        # over the registers that are still empty.
+        empty = self.registers.count(0)
+        if estimate <= 2.5 * m and empty:
+            estimate = m * math.log(m / empty)
+
+        return int(round(estimate))
+
+    def to_bytes(self):
+        return bytes(self.registers)
@@ -0,0 +1,57 @@
+import hashlib
+
+import bleach
+import markdown
+
+
+# Bump this whenever the output of render_markdown changes (new extensions,
+# different allowed tags, ...). Articles compiled by an older version are
+# picked up by the recompile_articles command.
+RENDERER_VERSION = 1
+
+MARKDOWN_EXTENSIONS = [
+    'extra',
+    'sane_lists',
+]
+
+ALLOWED_TAGS = {
+    'a', 'abbr', 'blockquote', 'br', 'code', 'dd', 'del', 'div', 'dl', 'dt',
+    'em', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'img', 'li', 'ol', 'p',
+    'pre', 'span', 'strong', 'sub', 'sup', 'table', 'tbody', 'td', 'tfoot',
+    'th', 'thead', 'tr', 'ul',
+}
+
+ALLOWED_ATTRIBUTES = {
+    'a': ['href', 'title', 'rel'],
+    'abbr': ['title'],
+    'img': ['src', 'alt', 'title'],
+    'td': ['align'],
+    'th': ['align'],
+}
+
+ALLOWED_PROTOCOLS = {
+    'http',
+    'https',
+    'mailto',
+}
+
+
+def content_hash(source):
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def render_markdown(source):
+    '''
+    Compiles Markdown to HTML that is safe to output with |safe.
+
+    This is a pure function of its input (no database or settings access),
+    so recompile_articles can run it in worker processes.
+    '''
+    html = markdown.markdown(source, extensions=MARKDOWN_EXTENSIONS)
+    return bleach.clean(
+        html,
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        protocols=ALLOWED_PROTOCOLS,
+        strip=True,
+    )
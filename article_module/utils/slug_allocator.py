@@ -0,0 +1,36 @@
+from django.db.models import Q
+from django.utils.text import slugify
+
+
+def base_slug(title):
+    return slugify(title) or 'article'
+
+
+def allocate_slugs(queryset, titles):
+    '''
+    Returns a unique slug for each title, numbering duplicates as
+    base, base-1, base-2, ... The slugs already taken in `queryset` are
+    read with a single prefix query for the whole batch, and two titles of
+    the same batch never get the same slug either.
+    '''
+    bases = [base_slug(title) for title in titles]
+
+    prefixes = Q()
+    for base in set(bases):
+        prefixes |= Q(slug__startswith=base)
+    taken = set(queryset.filter(prefixes).values_list('slug', flat=True))
+
+    next_counter = {}
+    slugs = []
+    for base in bases:
+        counter = next_counter.get(base, 0)
+        slug = base if counter == 0 else f'{base}-{counter}'
+        while slug in taken:
+            counter += 1
+            slug = f'{base}-{counter}'
+
+        taken.add(slug)
+        next_counter[base] = counter + 1
+        slugs.append(slug)
+
+    return slugs
@@ -4,7 +4,8 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse_lazy, reverse
-from django.db.models import Q, Count
+from django.db import transaction
+from django.db.models import Count
 from django.core.paginator import Paginator
 from django.http import JsonResponse, Http404
 from django.views.decorators.http import require_POST
@@ -13,10 +14,20 @@ from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 
 from account_module.utils.ip_retriever import get_client_ip
-from .models import Article, Comment, ArticleView
+from home_module.services.page_cache import PageCache, cache_anonymous_page
+from home_module.services.page_validators import PageValidators, conditional_page
+from home_module.services.query_cache import QueryCache
+from .models import Article, Comment, RelatedArticle
+from .services.article_cache import ArticleCache
+from .services.comment_counter import ArticleCommentCounter
+from .services.article_search import ArticleSearch
+from .services.comment_tree import CommentTree
+from .services.related_articles import RelatedArticles
+from .services.view_counter import ArticleViewCounter
 from .forms import ArticleForm, CommentForm, ArticleSearchForm
 
 
+@method_decorator(cache_anonymous_page, name='dispatch')
 class ArticleListView(ListView):
     model = Article
     template_name = 'article_module/article_list.html'
@@ -24,29 +35,83 @@ class ArticleListView(ListView):
     paginate_by = 9
 
     def get_queryset(self):
+        PageCache.tag(self.request, QueryCache.model_tag(Article))
+
         # Temporarily show all articles for debugging
         if self.request.user.is_staff:
             queryset = Article.objects.all().select_related('author')
         else:
             queryset = Article.objects.published().select_related('author')
 
-        query = self.request.GET.get('query')
+        query = self.request.GET.get('query', '').strip()
         if query:
-            queryset = queryset.filter(
-                Q(title__icontains=query) |
-                Q(content__icontains=query) |
-                Q(summary__icontains=query)
-            )
+            return ArticleSearch.search(queryset, query)
 
         return queryset.order_by('-publish_date')
 
+    def paginate_queryset(self, queryset, page_size):
+        if self.request.user.is_staff or self.request.GET.get('query', '').strip():
+            return super().paginate_queryset(queryset, page_size)
+
+        # The published list only changes at publication events, so whole
+        # pages are cached until then; see ArticleCache.
+        page_number = self.request.GET.get(self.page_kwarg) or 1
+        return ArticleCache.get_or_set(
+            ArticleCache.key('list', page_size, page_number),
+            lambda: self.paginate_for_cache(queryset, page_size)
+        )
+
+    def paginate_for_cache(self, queryset, page_size):
+        paginator, page, object_list, is_paginated = super().paginate_queryset(
+            queryset, page_size
+        )
+        page.object_list = list(object_list)
+        # Count the pages now and drop the queryset, so that pickling the
+        # paginator does not load every article. num_pages and count are
+        # cached properties, so reading them stores the results on the
+        # paginator.
+        paginator.num_pages  # noqa: B018 - fills the cached count, do not remove
+        paginator.object_list = []
+        return paginator, page, page.object_list, is_paginated
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['search_form'] = ArticleSearchForm(self.request.GET)
-        context['query'] = self.request.GET.get('query', '')
+        context['query'] = self.request.GET.get('query', '').strip()
+        if context['query']:
+            ArticleSearch.attach_snippets(context['articles'], context['query'])
         return context
 
 
+@PageCache.side_effect
+def record_article_view(request, article_id):
+    # Views are buffered in memory and written in batches; see
+    # ArticleViewCounter.
+    visitor = ArticleViewCounter.visitor_key(request, get_client_ip(request))
+    ArticleViewCounter.record_view(article_id, visitor)
+
+
+def article_detail_etag(request, slug):
+    article = Article.objects.published().filter(slug=slug).values('pk', 'updated_at').first()
+    if article is None:
+        return None
+
+    related_ids = [
+        related.pk for related in ArticleDetailView.related_articles(Article(pk=article['pk']))
+    ]
+
+    PageValidators.on_not_modified(request, record_article_view, article['pk'])
+    # The tags the page is cached under: comments bump the article's,
+    # RelatedArticles the tags of articles whose lists changed.
+    return PageValidators.etag(request, [article['pk'], article['updated_at'], *related_ids], tags=[
+        QueryCache.pk_tag(Article, article['pk']),
+        QueryCache.model_tag(RelatedArticle),
+        *(QueryCache.pk_tag(Article, related_id) for related_id in related_ids),
+    ])
+
+
+@method_decorator(conditional_page(article_detail_etag), name='dispatch')
+@method_decorator(cache_anonymous_page, name='dispatch')
 class ArticleDetailView(DetailView):
     model = Article
     template_name = 'article_module/article_detail.html'
@@ -57,41 +122,51 @@ class ArticleDetailView(DetailView):
 
     def get_object(self, queryset=None):
         article = super().get_object(queryset)
-
-        # Track article view - unique per IP address
-        ip_address = get_client_ip(self.request)
-        view, created = ArticleView.objects.get_or_create(
-            article=article,
-            ip_address=ip_address,
-            defaults={'user': self.request.user if self.request.user.is_authenticated else None}
-        )
-
-        if created:
-            Article.objects.filter(pk=article.pk).update(view_count=article.view_count + 1)
-
+        PageCache.perform(self.request, record_article_view, article.pk)
         return article
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        article = self.get_object()
-
-        # Get approved comments with replies
-        comments = Comment.objects.filter(
-            article=article,
-            is_approved=True,
-            parent=None
-        ).select_related('author').prefetch_related('replies__author').order_by('-created_at')
+        article = self.object
 
-        context['comments'] = comments
+        # A page of comment threads with their replies, in one query
+        context['comments'] = CommentTree.page(
+            article,
+            self.request.GET.get('comments_page')
+        )
         context['comment_form'] = CommentForm()
 
-        # Get related articles
-        context['related_articles'] = Article.objects.published().exclude(
-            pk=article.pk
-        ).order_by('-publish_date')[:3]
+        context['related_articles'] = self.related_articles(article)
+
+        # Comments and related articles bump the article's tag when they
+        # change; see home_module.signals and RelatedArticles.
+        PageCache.tag(
+            self.request,
+            QueryCache.instance_tag(article),
+            QueryCache.model_tag(RelatedArticle),
+            *(QueryCache.instance_tag(related) for related in context['related_articles'])
+        )
 
         return context
 
+    @classmethod
+    def related_articles(cls, article):
+        return ArticleCache.get_or_set(
+            ArticleCache.key('related', article.pk),
+            lambda: cls.get_related_articles(article)
+        )
+
+    @staticmethod
+    def get_related_articles(article):
+        # Content-similar articles, precomputed by RelatedArticles; the
+        # newest articles stand in until the article's neighbours exist.
+        related_articles = list(RelatedArticles.for_article(article))
+        if not related_articles:
+            related_articles = list(Article.objects.published().exclude(
+                pk=article.pk
+            ).order_by('-publish_date')[:3])
+        return related_articles
+
 
 class ArticleCreateView(LoginRequiredMixin, CreateView):
     model = Article
@@ -99,7 +174,8 @@ class ArticleCreateView(LoginRequiredMixin, CreateView):
     template_name = 'article_module/article_create.html'
 
     def dispatch(self, request, *args, **kwargs):
-        if not Article.can_user_create_article(request.user):
+        self.can_create = Article.can_user_create_article(request.user)
+        if not self.can_create:
             messages.error(
                 request,
                 _('You can only create one article per 24 hours. Please try again later.')
@@ -109,7 +185,7 @@ class ArticleCreateView(LoginRequiredMixin, CreateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['can_create'] = Article.can_user_create_article(self.request.user)
+        context['can_create'] = self.can_create
         return context
 
     def form_valid(self, form):
@@ -189,11 +265,16 @@ def add_comment(request, article_slug):
                         article=article,
                         is_approved=True
                     )
+                    if parent_comment.depth >= Comment.MAX_DEPTH:
+                        parent_comment = parent_comment.parent
                     comment.parent = parent_comment
                 except Comment.DoesNotExist:
                     pass
 
-            comment.save()
+            with transaction.atomic():
+                comment.save()
+                if comment.is_approved:
+                    ArticleCommentCounter.adjust(article.pk, 1)
             messages.success(request, _('Comment added successfully!'))
         else:
             messages.error(request, _('Please check your comment and try again.'))
@@ -201,29 +282,47 @@ def add_comment(request, article_slug):
     return redirect('article_module:detail', slug=article_slug)
 
 
+def comment_replies(request, article_slug, comment_id):
+    '''Renders the next slice of a comment branch that was cut off on the page.'''
+    comment = get_object_or_404(
+        Comment.objects.filter(article__in=Article.objects.published()),
+        pk=comment_id,
+        article__slug=article_slug,
+        is_approved=True,
+    )
+
+    context = {
+        'article': comment.article,
+        'comments': CommentTree.branch(comment),
+    }
+    return render(request, 'article_module/comment_branch.html', context)
+
+
 def article_search(request):
     form = ArticleSearchForm(request.GET)
     articles = []
     query = ''
 
     if form.is_valid():
-        query = form.cleaned_data.get('query')
+        query = form.cleaned_data.get('query', '').strip()
         if query:
-            articles = Article.objects.published().filter(
-                Q(title__icontains=query) |
-                Q(content__icontains=query) |
-                Q(summary__icontains=query)
-            ).select_related('author').order_by('-publish_date')
+            articles = ArticleSearch.search(
+                Article.objects.published().select_related('author'),
+                query
+            )
 
     paginator = Paginator(articles, 9)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    if query:
+        ArticleSearch.attach_snippets(page_obj, query)
 
     context = {
         'articles': page_obj,
         'search_form': form,
         'query': query,
         'page_obj': page_obj,
+        'is_paginated': page_obj.has_other_pages(),
     }
 
-    return render(request, 'article_module/article_search.html', context)
\ No newline at end of file
+    return render(request, 'article_module/article_list.html', context)
\ No newline at end of file
@@ -1,8 +1,10 @@
 from django.contrib import admin
+from django.db.models import Q
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse
-from .models import ChatRoom, ChatMessage
+from .models import ChatRoom, ChatMessage, ChatAttachment
+from .services.message_search import ChatMessageSearch
 
 
 @admin.register(ChatRoom)
@@ -12,6 +14,7 @@ class ChatRoomAdmin(admin.ModelAdmin):
         'title',
         'user',
         'get_user_email',
+        'assigned_to',
         'is_active',
         'message_count',
         'last_activity',
@@ -19,6 +22,7 @@ class ChatRoomAdmin(admin.ModelAdmin):
     ]
     list_filter = [
         'is_active',
+        'assigned_to',
         'created_at',
         'last_activity',
     ]
@@ -33,12 +37,14 @@ class ChatRoomAdmin(admin.ModelAdmin):
     ]
     raw_id_fields = [
         'user',
+        'assigned_to',
     ]
     fieldsets = (
         (None, {
             'fields': (
                 'user',
                 'title',
+                'assigned_to',
                 'is_active',
             )
         }),
@@ -97,8 +103,9 @@ class ChatMessageAdmin(admin.ModelAdmin):
         'created_at',
         'author__is_staff',
     ]
+    # Message content is matched separately in get_search_results so it
+    # goes through the full-text index instead of an icontains scan.
     search_fields = [
-        'content',
         'author__email',
         'room__title',
     ]
@@ -108,6 +115,7 @@ class ChatMessageAdmin(admin.ModelAdmin):
     raw_id_fields = [
         'room',
         'author',
+        'attachment',
     ]
     fieldsets = (
         (None, {
@@ -115,6 +123,7 @@ class ChatMessageAdmin(admin.ModelAdmin):
                 'room',
                 'author',
                 'content',
+                'attachment',
             )
         }),
         (_('Status'), {
@@ -130,6 +139,18 @@ class ChatMessageAdmin(admin.ModelAdmin):
         'mark_as_unread',
     ]
 
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(
+            request, queryset, search_term
+        )
+        if search_term:
+            content_matches = ChatMessageSearch.filter(queryset, search_term)
+            results = queryset.filter(
+                Q(pk__in=results.values('pk')) |
+                Q(pk__in=content_matches.values('pk'))
+            )
+        return results, may_have_duplicates
+
     def get_message_preview(self, obj):
         return obj.content[:50] + '...' if len(obj.content) > 50 else obj.content
     get_message_preview.short_description = _('Message')
@@ -148,4 +169,37 @@ class ChatMessageAdmin(admin.ModelAdmin):
     def mark_as_unread(self, request, queryset):
         updated = queryset.update(is_read=False)
         self.message_user(request, f'{updated} messages marked as unread.')
-    mark_as_unread.short_description = _('Mark selected messages as unread')
\ No newline at end of file
+    mark_as_unread.short_description = _('Mark selected messages as unread')
+
+
+@admin.register(ChatAttachment)
+class ChatAttachmentAdmin(admin.ModelAdmin):
+
+    list_display = [
+        'original_name',
+        'room',
+        'uploaded_by',
+        'content_type',
+        'size',
+        'is_complete',
+        'created_at',
+    ]
+    list_filter = [
+        'is_complete',
+        'content_type',
+        'created_at',
+    ]
+    search_fields = [
+        'original_name',
+        'uploaded_by__email',
+        'room__title',
+    ]
+    readonly_fields = [
+        'size',
+        'content_type',
+        'created_at',
+    ]
+    raw_id_fields = [
+        'room',
+        'uploaded_by',
+    ]
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class ChatModuleConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'chat_module'
-    verbose_name = 'Chat Module'
\ No newline at end of file
+    verbose_name = 'Chat Module'
+
+    def ready(self):
+        from . import signals  # noqa: F401
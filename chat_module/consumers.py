@@ -2,7 +2,13 @@ import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
-from .models import ChatRoom, ChatMessage
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext_lazy as _
+from .models import ChatAttachment, ChatMessage
+from .services.attachment_upload import ChatAttachmentUpload
+from .services.connection_context import ChatConnectionContext
+from .services.staff_dashboard import StaffDashboard
+from .services.staff_presence import StaffPresence
 
 User = get_user_model()
 
@@ -14,7 +20,12 @@ class ChatConsumer(AsyncWebsocketConsumer):
         self.room_group_name = f'chat_room_{self.room_id}'
         self.user = self.scope['user']
 
-        if not await self.user_can_access_room():
+        # Resolve the room and the user's permissions once; every later
+        # frame on this socket reuses the context.
+        self.context = await database_sync_to_async(ChatConnectionContext.resolve)(
+            self.user, self.room_id
+        )
+        if not self.context.can_access_room:
             await self.close()
             return
 
@@ -23,6 +34,12 @@ class ChatConsumer(AsyncWebsocketConsumer):
             self.channel_name
         )
 
+        if self.user.is_staff:
+            await database_sync_to_async(StaffPresence.heartbeat)(self.user.pk)
+
+        # The attachment currently being uploaded on this socket, if any.
+        self.upload = None
+
         await self.accept()
 
     async def disconnect(self, close_code):
@@ -31,12 +48,23 @@ class ChatConsumer(AsyncWebsocketConsumer):
             self.channel_name
         )
 
-    async def receive(self, text_data):
+        if getattr(self, 'upload', None) is not None:
+            await database_sync_to_async(ChatAttachmentUpload.discard)(
+                self.upload['id']
+            )
+
+    async def receive(self, text_data=None, bytes_data=None):
         '''
         Handles messages received from the WebSocket.
-        It can process two types of messages: 'message' for chat content
-        and 'typing' for sending typing indicators.
+        Text frames are JSON: 'message' for chat content, 'typing' for typing
+        indicators, 'heartbeat' to keep a staff member online while the
+        room is open, and 'attachment_start' / 'attachment_finish' around an
+        image upload. Binary frames carry the chunks of that upload.
         '''
+        if bytes_data is not None:
+            await self.receive_attachment_chunk(bytes_data)
+            return
+
         try:
             text_data_json = json.loads(text_data)
             message_type = text_data_json.get('type', 'message')
@@ -48,16 +76,19 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
                     await self.channel_layer.group_send(
                         self.room_group_name,
-                        {
-                            'type': 'chat_message',
-                            'message': message,
-                            'author_email': self.user.email,
-                            'author_avatar': self.user.avatar.url if hasattr(self.user, 'avatar') and self.user.avatar else '',
-                            'created_at': chat_message.created_at.strftime('%H:%M'),
-                            'is_staff': self.user.is_staff,
-                        }
+                        self.context.message_event(chat_message)
                     )
 
+            elif message_type == 'attachment_start':
+                await self.start_attachment(text_data_json)
+
+            elif message_type == 'attachment_finish':
+                await self.finish_attachment(text_data_json.get('caption', ''))
+
+            elif message_type == 'heartbeat':
+                if self.user.is_staff:
+                    await database_sync_to_async(StaffPresence.heartbeat)(self.user.pk)
+
             elif message_type == 'typing':
                 await self.channel_layer.group_send(
                     self.room_group_name,
@@ -81,6 +112,15 @@ class ChatConsumer(AsyncWebsocketConsumer):
             'author_avatar': event['author_avatar'],
             'created_at': event['created_at'],
             'is_staff': event['is_staff'],
+            'attachment': event.get('attachment'),
+        }))
+
+    async def attachment_thumbnail(self, event):
+        '''Tells the client that an attachment's thumbnail is ready.'''
+        await self.send(text_data=json.dumps({
+            'type': 'attachment_thumbnail',
+            'attachment_id': event['attachment_id'],
+            'thumbnail_url': event['thumbnail_url'],
         }))
 
     async def typing_indicator(self, event):
@@ -91,28 +131,154 @@ class ChatConsumer(AsyncWebsocketConsumer):
             'is_typing': event['is_typing'],
         }))
 
-    @database_sync_to_async
-    def user_can_access_room(self):
-        '''
-        Checks if the current user has permission to access the chat room.
-        A user can access if they are the room's owner or a staff member.
-        '''
-        try:
-            room = ChatRoom.objects.get(id=self.room_id)
-            return room.user == self.user or self.user.is_staff
-        except ChatRoom.DoesNotExist:
-            return False
-
     @database_sync_to_async
     def save_message(self, content):
         '''
         Saves a new chat message to the database.
-        This is run in a sync-to-async wrapper because it performs DB operations.
+        The room id comes from the connection context, so no room lookup
+        is needed per message.
         '''
-        room = ChatRoom.objects.get(id=self.room_id)
-        message = ChatMessage.objects.create(
-            room=room,
+        return ChatMessage.objects.create(
+            room_id=self.context.room_id,
             author=self.user,
             content=content
         )
-        return message
\ No newline at end of file
+
+    async def start_attachment(self, data):
+        if self.upload is not None:
+            await database_sync_to_async(ChatAttachmentUpload.discard)(
+                self.upload['id']
+            )
+            self.upload = None
+
+        try:
+            attachment = await database_sync_to_async(ChatAttachmentUpload.start)(
+                self.user,
+                self.context.room_id,
+                data.get('name', ''),
+                data.get('size'),
+                data.get('content_type', ''),
+            )
+        except ValidationError as e:
+            await self.send_attachment_error(e)
+            return
+
+        self.upload = {
+            'id': attachment.pk,
+            'size': attachment.size,
+            'received': 0,
+        }
+        await self.send(text_data=json.dumps({
+            'type': 'attachment_ready',
+            'attachment_id': attachment.pk,
+            'chunk_size': ChatAttachmentUpload.CHUNK_SIZE,
+        }))
+
+    async def receive_attachment_chunk(self, chunk):
+        if self.upload is None:
+            return
+
+        try:
+            self.upload['received'] = await database_sync_to_async(
+                ChatAttachmentUpload.append_chunk
+            )(
+                self.upload['id'],
+                self.upload['received'],
+                self.upload['size'],
+                chunk,
+            )
+        except ValidationError as e:
+            await database_sync_to_async(ChatAttachmentUpload.discard)(
+                self.upload['id']
+            )
+            self.upload = None
+            await self.send_attachment_error(e)
+
+    async def finish_attachment(self, caption):
+        if self.upload is None:
+            return
+
+        upload, self.upload = self.upload, None
+        try:
+            chat_message = await database_sync_to_async(ChatAttachmentUpload.finish)(
+                upload['id'],
+                self.user,
+                caption.strip(),
+            )
+        except (ValidationError, ChatAttachment.DoesNotExist) as e:
+            await self.send_attachment_error(e)
+            return
+
+        await self.channel_layer.group_send(
+            self.room_group_name,
+            self.context.message_event(chat_message)
+        )
+
+    async def send_attachment_error(self, error):
+        if isinstance(error, ValidationError):
+            message = ' '.join(str(m) for m in error.messages)
+        else:
+            message = str(_('The attachment upload was not found.'))
+        await self.send(text_data=json.dumps({
+            'type': 'attachment_error',
+            'error': message,
+        }))
+
+
+
+class StaffDashboardConsumer(AsyncWebsocketConsumer):
+    '''
+    Streams room-level updates to the staff chat list, so the list is
+    rendered once and then kept current without polling.
+
+    The socket also carries the staff member's presence: it heartbeats on
+    connect and whenever the page sends {'type': 'heartbeat'}.
+    '''
+
+    async def connect(self):
+        self.user = self.scope['user']
+        if not (self.user.is_authenticated and self.user.is_staff):
+            await self.close()
+            return
+
+        self.group_names = [
+            StaffDashboard.GROUP_NAME,
+            StaffDashboard.staff_group_name(self.user.pk),
+        ]
+        for group_name in self.group_names:
+            await self.channel_layer.group_add(group_name, self.channel_name)
+
+        await database_sync_to_async(StaffPresence.heartbeat)(self.user.pk)
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        # Presence is left to expire on its own; another tab of the same
+        # staff member may still be connected.
+        for group_name in getattr(self, 'group_names', []):
+            await self.channel_layer.group_discard(group_name, self.channel_name)
+
+    async def receive(self, text_data):
+        try:
+            data = json.loads(text_data)
+        except json.JSONDecodeError:
+            return
+
+        if data.get('type') == 'heartbeat':
+            await database_sync_to_async(StaffPresence.heartbeat)(self.user.pk)
+
+    async def room_update(self, event):
+        '''Sends a room delta to the dashboard.'''
+        await self.send(text_data=json.dumps({
+            'type': 'room_update',
+            **event['room'],
+        }))
+
+    async def room_counter(self, event):
+        '''Sends the counters of a room routed to another staff member.'''
+        if event['room']['assigned_to_id'] == self.user.pk:
+            # The assignee got the full room_update already.
+            return
+        await self.send(text_data=json.dumps({
+            'type': 'room_counter',
+            **event['room'],
+        }))
@@ -21,6 +21,9 @@ class ChatMessageForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        # ChatMessage.content is blank only for attachment messages, which
+        # are not sent through this form.
+        self.fields['content'].required = True
         self.helper = FormHelper()
         self.helper.form_method = 'post'
         self.helper.form_id = 'chat-message-form'
@@ -51,4 +54,8 @@ class AdminChatMessageForm(forms.ModelForm):
                 'placeholder': _('Quick reply...'),
                 'class': 'w-full',
             })
-        }
\ No newline at end of file
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['content'].required = True
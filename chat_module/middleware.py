@@ -0,0 +1,67 @@
+from channels.auth import AuthMiddleware, get_user
+from channels.db import database_sync_to_async
+from channels.sessions import CookieMiddleware, SessionMiddleware
+from django.contrib.auth import HASH_SESSION_KEY
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare
+
+from account_module.services.user_cache import CachedUserLoader
+
+
+SESSION_USER_CACHE_PREFIX = 'chat_ws_session_auth_'
+SESSION_USER_TTL = 60
+
+
+def session_user_cache_key(session_key):
+    return '{}{}'.format(SESSION_USER_CACHE_PREFIX, session_key)
+
+
+class CachedAuthMiddleware(AuthMiddleware):
+    '''
+    Channels AuthMiddleware that remembers the session -> user lookup.
+
+    The stock middleware loads the session and then the user from the
+    database on every WebSocket connect, so a reconnect storm after a deploy
+    turns into two queries per socket. The user id and session auth hash
+    of an authenticated session are cached per session key for
+    SESSION_USER_TTL seconds, and the user itself comes from
+    CachedUserLoader, which drops it whenever the user is saved. The
+    cached hash is checked against the user's current one, as
+    django.contrib.auth.get_user does, so a password change locks the
+    session out at once. Logging out drops the session entry (see
+    chat_module.signals).
+    '''
+
+    async def resolve_scope(self, scope):
+        session_key = scope['session'].session_key
+        if not session_key:
+            # No session cookie means an anonymous socket; resolving that
+            # never touches the database, so there is nothing to cache.
+            scope['user']._wrapped = await get_user(scope)
+            return
+
+        key = session_user_cache_key(session_key)
+        cached = await cache.aget(key)
+
+        user = None
+        if cached is not None:
+            user_id, session_hash = cached
+            user = await database_sync_to_async(CachedUserLoader.get)(user_id)
+            if user is not None and not constant_time_compare(
+                session_hash, user.get_session_auth_hash()
+            ):
+                # The password changed since the session was cached; let
+                # get_user() handle (and flush) the session.
+                user = None
+
+        if user is None:
+            user = await get_user(scope)
+            if user.is_authenticated:
+                session_hash = await database_sync_to_async(scope['session'].get)(HASH_SESSION_KEY)
+                await cache.aset(key, (user.pk, session_hash), timeout=SESSION_USER_TTL)
+
+        scope['user']._wrapped = user
+
+
+def CachedAuthMiddlewareStack(inner):
+    return CookieMiddleware(SessionMiddleware(CachedAuthMiddleware(inner)))
@@ -0,0 +1,39 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+CONTENT_SEARCH_INDEX = GinIndex(
+    SearchVector('content', config='english'),
+    name='chat_message_content_search',
+)
+
+
+def add_content_search_index(apps, schema_editor):
+    # GIN indexes and to_tsvector() only exist on PostgreSQL. Other backends
+    # skip the index and ChatMessageSearch falls back to icontains.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    ChatMessage = apps.get_model('chat_module', 'ChatMessage')
+    schema_editor.add_index(ChatMessage, CONTENT_SEARCH_INDEX)
+
+
+def remove_content_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    ChatMessage = apps.get_model('chat_module', 'ChatMessage')
+    schema_editor.remove_index(ChatMessage, CONTENT_SEARCH_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat_module', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            add_content_search_index,
+            remove_content_search_index,
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.2 on 2026-10-19 05:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat_module', '0003_chatroom_assigned_to'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='chatmessage',
+            name='content',
+            field=models.TextField(blank=True, verbose_name='Content'),
+        ),
+        migrations.CreateModel(
+            name='ChatAttachment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.ImageField(blank=True, upload_to='chat/attachments/', verbose_name='File')),
+                ('thumbnail', models.ImageField(blank=True, upload_to='chat/thumbnails/', verbose_name='Thumbnail')),
+                ('original_name', models.CharField(max_length=255, verbose_name='Original Name')),
+                ('content_type', models.CharField(max_length=100, verbose_name='Content Type')),
+                ('size', models.PositiveIntegerField(verbose_name='Size')),
+                ('is_complete', models.BooleanField(default=False, verbose_name='Is Complete')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attachments', to='chat_module.chatroom', verbose_name='Room')),
+                ('uploaded_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Uploaded By')),
+            ],
+            options={
+                'verbose_name': 'Chat Attachment',
+                'verbose_name_plural': 'Chat Attachments',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='chatmessage',
+            name='attachment',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='message', to='chat_module.chatattachment', verbose_name='Attachment'),
+        ),
+    ]
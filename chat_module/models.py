@@ -4,6 +4,12 @@ from django.conf import settings
 from django.urls import reverse
 
 
+# Text search configuration shared by the GIN index on message content
+# (see migration 0002) and ChatMessageSearch. Both sides must use the same
+# value, otherwise PostgreSQL cannot use the index.
+MESSAGE_SEARCH_CONFIG = 'english'
+
+
 class ChatRoomManager(models.Manager):
 
     def get_or_create_room(self, user):
@@ -37,6 +43,15 @@ class ChatRoom(models.Model):
         _('Is Active'),
         default=True
     )
+    assigned_to = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        limit_choices_to={'is_staff': True},
+        verbose_name=_('Assigned To'),
+        related_name='assigned_chat_rooms'
+    )
     created_at = models.DateTimeField(
         _('Created At'),
         auto_now_add=True
@@ -74,6 +89,64 @@ class ChatRoom(models.Model):
         ).count()
 
 
+class ChatAttachment(models.Model):
+    '''
+    An image sent in a chat room.
+
+    The row is created when an upload starts and filled in once every chunk
+    has arrived (see ChatAttachmentUpload); the thumbnail is generated later,
+    outside the socket that uploaded the file.
+    '''
+    room = models.ForeignKey(
+        ChatRoom,
+        on_delete=models.CASCADE,
+        related_name='attachments',
+        verbose_name=_('Room')
+    )
+    uploaded_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        verbose_name=_('Uploaded By')
+    )
+    file = models.ImageField(
+        _('File'),
+        upload_to='chat/attachments/',
+        blank=True
+    )
+    thumbnail = models.ImageField(
+        _('Thumbnail'),
+        upload_to='chat/thumbnails/',
+        blank=True
+    )
+    original_name = models.CharField(
+        _('Original Name'),
+        max_length=255
+    )
+    content_type = models.CharField(
+        _('Content Type'),
+        max_length=100
+    )
+    size = models.PositiveIntegerField(
+        _('Size')
+    )
+    is_complete = models.BooleanField(
+        _('Is Complete'),
+        default=False
+    )
+    created_at = models.DateTimeField(
+        _('Created At'),
+        auto_now_add=True
+    )
+
+    class Meta:
+        verbose_name = _('Chat Attachment')
+        verbose_name_plural = _('Chat Attachments')
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f'{self.original_name}'
+
+
 class ChatMessage(models.Model):
 
     room = models.ForeignKey(
@@ -88,7 +161,16 @@ class ChatMessage(models.Model):
         verbose_name=_('Author')
     )
     content = models.TextField(
-        _('Content')
+        _('Content'),
+        blank=True
+    )
+    attachment = models.OneToOneField(
+        ChatAttachment,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='message',
+        verbose_name=_('Attachment')
     )
     is_read = models.BooleanField(
         _('Is Read'),
@@ -111,6 +193,6 @@ class ChatMessage(models.Model):
         # This override ensures that the parent room's `last_activity`
         # is updated whenever a new message is saved.
         super().save(*args, **kwargs)
-        ChatRoom.objects.filter(pk=self.room.pk).update(
+        ChatRoom.objects.filter(pk=self.room_id).update(
             last_activity=self.created_at
         )
\ No newline at end of file
@@ -2,6 +2,10 @@ from django.urls import path
 from . import consumers
 
 websocket_urlpatterns = [
+    path(
+        'ws/chat/dashboard/',
+        consumers.StaffDashboardConsumer.as_asgi(),
+    ),
     path(
         'ws/chat/<int:room_id>/',
         consumers.ChatConsumer.as_asgi(),
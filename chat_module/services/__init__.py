@@ -0,0 +1,2 @@
+# This file is intentionally left blank.
+# It marks the 'services' directory as a Python package.
@@ -0,0 +1,229 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.utils.translation import gettext_lazy as _
+from PIL import Image
+
+from ..models import ChatAttachment, ChatMessage
+
+logger = logging.getLogger(__name__)
+
+# Thumbnails are resized in a small background pool so a large image never
+# holds up the socket (or worker) that finished the upload.
+_thumbnail_executor = ThreadPoolExecutor(
+    max_workers=2,
+    thread_name_prefix='chat-thumbnail'
+)
+
+
+class ChatAttachmentUpload:
+    '''
+    Assembles chat image attachments from chunks sent over the chat socket.
+
+    The client announces the file with its name, size and content type, then
+    sends the bytes as binary WebSocket frames of at most CHUNK_SIZE bytes and
+    finally asks for the upload to be finished. Every chunk is appended
+    straight to a partial file under PARTIAL_DIR, so neither the consumer
+    nor a sync view ever holds the whole file in memory. Finishing checks
+    the size, verifies the image, moves it into storage and creates the
+    ChatMessage that references it; the thumbnail is generated afterwards.
+    '''
+    MAX_SIZE = 10 * 1024 * 1024
+    CHUNK_SIZE = 64 * 1024
+    ALLOWED_CONTENT_TYPES = {
+        'image/jpeg': 'JPEG',
+        'image/png': 'PNG',
+        'image/gif': 'GIF',
+        'image/webp': 'WEBP',
+    }
+    # Stored files are named after the verified type, never after the
+    # client's file name, which is kept in original_name for display.
+    FILE_EXTENSIONS = {
+        'image/jpeg': 'jpg',
+        'image/png': 'png',
+        'image/gif': 'gif',
+        'image/webp': 'webp',
+    }
+    THUMBNAIL_SIZE = (320, 320)
+    PARTIAL_DIR = 'chat/partial'
+
+    @classmethod
+    def partial_path(cls, attachment_id):
+        return os.path.join(
+            settings.MEDIA_ROOT,
+            cls.PARTIAL_DIR,
+            '{}.part'.format(attachment_id)
+        )
+
+    @classmethod
+    def start(cls, user, room_id, name, size, content_type):
+        '''Validates an announced upload and reserves an attachment row.'''
+        if content_type not in cls.ALLOWED_CONTENT_TYPES:
+            raise ValidationError(
+                _('Only JPEG, PNG, GIF and WebP images can be attached.')
+            )
+        if not isinstance(size, int) or size <= 0:
+            raise ValidationError(_('The attachment is empty.'))
+        if size > cls.MAX_SIZE:
+            raise ValidationError(
+                _('Attachments must be no more than 10MB.')
+            )
+
+        attachment = ChatAttachment.objects.create(
+            room_id=room_id,
+            uploaded_by=user,
+            original_name=os.path.basename(name or '')[:255] or 'image',
+            content_type=content_type,
+            size=size,
+        )
+
+        path = cls.partial_path(attachment.pk)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Start from an empty file so a retried upload never appends to
+        # leftovers of an earlier one.
+        open(path, 'wb').close()
+        return attachment
+
+    @classmethod
+    def append_chunk(cls, attachment_id, received, expected_size, chunk):
+        '''
+        Appends one chunk to the partial file and returns the new byte count.
+        The caller tracks how many bytes it has received so far.
+        '''
+        if len(chunk) > cls.CHUNK_SIZE:
+            raise ValidationError(_('Attachment chunk is too large.'))
+        if received + len(chunk) > expected_size:
+            raise ValidationError(
+                _('Received more data than the announced attachment size.')
+            )
+
+        with open(cls.partial_path(attachment_id), 'ab') as partial:
+            partial.write(chunk)
+        return received + len(chunk)
+
+    @classmethod
+    def finish(cls, attachment_id, author, caption=''):
+        '''
+        Turns a fully received upload into a message.
+        Returns the new ChatMessage; raises ValidationError if the file is
+        incomplete or not the image it claimed to be.
+        '''
+        attachment = ChatAttachment.objects.get(pk=attachment_id, is_complete=False)
+        path = cls.partial_path(attachment.pk)
+
+        try:
+            if os.path.getsize(path) != attachment.size:
+                raise ValidationError(_('The attachment upload is incomplete.'))
+            cls._verify_image(path, attachment.content_type)
+
+            with transaction.atomic():
+                with open(path, 'rb') as partial:
+                    attachment.file.save(
+                        '{}.{}'.format(attachment.pk, cls.FILE_EXTENSIONS[attachment.content_type]),
+                        File(partial),
+                        save=False
+                    )
+                attachment.is_complete = True
+                attachment.save(update_fields=['file', 'is_complete'])
+
+                message = ChatMessage.objects.create(
+                    room_id=attachment.room_id,
+                    author=author,
+                    content=caption,
+                    attachment=attachment,
+                )
+                transaction.on_commit(
+                    lambda: cls.schedule_thumbnail(attachment.pk)
+                )
+        except ValidationError:
+            cls.discard(attachment.pk)
+            raise
+        else:
+            os.remove(path)
+
+        return message
+
+    @classmethod
+    def discard(cls, attachment_id):
+        '''Drops an unfinished upload and its partial file.'''
+        ChatAttachment.objects.filter(pk=attachment_id, is_complete=False).delete()
+        try:
+            os.remove(cls.partial_path(attachment_id))
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def _verify_image(cls, path, content_type):
+        try:
+            with Image.open(path) as image:
+                image_format = image.format
+                image.verify()
+        except Exception:
+            raise ValidationError(_('The attachment is not a valid image.'))
+
+        if image_format != cls.ALLOWED_CONTENT_TYPES[content_type]:
+            raise ValidationError(
+                _('The attachment does not match its content type.')
+            )
+
+    @classmethod
+    def schedule_thumbnail(cls, attachment_id):
+        _thumbnail_executor.submit(cls.generate_thumbnail, attachment_id)
+
+    @classmethod
+    def generate_thumbnail(cls, attachment_id):
+        '''
+        Resizes the attachment into its thumbnail and tells the room about it.
+        Runs on the thumbnail pool, so it manages its own DB connection.
+        '''
+        try:
+            attachment = ChatAttachment.objects.filter(pk=attachment_id).first()
+            if attachment is None or not attachment.file:
+                return
+
+            with attachment.file.open('rb') as source, Image.open(source) as image:
+                image.thumbnail(cls.THUMBNAIL_SIZE)
+                if image.mode not in ('RGB', 'L'):
+                    image = image.convert('RGB')
+                buffer = BytesIO()
+                image.save(buffer, format='JPEG', quality=85)
+
+            name = '{}.jpg'.format(os.path.splitext(
+                os.path.basename(attachment.file.name)
+            )[0])
+            attachment.thumbnail.save(name, ContentFile(buffer.getvalue()), save=False)
+            attachment.save(update_fields=['thumbnail'])
+
+            channel_layer = get_channel_layer()
+            if channel_layer is not None:
+                async_to_sync(channel_layer.group_send)(
+                    f'chat_room_{attachment.room_id}',
+                    {
+                        'type': 'attachment_thumbnail',
+                        'attachment_id': attachment.pk,
+                        'thumbnail_url': attachment.thumbnail.url,
+                    }
+                )
+        except Exception:
+            logger.exception('Failed to generate thumbnail for chat attachment %s', attachment_id)
+        finally:
+            close_old_connections()
+
+    @staticmethod
+    def serialize(attachment):
+        '''Builds the attachment part of a chat_message event.'''
+        return {
+            'id': attachment.pk,
+            'url': attachment.file.url,
+            'thumbnail_url': attachment.thumbnail.url if attachment.thumbnail else '',
+            'name': attachment.original_name,
+        }
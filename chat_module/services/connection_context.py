@@ -0,0 +1,70 @@
+from django.core.cache import cache
+
+from ..models import ChatRoom
+from .attachment_upload import ChatAttachmentUpload
+
+
+class ChatConnectionContext:
+    '''
+    Everything a ChatConsumer needs to know about its connection.
+
+    It is resolved once in connect() and then reused for every frame on the
+    socket, so sending a message no longer re-checks or re-fetches the room.
+    Room ownership is cached for a few minutes because it never changes for
+    an existing room (ChatRoom.user is a one-to-one field); deleting a room
+    drops its entry through a post_delete signal.
+    '''
+    ROOM_OWNER_CACHE_PREFIX = 'chat_room_owner_'
+    ROOM_OWNER_TTL = 300
+
+    def __init__(self, user, room_id, room_owner_id):
+        self.user = user
+        self.room_id = room_id
+        self.room_owner_id = room_owner_id
+
+        self.can_access_room = bool(
+            room_owner_id is not None
+            and user.is_authenticated
+            and (user.is_staff or user.pk == room_owner_id)
+        )
+
+    @classmethod
+    def resolve(cls, user, room_id):
+        '''
+        Builds the context for a user connecting to a room.
+        This is a sync method; consumers wrap it in database_sync_to_async.
+        '''
+        return cls(user, room_id, cls.get_room_owner_id(room_id))
+
+    @classmethod
+    def get_room_owner_id(cls, room_id):
+        '''Returns the owner's user id, or None if the room does not exist.'''
+        key = '{}{}'.format(cls.ROOM_OWNER_CACHE_PREFIX, room_id)
+        owner_id = cache.get(key)
+
+        if owner_id is None:
+            owner_id = ChatRoom.objects.filter(pk=room_id).values_list(
+                'user_id', flat=True
+            ).first()
+            if owner_id is not None:
+                cache.set(key, owner_id, timeout=cls.ROOM_OWNER_TTL)
+
+        return owner_id
+
+    @classmethod
+    def forget_room(cls, room_id):
+        cache.delete('{}{}'.format(cls.ROOM_OWNER_CACHE_PREFIX, room_id))
+
+    def message_event(self, message):
+        '''Builds the group_send payload for a message saved on this socket.'''
+        event = {
+            'type': 'chat_message',
+            'message': message.content,
+            'author_email': self.user.email,
+            'author_avatar': self.user.avatar.url if self.user.avatar else '',
+            'created_at': message.created_at.strftime('%H:%M'),
+            'is_staff': self.user.is_staff,
+        }
+        if message.attachment_id:
+            event['attachment'] = ChatAttachmentUpload.serialize(message.attachment)
+        return event
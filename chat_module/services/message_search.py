@@ -0,0 +1,169 @@
+import base64
+import binascii
+import re
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchVector
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from ..models import ChatMessage, MESSAGE_SEARCH_CONFIG
+
+
+class ChatMessageSearch:
+    '''
+    Full-text search over chat message history for staff.
+
+    On PostgreSQL, matching goes through the GIN index on
+    to_tsvector(content) and snippets come from ts_headline. Other backends
+    (SQLite in local runs) fall back to one icontains filter per search term,
+    with snippets cut in Python.
+
+    Results are ordered newest first and paginated with an opaque cursor,
+    so deep pages never pay for an OFFSET or a COUNT.
+    '''
+    PAGE_SIZE = 20
+    SNIPPET_RADIUS = 80
+
+    # Matches are wrapped in these markers first, so the snippet can be
+    # HTML-escaped as a whole before the real <mark> tags are put back in.
+    START_SEL = '[[hl]]'
+    STOP_SEL = '[[/hl]]'
+
+    @staticmethod
+    def uses_full_text(using='default'):
+        return connections[using].vendor == 'postgresql'
+
+    @classmethod
+    def _search_query(cls, query):
+        return SearchQuery(query, config=MESSAGE_SEARCH_CONFIG, search_type='websearch')
+
+    @classmethod
+    def filter(cls, queryset, query):
+        '''Narrows a ChatMessage queryset to messages whose content matches.'''
+        if cls.uses_full_text(queryset.db):
+            # The vector expression must stay identical to the one in the
+            # index migration, otherwise PostgreSQL falls back to a seq scan.
+            return queryset.alias(
+                content_vector=SearchVector('content', config=MESSAGE_SEARCH_CONFIG)
+            ).filter(content_vector=cls._search_query(query))
+
+        for term in query.split():
+            queryset = queryset.filter(content__icontains=term)
+        return queryset
+
+    @classmethod
+    def search(cls, query, cursor=None, page_size=None):
+        '''
+        Returns one page of matches grouped by room.
+
+        Returns:
+            dict: 'groups' is a list of {'room', 'matches'} in the order the
+            rooms first appear on the page; 'next_cursor' is None on the
+            last page.
+        '''
+        page_size = page_size or cls.PAGE_SIZE
+        query = query.strip()
+        if not query:
+            return {'groups': [], 'next_cursor': None}
+
+        messages = cls.filter(
+            ChatMessage.objects.select_related('room__user', 'author'),
+            query
+        )
+
+        position = cls.decode_cursor(cursor) if cursor else None
+        if position:
+            created_at, pk = position
+            messages = messages.filter(
+                Q(created_at__lt=created_at) |
+                Q(created_at=created_at, pk__lt=pk)
+            )
+
+        full_text = cls.uses_full_text(messages.db)
+        if full_text:
+            messages = messages.annotate(
+                headline=SearchHeadline(
+                    'content',
+                    cls._search_query(query),
+                    config=MESSAGE_SEARCH_CONFIG,
+                    start_sel=cls.START_SEL,
+                    stop_sel=cls.STOP_SEL,
+                    max_words=35,
+                    min_words=15,
+                )
+            )
+
+        page = list(messages.order_by('-created_at', '-pk')[:page_size + 1])
+        has_next = len(page) > page_size
+        page = page[:page_size]
+
+        groups = {}
+        for message in page:
+            if full_text:
+                message.snippet = cls._render_snippet(message.headline)
+            else:
+                message.snippet = cls._python_snippet(message.content, query.split())
+
+            group = groups.setdefault(
+                message.room_id,
+                {'room': message.room, 'matches': []}
+            )
+            group['matches'].append(message)
+
+        return {
+            'groups': list(groups.values()),
+            'next_cursor': cls.encode_cursor(page[-1]) if has_next else None,
+        }
+
+    @classmethod
+    def _python_snippet(cls, content, terms):
+        pattern = re.compile(
+            '|'.join(re.escape(term) for term in terms),
+            re.IGNORECASE
+        )
+        match = pattern.search(content)
+        start = max((match.start() if match else 0) - cls.SNIPPET_RADIUS, 0)
+        end = min(start + cls.SNIPPET_RADIUS * 2, len(content))
+
+        window = pattern.sub(
+            lambda m: '{}{}{}'.format(cls.START_SEL, m.group(0), cls.STOP_SEL),
+            content[start:end]
+        )
+        if start > 0:
+            window = '… ' + window
+        if end < len(content):
+            window = window + ' …'
+        return cls._render_snippet(window)
+
+    @classmethod
+    def _render_snippet(cls, text):
+        # Message content is user input, so escape everything and only then
+        # turn the match markers into highlight tags.
+        return mark_safe(
+            escape(text)
+            .replace(escape(cls.START_SEL), '<mark>')
+            .replace(escape(cls.STOP_SEL), '</mark>')
+        )
+
+    @staticmethod
+    def encode_cursor(message):
+        raw = '{}|{}'.format(message.created_at.isoformat(), message.pk)
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
+        '''Returns (created_at, pk), or None for a malformed cursor.'''
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+            created_at, pk = raw.split('|', 1)
+            created_at = parse_datetime(created_at)
+            pk = int(pk)
+        except (ValueError, binascii.Error, UnicodeDecodeError):
+            return None
+
+        if created_at is None:
+            return None
+        return created_at, pk
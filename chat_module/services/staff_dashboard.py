@@ -0,0 +1,117 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db.models import Count, Q
+from django.utils.translation import gettext
+
+from ..models import ChatRoom
+from .staff_presence import StaffPresence
+
+
+class StaffDashboard:
+    '''
+    Pushes room-level deltas to the staff chat list over WebSockets.
+
+    Each change (new message, unread count change, last_activity bump) is
+    computed once and fanned out through the channel layer, instead of every
+    open staff tab reloading the whole list with its search, unread Count
+    and pagination COUNT.
+
+    The full update for a room assigned to an online staff member (with
+    its preview, title and user) goes only to that member's group. The
+    other dashboards get a room_counter event with just the unread count,
+    activity time and assignee, which updates a row they already show
+    and never adds one. Unassigned rooms, and rooms whose assignee is
+    offline, send the full update to the shared group every staff
+    dashboard listens on.
+    '''
+    GROUP_NAME = 'chat_staff_dashboard'
+    PREVIEW_LENGTH = 80
+
+    # The fields of a snapshot sent to dashboards the room is not routed to.
+    COUNTER_FIELDS = ('room_id', 'assigned_to_id', 'unread_count', 'last_activity')
+
+    @staticmethod
+    def staff_group_name(user_id):
+        return 'chat_staff_{}'.format(user_id)
+
+    @classmethod
+    def room_snapshot(cls, room_id):
+        '''Returns the current list-row state of a room, or None if it is gone.'''
+        room = ChatRoom.objects.select_related('user').annotate(
+            unread_count=Count(
+                'messages',
+                filter=Q(
+                    messages__author__is_staff=False,
+                    messages__is_read=False
+                )
+            )
+        ).filter(pk=room_id).first()
+
+        if room is None:
+            return None
+
+        return {
+            'room_id': room.id,
+            'title': room.title,
+            'user_email': room.user.email,
+            'user_avatar': room.user.avatar.url if room.user.avatar else '',
+            'is_active': room.is_active,
+            'assigned_to_id': room.assigned_to_id,
+            'unread_count': room.unread_count,
+            'last_activity': room.last_activity.isoformat(),
+        }
+
+    @classmethod
+    def publish_room(cls, room_id, message=None):
+        '''
+        Sends the room's current state to the staff dashboards; see the
+        class docstring for who gets what. Pass the message that caused the update to include a preview of it.
+        '''
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+
+        snapshot = cls.room_snapshot(room_id)
+        if snapshot is None:
+            return
+
+        if message is not None:
+            # ChatMessage.save bumps last_activity only after post_save has
+            # fired, so take the timestamp from the message itself.
+            snapshot['last_activity'] = message.created_at.isoformat()
+            snapshot['last_message'] = message.content[:cls.PREVIEW_LENGTH]
+            if not snapshot['last_message'] and message.attachment_id:
+                snapshot['last_message'] = gettext('Sent an image')
+
+            if not message.author.is_staff:
+                # A user is waiting on this room, so make sure it belongs
+                # to someone who is actually online.
+                snapshot['assigned_to_id'] = StaffPresence.route_room(
+                    room_id, snapshot['assigned_to_id']
+                )
+
+        assigned_to_id = snapshot['assigned_to_id']
+        if not (assigned_to_id and StaffPresence.is_online(assigned_to_id)):
+            async_to_sync(channel_layer.group_send)(
+                cls.GROUP_NAME,
+                {
+                    'type': 'room_update',
+                    'room': snapshot,
+                }
+            )
+            return
+
+        async_to_sync(channel_layer.group_send)(
+            cls.staff_group_name(assigned_to_id),
+            {
+                'type': 'room_update',
+                'room': snapshot,
+            }
+        )
+        async_to_sync(channel_layer.group_send)(
+            cls.GROUP_NAME,
+            {
+                'type': 'room_counter',
+                'room': {field: snapshot[field] for field in cls.COUNTER_FIELDS},
+            }
+        )
@@ -0,0 +1,101 @@
+import time
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from ..models import ChatRoom
+
+
+class StaffPresence:
+    '''
+    Tracks which staff members are online and routes rooms to them.
+
+    Presence lives entirely in the cache: every staff socket refreshes a
+    per-user key on connect and on each heartbeat, and the key expires
+    PRESENCE_TTL seconds after the last one. Nothing is written on
+    disconnect, so a staff member with several tabs stays online until the
+    last tab stops sending heartbeats.
+
+    A roster key remembers which staff ids have been seen, because the cache
+    cannot be asked for "all keys with this prefix". Ids whose presence key
+    has expired are pruned from the roster when it is read.
+    '''
+    PRESENCE_CACHE_PREFIX = 'chat_staff_presence_'
+    ROSTER_CACHE_KEY = 'chat_staff_presence_roster'
+    PRESENCE_TTL = 60
+    HEARTBEAT_INTERVAL = 20
+
+    @classmethod
+    def _presence_key(cls, user_id):
+        return '{}{}'.format(cls.PRESENCE_CACHE_PREFIX, user_id)
+
+    @classmethod
+    def heartbeat(cls, user_id):
+        cache.set(cls._presence_key(user_id), time.time(), timeout=cls.PRESENCE_TTL)
+
+        roster = cache.get(cls.ROSTER_CACHE_KEY) or set()
+        if user_id not in roster:
+            # Not atomic, but a lost update only drops an id until that
+            # staff member's next heartbeat re-adds it.
+            roster.add(user_id)
+            cache.set(cls.ROSTER_CACHE_KEY, roster, timeout=None)
+
+    @classmethod
+    def is_online(cls, user_id):
+        return cache.get(cls._presence_key(user_id)) is not None
+
+    @classmethod
+    def online_staff_ids(cls):
+        roster = cache.get(cls.ROSTER_CACHE_KEY) or set()
+        if not roster:
+            return set()
+
+        seen = cache.get_many([cls._presence_key(user_id) for user_id in roster])
+        online = {
+            user_id for user_id in roster
+            if cls._presence_key(user_id) in seen
+        }
+
+        if online != roster:
+            cache.set(cls.ROSTER_CACHE_KEY, online, timeout=None)
+        return online
+
+    @classmethod
+    def least_loaded_staff_id(cls):
+        '''
+        Returns the online staff member with the fewest active assigned
+        rooms, or None if no staff member is online.
+        '''
+        online = cls.online_staff_ids()
+        if not online:
+            return None
+
+        loads = dict.fromkeys(online, 0)
+        loads.update(
+            ChatRoom.objects.filter(
+                is_active=True,
+                assigned_to__in=online
+            ).values_list('assigned_to').annotate(room_count=Count('id'))
+        )
+        # Ties go to the lowest id so routing is deterministic.
+        return min(loads, key=lambda user_id: (loads[user_id], user_id))
+
+    @classmethod
+    def route_room(cls, room_id, assigned_to_id=None):
+        '''
+        Makes sure the room is owned by an online staff member.
+
+        The current assignee keeps the room while they are online; otherwise
+        it moves to the least loaded online staff member. If nobody is
+        online the assignment is left as it is. Returns the assignee's id.
+        '''
+        if assigned_to_id and cls.is_online(assigned_to_id):
+            return assigned_to_id
+
+        staff_id = cls.least_loaded_staff_id()
+        if staff_id is None:
+            return assigned_to_id
+
+        if staff_id != assigned_to_id:
+            ChatRoom.objects.filter(pk=room_id).update(assigned_to=staff_id)
+        return staff_id
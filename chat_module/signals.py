@@ -0,0 +1,41 @@
+from django.contrib.auth.signals import user_logged_out
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .middleware import session_user_cache_key
+from .models import ChatMessage, ChatRoom
+from .services.connection_context import ChatConnectionContext
+from .services.staff_dashboard import StaffDashboard
+from .services.staff_presence import StaffPresence
+
+
+@receiver(user_logged_out)
+def forget_websocket_session_user(sender, request, user, **kwargs):
+    # The session is flushed right after this signal, but its old key may
+    # still be cached by CachedAuthMiddleware for a reconnecting socket.
+    session_key = getattr(getattr(request, 'session', None), 'session_key', None)
+    if session_key:
+        cache.delete(session_user_cache_key(session_key))
+
+
+@receiver(post_delete, sender=ChatRoom)
+def forget_room_owner(sender, instance, **kwargs):
+    ChatConnectionContext.forget_room(instance.pk)
+
+
+@receiver(post_save, sender=ChatRoom)
+def route_new_room_to_staff(sender, instance, created, **kwargs):
+    if created and instance.assigned_to_id is None:
+        transaction.on_commit(
+            lambda: StaffPresence.route_room(instance.pk)
+        )
+
+
+@receiver(post_save, sender=ChatMessage)
+def publish_new_message_to_staff(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(
+            lambda: StaffDashboard.publish_room(instance.room_id, message=instance)
+        )
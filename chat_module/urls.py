@@ -24,6 +24,11 @@ urlpatterns = [
         views.admin_chat_list,
         name='admin_list',
     ),
+    path(
+        'admin/search/',
+        views.admin_chat_search,
+        name='admin_search',
+    ),
     path(
         'admin/room/<int:room_id>/',
         views.admin_chat_room,
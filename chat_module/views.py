@@ -13,6 +13,8 @@ import json
 
 from .models import ChatRoom, ChatMessage
 from .forms import ChatMessageForm, AdminChatMessageForm
+from .services.message_search import ChatMessageSearch
+from .services.staff_dashboard import StaffDashboard
 
 
 @login_required
@@ -51,7 +53,7 @@ def user_chat_room(request):
     else:
         form = ChatMessageForm()
 
-    messages_list = room.messages.select_related('author').order_by('created_at')
+    messages_list = room.messages.select_related('author', 'attachment').order_by('created_at')
     paginator = Paginator(messages_list, 50)
     page_number = request.GET.get('page', paginator.num_pages)
     messages_page = paginator.get_page(page_number)
@@ -99,6 +101,23 @@ def admin_chat_list(request):
     return render(request, 'chat_module/admin_chat_list.html', context)
 
 
+@staff_member_required
+def admin_chat_search(request):
+    '''Full-text search over message history, grouped by room.'''
+    query = request.GET.get('q', '').strip()
+    cursor = request.GET.get('cursor', '')
+
+    results = ChatMessageSearch.search(query, cursor=cursor)
+
+    context = {
+        'query': query,
+        'groups': results['groups'],
+        'next_cursor': results['next_cursor'],
+        'is_first_page': not cursor,
+    }
+    return render(request, 'chat_module/admin_chat_search.html', context)
+
+
 @staff_member_required
 def admin_chat_room(request, room_id):
     '''Admin interface for a specific chat room.'''
@@ -130,12 +149,14 @@ def admin_chat_room(request, room_id):
         form = AdminChatMessageForm()
 
     # Mark messages from the user as read upon admin opening the chat.
-    room.messages.filter(
+    marked_read = room.messages.filter(
         author__is_staff=False,
         is_read=False
     ).update(is_read=True)
+    if marked_read:
+        StaffDashboard.publish_room(room.id)
 
-    messages_list = room.messages.select_related('author').order_by('created_at')
+    messages_list = room.messages.select_related('author', 'attachment').order_by('created_at')
     paginator = Paginator(messages_list, 50)
     page_number = request.GET.get('page', paginator.num_pages)
     messages_page = paginator.get_page(page_number)
@@ -162,11 +183,13 @@ def mark_messages_read(request):
 
         # Based on the user type, mark the other party's messages as read.
         if request.user.is_staff:
-            ChatMessage.objects.filter(
+            marked_read = ChatMessage.objects.filter(
                 room_id=room_id,
                 author__is_staff=False,
                 is_read=False
             ).update(is_read=True)
+            if marked_read:
+                StaffDashboard.publish_room(room_id)
         else:
             ChatMessage.objects.filter(
                 room_id=room_id,
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class HomeModuleConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'home_module'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,120 @@
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Max
+from django.urls import reverse
+from django.utils.feedgenerator import rfc2822_date, rfc3339_date
+
+from article_module.models import Article
+
+
+class ArticleFeed:
+    '''
+    The newest published articles as RSS 2.0 or Atom, written item by item
+    so that the response can be streamed.
+    '''
+    SIZE = 50
+
+    @staticmethod
+    def last_modified():
+        return Article.objects.published().aggregate(
+            last_modified=Max('updated_at')
+        )['last_modified']
+
+    @classmethod
+    def items(cls):
+        return Article.objects.published().order_by('-publish_date').values_list(
+            'title',
+            'slug',
+            'summary',
+            'content_html',
+            'publish_date',
+            'updated_at',
+            'author__username',
+        )[:cls.SIZE].iterator(chunk_size=cls.SIZE)
+
+    @classmethod
+    def rss(cls, base_url, last_modified):
+        feed_url = base_url + reverse('article_feed_rss')
+        yield (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">\n'
+            '<channel>\n'
+            '<title>{title}</title>\n'
+            '<link>{link}</link>\n'
+            '<description>{title}</description>\n'
+            '<atom:link href="{feed_url}" rel="self"/>\n'
+            '<lastBuildDate>{updated}</lastBuildDate>\n'
+        ).format(
+            title=escape(settings.SITE_NAME),
+            link=escape(base_url + reverse('article_module:list')),
+            feed_url=escape(feed_url),
+            updated=rfc2822_date(last_modified),
+        )
+
+        for title, slug, summary, _, published, _, username in cls.items():
+            link = escape(base_url + reverse('article_module:detail', kwargs={'slug': slug}))
+            yield (
+                '<item>'
+                '<title>{}</title>'
+                '<link>{}</link>'
+                '<guid>{}</guid>'
+                '<description>{}</description>'
+                '<author>{}</author>'
+                '<pubDate>{}</pubDate>'
+                '</item>\n'
+            ).format(
+                escape(title),
+                link,
+                link,
+                escape(summary),
+                # RSS wants an email here; use the site's, never the author's.
+                escape('{} ({})'.format(settings.DEFAULT_FROM_EMAIL, username or settings.SITE_NAME)),
+                rfc2822_date(published),
+            )
+
+        yield '</channel>\n</rss>\n'
+
+    @classmethod
+    def atom(cls, base_url, last_modified):
+        feed_url = base_url + reverse('article_feed_atom')
+        yield (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+            '<title>{title}</title>\n'
+            '<link href="{link}" rel="alternate"/>\n'
+            '<link href="{feed_url}" rel="self"/>\n'
+            '<id>{feed_url}</id>\n'
+            '<updated>{updated}</updated>\n'
+        ).format(
+            title=escape(settings.SITE_NAME),
+            link=escape(base_url + reverse('article_module:list')),
+            feed_url=escape(feed_url),
+            updated=rfc3339_date(last_modified),
+        )
+
+        for title, slug, summary, content_html, published, updated, username in cls.items():
+            link = escape(base_url + reverse('article_module:detail', kwargs={'slug': slug}))
+            yield (
+                '<entry>'
+                '<title>{}</title>'
+                '<link href="{}" rel="alternate"/>'
+                '<id>{}</id>'
+                '<published>{}</published>'
+                '<updated>{}</updated>'
+                '<author><name>{}</name></author>'
+                '<summary>{}</summary>'
+                '<content type="html">{}</content>'
+                '</entry>\n'
+            ).format(
+                escape(title),
+                link,
+                link,
+                rfc3339_date(published),
+                rfc3339_date(updated),
+                escape(username or settings.SITE_NAME),
+                escape(summary),
+                escape(content_html),
+            )
+
+        yield '</feed>\n'
@@ -0,0 +1,187 @@
+import hashlib
+import math
+from functools import wraps
+from urllib.parse import parse_qsl, urlencode
+
+from django.contrib.messages import get_messages
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.translation import get_language
+
+from .query_cache import QueryCache
+
+
+class PageCache:
+    '''
+    Full-page cache for anonymous GET requests.
+
+    Pages are keyed by path, normalized query string and language. While a
+    page renders, its view names the objects it shows with tag(), using
+    QueryCache model and instance tags. The entry stores the versions of
+    those tags, so a save that bumps any of them (see home_module.signals)
+    purges exactly the pages that showed the object. The tags are also
+    sent as a Surrogate-Key header for caches in front of the site. A page
+    that changes at a known time without any save names that time with
+    expires(), and its entry is dropped then.
+
+    Side effects that must happen on every request, such as visit
+    tracking, are run through perform(). It calls them and records the
+    call in the entry, so it is replayed when the page is served from the
+    cache.
+    '''
+    KEY_PREFIX = 'page_cache_'
+    TIMEOUT = 60 * 10
+
+    # Query parameters that never change what a page shows.
+    IGNORED_PARAMETERS = {'fbclid', 'gclid'}
+
+    _side_effects = {}
+
+    @classmethod
+    def side_effect(cls, func):
+        '''Registers a function that perform() may record and replay.'''
+        cls._side_effects['{}.{}'.format(func.__module__, func.__qualname__)] = func
+        return func
+
+    @classmethod
+    def perform(cls, request, func, *args):
+        name = '{}.{}'.format(func.__module__, func.__qualname__)
+        if name not in cls._side_effects:
+            raise ValueError('{} is not registered with PageCache.side_effect'.format(name))
+
+        func(request, *args)
+        effects = getattr(request, '_page_cache_effects', None)
+        if effects is not None:
+            effects.append((name, args))
+
+    @classmethod
+    def tag(cls, request, *tags):
+        page_tags = getattr(request, '_page_cache_tags', None)
+        if page_tags is None:
+            return
+        # Versions are read now rather than when the page is stored, so a
+        # save made while the page renders leaves the entry already stale.
+        new_tags = sorted(set(tags) - set(page_tags))
+        page_tags.update(zip(new_tags, QueryCache.tag_versions(new_tags)))
+
+    @staticmethod
+    def expires(request, when):
+        '''
+        Keeps the page being rendered from being cached past `when`, a
+        datetime at which it changes without any save, such as the start
+        or end of a discount. None means no such time.
+        '''
+        if when is None or not hasattr(request, '_page_cache_tags'):
+            return
+        current = getattr(request, '_page_cache_expires', None)
+        if current is None or when < current:
+            request._page_cache_expires = when
+
+    @classmethod
+    def timeout(cls, request):
+        expires = getattr(request, '_page_cache_expires', None)
+        if expires is None:
+            return cls.TIMEOUT
+        return max(0, min(cls.TIMEOUT, math.ceil((expires - timezone.now()).total_seconds())))
+
+    @classmethod
+    def key(cls, request):
+        parameters = sorted(
+            (name, value)
+            for name, value in parse_qsl(request.META.get('QUERY_STRING', ''), keep_blank_values=True)
+            if name not in cls.IGNORED_PARAMETERS and not name.startswith('utm_')
+        )
+        page = '{}?{}|{}'.format(request.path, urlencode(parameters), get_language())
+        return '{}{}'.format(cls.KEY_PREFIX, hashlib.md5(page.encode()).hexdigest())
+
+    @staticmethod
+    def is_cacheable_request(request):
+        # Pending flash messages would be baked into the page.
+        return (
+            request.method == 'GET'
+            and not request.user.is_authenticated
+            and not len(get_messages(request))
+        )
+
+    @classmethod
+    def is_cacheable_response(cls, request, response):
+        return (
+            response.status_code == 200
+            and cls.timeout(request) > 0
+            and not response.streaming
+            and not response.cookies
+            # A CSRF token in the page needs its cookie, which a cached
+            # copy would not set.
+            and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+            and 'private' not in response.get('Cache-Control', '')
+        )
+
+    @classmethod
+    def get(cls, request):
+        entry = QueryCache.tiered().get(cls.key(request))
+        if entry is None:
+            return None
+
+        tags = list(entry['tags'])
+        if QueryCache.tag_versions(tags) != list(entry['tags'].values()):
+            return None
+        return entry
+
+    @classmethod
+    def store(cls, request, response):
+        entry = {
+            'content': response.content,
+            'headers': dict(response.items()),
+            'tags': request._page_cache_tags,
+            'effects': request._page_cache_effects,
+        }
+        QueryCache.tiered().set(cls.key(request), entry, timeout=cls.timeout(request))
+
+    @classmethod
+    def respond(cls, request, entry):
+        for name, args in entry['effects']:
+            cls._side_effects[name](request, *args)
+
+        response = HttpResponse(entry['content'])
+        for header, value in entry['headers'].items():
+            response[header] = value
+        return response
+
+    @staticmethod
+    def surrogate_key(tags):
+        return ' '.join(sorted(tags))
+
+
+def cache_anonymous_page(view):
+    '''
+    Serves anonymous GETs of a view from PageCache; see there.
+    Use method_decorator(cache_anonymous_page, name='dispatch') on class
+    based views.
+    '''
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not PageCache.is_cacheable_request(request):
+            return view(request, *args, **kwargs)
+
+        entry = PageCache.get(request)
+        if entry is not None:
+            return PageCache.respond(request, entry)
+
+        request._page_cache_tags = {}
+        request._page_cache_effects = []
+        response = view(request, *args, **kwargs)
+
+        def store(response):
+            if request._page_cache_tags:
+                response['Surrogate-Key'] = PageCache.surrogate_key(request._page_cache_tags)
+            if PageCache.is_cacheable_response(request, response):
+                PageCache.store(request, response)
+            return response
+
+        if hasattr(response, 'render') and callable(response.render):
+            response.add_post_render_callback(store)
+        else:
+            store(response)
+        return response
+
+    return wrapper
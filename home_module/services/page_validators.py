@@ -0,0 +1,92 @@
+import hashlib
+from functools import wraps
+
+from django.contrib.messages import get_messages
+from django.utils.translation import get_language
+from django.views.decorators.http import condition
+
+from account_module.services.user_cache import CachedUserLoader
+from .query_cache import QueryCache
+
+
+class PageValidators:
+    '''
+    ETags for pages that are computed without rendering them.
+
+    A page's validators function reads only what decides its content: the
+    updated_at of the object it shows, with one values() query, the ids of
+    the objects listed with it, and the QueryCache versions of the same
+    per-object tags the page is cached under in PageCache (see
+    home_module.signals). Content that changes on a schedule, such as
+    discounts, goes in as the time of its next change. etag() hashes these
+    together with the viewer and language, since the header differs per
+    user.
+
+    No Last-Modified is sent. These pages combine several objects with
+    per-user parts, and a single timestamp cannot describe that without
+    answering 304 to a page that did change.
+    '''
+    # Bump when templates change in a way that browsers holding an older
+    # copy of a page should see.
+    VERSION = 1
+
+    @staticmethod
+    def viewer(request):
+        if not request.user.is_authenticated:
+            return 'anonymous'
+        return '{}.{}'.format(request.user.pk, CachedUserLoader.version(request.user.pk))
+
+    @classmethod
+    def etag(cls, request, parts, tags=()):
+        values = [
+            cls.VERSION,
+            get_language(),
+            cls.viewer(request),
+            *parts,
+            *QueryCache.tag_versions(list(tags)),
+        ]
+        return hashlib.md5('|'.join(map(str, values)).encode()).hexdigest()
+
+    @staticmethod
+    def on_not_modified(request, func, *args):
+        '''
+        Calls `func(request, *args)` if the page is answered with a 304, for
+        side effects such as visit tracking that the skipped view would
+        have performed.
+        '''
+        request._not_modified_effects.append((func, args))
+
+
+def conditional_page(validators):
+    '''
+    Answers conditional GETs with 304 Not Modified before the view runs,
+    using django's condition() with an ETag from
+    `validators(request, *args, **kwargs)`. It should return
+    PageValidators.etag(...), or None to leave the request to the view
+    (for example, to raise a 404).
+
+    Put it outside cache_anonymous_page, so 304s skip the page cache too.
+    Use method_decorator(conditional_page(...), name='dispatch') on class
+    based views.
+    '''
+    def etag(request, *args, **kwargs):
+        # Pending flash messages would be lost in a 304.
+        if request.method not in ('GET', 'HEAD') or len(get_messages(request)):
+            return None
+        return validators(request, *args, **kwargs)
+
+    def decorator(view):
+        conditional_view = condition(etag_func=etag)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            request._not_modified_effects = []
+            response = conditional_view(request, *args, **kwargs)
+            if response.status_code == 304:
+                for func, effect_args in request._not_modified_effects:
+                    func(request, *effect_args)
+            return response
+
+        return wrapper
+
+    return decorator
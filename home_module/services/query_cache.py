@@ -0,0 +1,218 @@
+import hashlib
+import math
+import random
+import time
+from functools import wraps
+
+from django.core.cache import cache, caches
+from django.db import models, transaction
+
+
+class QueryCache:
+    '''
+    Caches query results in the tiered cache, with tag-based invalidation
+    and protection against stampedes.
+
+    Every entry is stored under its name plus the current version of each
+    of its tags. The versions live in the shared default cache, so
+    invalidate(tag) moves every entry carrying that tag to new keys in all
+    processes at once. Per-process copies under the old keys simply age
+    out. Model tags are bumped by post_save/post_delete (see
+    home_module.signals, and article_module.signals for articles); bulk
+    writes that skip signals call invalidate() themselves.
+
+    Two mechanisms keep a popular entry from being rebuilt by many
+    requests at the same moment:
+    - Each entry records how long it took to build. Readers start
+      rebuilding it early with a probability that grows as its expiry
+      approaches (probabilistic early expiration). Entries are kept for
+      STALE_TIMEOUT past their expiry, so while the caller holding a
+      short shared lock rebuilds one, the other readers keep getting
+      the previous value (single flight).
+    - A caller that finds no entry at all and cannot take the lock waits
+      once, for WAIT_INTERVAL, and then builds the value itself. Sync
+      views share one thread under ASGI, so nothing here may block for
+      long.
+    '''
+    KEY_PREFIX = 'query_cache_'
+    TAG_PREFIX = 'query_cache_tag_'
+    LOCK_PREFIX = 'query_cache_lock_'
+    TIMEOUT = 60 * 10
+
+    LOCK_TIMEOUT = 30
+    WAIT_INTERVAL = 0.05
+    STALE_TIMEOUT = 60
+
+    # Larger values start early rebuilds sooner.
+    EARLY_RECOMPUTE_BETA = 1.0
+
+    @staticmethod
+    def tiered():
+        return caches['tiered']
+
+    @staticmethod
+    def model_tag(model):
+        return model._meta.label_lower
+
+    @classmethod
+    def instance_tag(cls, instance):
+        return cls.pk_tag(instance, instance.pk)
+
+    @classmethod
+    def pk_tag(cls, model, pk):
+        return '{}:{}'.format(cls.model_tag(model), pk)
+
+    @classmethod
+    def tag_versions(cls, tags):
+        if not tags:
+            return []
+        keys = ['{}{}'.format(cls.TAG_PREFIX, tag) for tag in tags]
+        versions = cache.get_many(keys)
+        for key in keys:
+            if key not in versions:
+                seed = cls.seed_version()
+                cache.add(key, seed, timeout=None)
+                versions[key] = cache.get(key, seed)
+        return [versions[key] for key in keys]
+
+    @staticmethod
+    def seed_version():
+        # A version key can be evicted like any other. Starting again from
+        # a fixed number would make entries stored under versions already
+        # used valid again, so a missing version restarts from the clock.
+        return time.time_ns()
+
+    @classmethod
+    def invalidate(cls, *tags):
+        for tag in tags:
+            key = '{}{}'.format(cls.TAG_PREFIX, tag)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.add(key, cls.seed_version(), timeout=None)
+
+    @classmethod
+    def invalidate_on_commit(cls, *tags):
+        transaction.on_commit(lambda: cls.invalidate(*tags))
+
+    @classmethod
+    def key(cls, name, tags=()):
+        tags = sorted(set(tags))
+        versions = '_'.join(
+            '{}.{}'.format(tag, version)
+            for tag, version in zip(tags, cls.tag_versions(tags))
+        )
+        return '{}{}_{}'.format(cls.KEY_PREFIX, name, versions)
+
+    @classmethod
+    def _build(cls, key, build, timeout):
+        if callable(timeout):
+            timeout = timeout()
+        timeout = timeout or cls.TIMEOUT
+        started = time.monotonic()
+        value = build()
+        duration = time.monotonic() - started
+        cls.tiered().set(
+            key,
+            (value, duration, time.time() + timeout),
+            timeout=timeout + cls.STALE_TIMEOUT
+        )
+        return value
+
+    @classmethod
+    def _lock(cls, key, timeout):
+        return cache.add('{}{}'.format(cls.LOCK_PREFIX, key), 1, timeout=timeout)
+
+    @classmethod
+    def _unlock(cls, key):
+        cache.delete('{}{}'.format(cls.LOCK_PREFIX, key))
+
+    @classmethod
+    def _build_locked(cls, key, build, timeout):
+        try:
+            return cls._build(key, build, timeout)
+        finally:
+            cls._unlock(key)
+
+    @classmethod
+    def get_or_set(cls, name, build, tags=(), timeout=None):
+        '''
+        Returns the cached result of `build()` for `name` and `tags`,
+        building and caching it if needed. `build` must not return None.
+        `timeout` may be a callable, evaluated only when building.
+        '''
+        key = cls.key(name, tags)
+        entry = cls.tiered().get(key)
+
+        if entry is not None:
+            value, duration, expires_at = entry
+            # -log(random()) is exponentially distributed; the gap it
+            # leaves before expiry scales with the cost of a rebuild.
+            early = duration * cls.EARLY_RECOMPUTE_BETA * -math.log(1.0 - random.random())
+            if time.time() + early < expires_at:
+                return value
+            if cls._lock(key, cls.LOCK_TIMEOUT):
+                return cls._build_locked(key, build, timeout)
+            # Someone else is refreshing it; until then the previous value,
+            # even if just expired, is served.
+            return value
+
+        if cls._lock(key, cls.LOCK_TIMEOUT):
+            return cls._build_locked(key, build, timeout)
+
+        # Nothing to serve yet; give the builder one short chance.
+        time.sleep(cls.WAIT_INTERVAL)
+        entry = cls.tiered().get(key)
+        if entry is not None:
+            return entry[0]
+        return build()
+
+
+def _key_part(value):
+    if isinstance(value, models.Model):
+        return '{}:{}'.format(value._meta.label_lower, value.pk)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        parts = sorted(map(_key_part, value)) if isinstance(value, (set, frozenset)) else map(_key_part, value)
+        return '[{}]'.format(','.join(parts))
+    return repr(value)
+
+
+def cached_query(tags=(), timeout=None, name=None):
+    '''
+    Caches a function's return value with QueryCache, keyed by its
+    arguments. Model instances in the arguments are keyed by their primary
+    key; other arguments by repr(). `tags` are tag names or models.
+
+        @cached_query(tags=[ProductCategory])
+        def root_categories():
+            return list(ProductCategory.objects.filter(parent=None))
+
+    The result must be picklable, so return lists rather than querysets.
+    The wrapped function gets an invalidate() attribute that bumps its tags.
+    '''
+    tag_names = [
+        QueryCache.model_tag(tag) if isinstance(tag, type) else tag
+        for tag in tags
+    ]
+
+    def decorator(func):
+        base_name = name or '{}.{}'.format(func.__module__, func.__qualname__)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            arguments = '{}|{}'.format(
+                _key_part(args),
+                _key_part(sorted(kwargs.items()))
+            )
+            digest = hashlib.md5(arguments.encode()).hexdigest()
+            return QueryCache.get_or_set(
+                '{}_{}'.format(base_name, digest),
+                lambda: func(*args, **kwargs),
+                tags=tag_names,
+                timeout=timeout
+            )
+
+        wrapper.invalidate = lambda: QueryCache.invalidate(*tag_names)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,70 @@
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+
+from account_module.services.user_cache import CachedUserLoader
+from .query_cache import QueryCache
+
+
+class SiteComponents:
+    '''
+    The header, footer and chat launcher shown on every page.
+
+    They used to be sub-views run through render_partial on each request.
+    Now each is rendered once per language and user variant (anonymous,
+    user or staff) and then served from QueryCache. The only truly
+    per-user part, the avatar and name menu in the header, is cached
+    separately under the user's id and CachedUserLoader version, so it
+    changes as soon as the user is saved. It is spliced into the cached
+    header at USER_MENU_SLOT.
+
+    The templates get `user` but no request. They must only use what the
+    variant key covers: is_authenticated and is_staff.
+    '''
+    TIMEOUT = 60 * 60
+    USER_MENU_SLOT = '<!-- site-header-user-menu -->'
+
+    @staticmethod
+    def variant(user):
+        if not user.is_authenticated:
+            return 'anonymous'
+        return 'staff' if user.is_staff else 'user'
+
+    @classmethod
+    def _cached(cls, name, variant, template_name, context):
+        return QueryCache.get_or_set(
+            'site_component_{}_{}_{}'.format(name, get_language(), variant),
+            lambda: render_to_string(template_name, context),
+            timeout=cls.TIMEOUT
+        )
+
+    @classmethod
+    def header(cls, user):
+        shell = cls._cached(
+            'header',
+            cls.variant(user),
+            'site_header_component.html',
+            {'user': user, 'user_menu': mark_safe(cls.USER_MENU_SLOT)}
+        )
+        if not user.is_authenticated:
+            return mark_safe(shell)
+
+        user_menu = cls._cached(
+            'user_menu',
+            '{}_{}'.format(user.pk, CachedUserLoader.version(user.pk)),
+            'site_header_user_menu.html',
+            {'user': user}
+        )
+        return mark_safe(shell.replace(cls.USER_MENU_SLOT, user_menu))
+
+    @classmethod
+    def footer(cls, user):
+        return mark_safe(cls._cached(
+            'footer', cls.variant(user), 'site_footer_component.html', {'user': user}
+        ))
+
+    @classmethod
+    def chat_launcher(cls, user):
+        return mark_safe(cls._cached(
+            'chat_launcher', cls.variant(user), 'chat_launcher_component.html', {'user': user}
+        ))
@@ -0,0 +1,119 @@
+from itertools import islice
+from xml.sax.saxutils import escape
+
+from django.db.models import ExpressionWrapper, F, IntegerField, Max
+from django.urls import reverse
+
+from article_module.models import Article
+from product_module.models import Product, ProductCategory
+
+
+class SitemapSection:
+    '''
+    One kind of page in the sitemap, split into numbered chunks.
+
+    Chunks are fixed primary-key ranges (chunk n holds pks
+    ((n - 1) * CHUNK_SIZE, n * CHUNK_SIZE]), so building one is an indexed
+    range scan rather than an OFFSET, and the chunks that exist are found
+    with a single GROUP BY.
+    '''
+    CHUNK_SIZE = 10000
+    ROWS_PER_WRITE = 500
+
+    def __init__(self, name, queryset, slug_field, url_name):
+        self.name = name
+        self.queryset = queryset
+        self.slug_field = slug_field
+        self.url_name = url_name
+
+    def _range(self, chunk):
+        return self.queryset().filter(
+            pk__gt=(chunk - 1) * self.CHUNK_SIZE,
+            pk__lte=chunk * self.CHUNK_SIZE,
+        )
+
+    def last_modified(self, chunk=None):
+        queryset = self.queryset() if chunk is None else self._range(chunk)
+        return queryset.aggregate(last_modified=Max('updated_at'))['last_modified']
+
+    def chunks(self):
+        '''Returns (chunk number, last modified) for every non-empty chunk.'''
+        return [
+            (row['bucket'] + 1, row['last_modified'])
+            for row in self.queryset().annotate(
+                bucket=ExpressionWrapper(
+                    (F('pk') - 1) / self.CHUNK_SIZE,
+                    output_field=IntegerField()
+                )
+            ).values('bucket').annotate(
+                last_modified=Max('updated_at')
+            ).order_by('bucket')
+        ]
+
+    def entries(self, chunk):
+        '''Yields (path, last modified) for the pages of a chunk.'''
+        rows = self._range(chunk).order_by('pk').values_list(
+            self.slug_field, 'updated_at'
+        ).iterator(chunk_size=2000)
+        for slug, updated_at in rows:
+            yield reverse(self.url_name, kwargs={'slug': slug}), updated_at
+
+
+SITEMAP_SECTIONS = {
+    section.name: section
+    for section in [
+        SitemapSection(
+            'articles',
+            lambda: Article.objects.published(),
+            'slug',
+            'article_module:detail',
+        ),
+        SitemapSection(
+            'products',
+            lambda: Product.objects.filter(is_active=True, is_delete=False),
+            'slug',
+            'product_module:product_detail',
+        ),
+        SitemapSection(
+            'categories',
+            lambda: ProductCategory.objects.filter(is_active=True, is_delete=False),
+            'url_title',
+            'product_module:category_products',
+        ),
+    ]
+}
+
+
+def render_sitemap_index(base_url, sitemaps):
+    '''Yields a sitemap index for (location, last modified) pairs.'''
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    )
+    for location, last_modified in sitemaps:
+        yield '<sitemap><loc>{}</loc><lastmod>{}</lastmod></sitemap>\n'.format(
+            escape(base_url + location),
+            last_modified.isoformat()
+        )
+    yield '</sitemapindex>\n'
+
+
+def render_urlset(base_url, entries):
+    '''Yields a sitemap for (path, last modified) pairs, a few hundred URLs per chunk.'''
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    )
+    entries = iter(entries)
+    while True:
+        batch = list(islice(entries, SitemapSection.ROWS_PER_WRITE))
+        if not batch:
+            break
+        yield ''.join(
+            '<url><loc>{}</loc><lastmod>{}</lastmod></url>\n'.format(
+                escape(base_url + path),
+                last_modified.isoformat()
+            )
+            for path, last_modified in batch
+        )
+    yield '</urlset>\n'
@@ -0,0 +1,62 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from article_module.models import Article, Comment
+from product_module.models import Product, ProductCategory, ProductDiscount
+from .services.query_cache import QueryCache
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductCategory)
+@receiver(post_delete, sender=ProductCategory)
+def invalidate_cached_queries(sender, instance, **kwargs):
+    QueryCache.invalidate_on_commit(
+        QueryCache.model_tag(sender),
+        QueryCache.instance_tag(instance)
+    )
+
+
+@receiver(post_save, sender=Product)
+@receiver(pre_delete, sender=Product)
+def invalidate_product_category_lists(sender, instance, update_fields=None, **kwargs):
+    # Lists of a category's products, such as Catalog.related_products,
+    # carry the category's tag. A save limited to other fields, like a
+    # stock change at checkout, cannot change who is listed. Deletes are
+    # handled before the product's category rows go.
+    if update_fields is not None and not set(update_fields) & {'is_active', 'is_delete'}:
+        return
+    QueryCache.invalidate_on_commit(*(
+        QueryCache.pk_tag(ProductCategory, pk)
+        for pk in instance.category.values_list('pk', flat=True)
+    ))
+
+
+@receiver(m2m_changed, sender=Product.category.through)
+def invalidate_product_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+
+    related_model = Product if reverse else ProductCategory
+    QueryCache.invalidate_on_commit(
+        QueryCache.model_tag(Product),
+        QueryCache.model_tag(ProductCategory),
+        QueryCache.instance_tag(instance),
+        *(QueryCache.pk_tag(related_model, pk) for pk in pk_set or ())
+    )
+
+
+@receiver(post_save, sender=ProductDiscount)
+@receiver(post_delete, sender=ProductDiscount)
+def invalidate_discounted_product(sender, instance, **kwargs):
+    # Discounts change a product's final price.
+    QueryCache.invalidate_on_commit(
+        QueryCache.model_tag(Product),
+        QueryCache.pk_tag(Product, instance.product_id)
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_commented_article(sender, instance, **kwargs):
+    QueryCache.invalidate_on_commit(QueryCache.pk_tag(Article, instance.article_id))
@@ -0,0 +1,21 @@
+from django import template
+
+from ..services.site_components import SiteComponents
+
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def site_header(context):
+    return SiteComponents.header(context['request'].user)
+
+
+@register.simple_tag(takes_context=True)
+def site_footer(context):
+    return SiteComponents.footer(context['request'].user)
+
+
+@register.simple_tag(takes_context=True)
+def chat_launcher(context):
+    return SiteComponents.chat_launcher(context['request'].user)
@@ -1,3 +1,135 @@
-from django.test import TestCase
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache, caches
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+from django.utils import timezone
+
+from .services.page_cache import PageCache, cache_anonymous_page
+from .services.query_cache import QueryCache
+
+
+class CacheTestCase(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        caches['tiered'].clear()
+
+
+class TieredCacheTests(CacheTestCase):
+
+    def test_local_copy_is_served_until_local_timeout(self):
+        tiered = caches['tiered']
+        tiered.set('plant', 'fern', timeout=60)
+        # Another process deleting the key only reaches the shared cache.
+        cache.delete('plant')
+        self.assertEqual(tiered.get('plant'), 'fern')
+
+        later = time.monotonic() + tiered._local_timeout + 1
+        with mock.patch('home_module.utils.tiered_cache.time.monotonic', return_value=later):
+            self.assertIsNone(tiered.get('plant'))
+
+    def test_get_many_reads_local_and_shared_entries(self):
+        tiered = caches['tiered']
+        tiered.set('local', 1, timeout=60)
+        cache.set('shared', 2, timeout=60)
+
+        self.assertEqual(tiered.get_many(['local', 'shared', 'missing']), {'local': 1, 'shared': 2})
+
+        # What came from the shared cache is now held locally too.
+        cache.delete('shared')
+        self.assertEqual(tiered.get_many(['shared']), {'shared': 2})
+
+
+class QueryCacheTests(CacheTestCase):
+
+    def test_get_or_set_builds_once_per_tag_version(self):
+        build = mock.Mock(return_value=['fern'])
+
+        self.assertEqual(QueryCache.get_or_set('plants', build, tags=['plant:1']), ['fern'])
+        self.assertEqual(QueryCache.get_or_set('plants', build, tags=['plant:1']), ['fern'])
+        self.assertEqual(build.call_count, 1)
+
+        QueryCache.invalidate('plant:1')
+        QueryCache.get_or_set('plants', build, tags=['plant:1'])
+        self.assertEqual(build.call_count, 2)
+
+    def test_evicted_tag_version_does_not_start_over(self):
+        [version] = QueryCache.tag_versions(['plant:1'])
+        QueryCache.invalidate('plant:1')
+        cache.delete('{}plant:1'.format(QueryCache.TAG_PREFIX))
+
+        [reseeded] = QueryCache.tag_versions(['plant:1'])
+        self.assertNotIn(reseeded, (version, version + 1))
+
+    def test_expired_entry_is_served_while_another_caller_rebuilds(self):
+        QueryCache.get_or_set('plants', lambda: ['fern'], timeout=10)
+        key = QueryCache.key('plants')
+        self.assertTrue(QueryCache._lock(key, QueryCache.LOCK_TIMEOUT))
+
+        build = mock.Mock(return_value=['moss'])
+        with mock.patch('home_module.services.query_cache.time.time', return_value=time.time() + 11):
+            self.assertEqual(QueryCache.get_or_set('plants', build, timeout=10), ['fern'])
+        build.assert_not_called()
+
+
+visits = []
+
+
+@PageCache.side_effect
+def record_visit(request, plant_id):
+    visits.append(plant_id)
+
+
+@cache_anonymous_page
+def plant_page(request):
+    PageCache.perform(request, record_visit, 1)
+    PageCache.tag(request, 'plant:1')
+    plant_page.renders += 1
+    return HttpResponse('fern')
+
+
+class PageCacheTests(CacheTestCase):
+
+    def setUp(self):
+        super().setUp()
+        visits.clear()
+        plant_page.renders = 0
+
+    def get(self):
+        request = RequestFactory().get('/plants/fern/')
+        request.user = AnonymousUser()
+        return request, plant_page(request)
+
+    def test_page_is_served_from_cache(self):
+        self.get()
+        request, response = self.get()
+        self.assertEqual(response.content, b'fern')
+        self.assertEqual(plant_page.renders, 1)
+        self.assertEqual(response['Surrogate-Key'], 'plant:1')
+
+    def test_tag_bump_purges_page(self):
+        request, response = self.get()
+        self.assertIsNotNone(PageCache.get(request))
+
+        QueryCache.invalidate('plant:1')
+        self.assertIsNone(PageCache.get(request))
+        self.get()
+        self.assertEqual(plant_page.renders, 2)
+
+    def test_side_effects_replay_on_cache_hit(self):
+        self.get()
+        self.get()
+        self.assertEqual(plant_page.renders, 1)
+        self.assertEqual(visits, [1, 1])
+
+    def test_page_is_not_cached_past_expires(self):
+        request, response = self.get()
+        PageCache.expires(request, timezone.now() + timedelta(seconds=30))
+        self.assertEqual(PageCache.timeout(request), 30)
+
+        PageCache.expires(request, timezone.now() - timedelta(seconds=1))
+        self.assertFalse(PageCache.is_cacheable_response(request, response))
@@ -4,4 +4,8 @@ from . import views
 
 urlpatterns = [
     path('', views.indexhome, name='home_page'),
+    path('sitemap.xml', views.sitemap_index, name='sitemap_index'),
+    path('sitemap-<slug:section>-<int:chunk>.xml', views.sitemap_section, name='sitemap_section'),
+    path('feeds/articles/rss/', views.article_feed, {'feed_format': 'rss'}, name='article_feed_rss'),
+    path('feeds/articles/atom/', views.article_feed, {'feed_format': 'atom'}, name='article_feed_atom'),
 ]
\ No newline at end of file
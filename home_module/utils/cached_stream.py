@@ -0,0 +1,86 @@
+import hashlib
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+# Entries are keyed by their Last-Modified time, so a changed document
+# simply gets a new key; this only bounds how long old ones linger.
+STREAM_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def cached_streaming_response(request, cache_key, last_modified, content_type, generate):
+    '''
+    Serves a generated document (sitemap, feed) to crawlers cheaply.
+
+    `cache_key` must change with anything that changes the document besides
+    `last_modified`, such as a version bumped when articles are deleted or
+    unpublished. The validators cover both: the ETag is built from the key
+    and timestamp, and Last-Modified is never earlier than the first time
+    this key was served, so a new version always moves it forward.
+
+    A client whose validators are still current gets a 304. Otherwise the
+    body comes from the cache if this version was built before, or is
+    streamed from `generate()` - an iterator of str chunks - and cached once
+    the stream completes. The site is served over ASGI, where Django reads
+    a synchronous iterator to the end before sending anything, so the
+    chunks are pulled through an async iterator, one sync_to_async call
+    each.
+    '''
+    timestamp = int(last_modified.timestamp()) if last_modified else 0
+    key = '{}_{}'.format(cache_key, timestamp)
+
+    if last_modified:
+        first_served = cache.get_or_set(
+            '{}_first_served'.format(key),
+            lambda: int(time.time()),
+            timeout=STREAM_CACHE_TIMEOUT
+        )
+        timestamp = max(timestamp, first_served)
+        etag = '"{}"'.format(hashlib.md5(key.encode()).hexdigest())
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is not None:
+            return response
+
+    body = cache.get(key)
+    if body is not None:
+        response = HttpResponse(body, content_type=content_type)
+    else:
+        response = StreamingHttpResponse(
+            _stream_into_cache(generate(), key),
+            content_type=content_type
+        )
+
+    if last_modified:
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(timestamp)
+    return response
+
+
+def _next_chunk(chunks):
+    chunk = next(chunks, None)
+    return None if chunk is None else chunk.encode()
+
+
+async def _stream_into_cache(chunks, key):
+    # Every step runs in the thread the view ran in (sync_to_async is
+    # thread sensitive), so server-side cursors opened by `chunks` stay on
+    # their connection.
+    parts = []
+    try:
+        while True:
+            data = await sync_to_async(_next_chunk)(chunks)
+            if data is None:
+                break
+            parts.append(data)
+            yield data
+    finally:
+        await sync_to_async(chunks.close)()
+
+    # Only reached when the whole body was sent, so a client that drops
+    # the connection halfway never leaves a truncated copy behind.
+    await sync_to_async(cache.set)(key, b''.join(parts), timeout=STREAM_CACHE_TIMEOUT)
@@ -0,0 +1,158 @@
+import pickle
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+# Cache handlers are created per thread; like LocMemCache, the local tier
+# lives at module level so that all threads of a process share it.
+_local_caches = {}
+_local_locks = {}
+_missing = object()
+
+
+class TieredCache(BaseCache):
+    '''
+    A cache backend that keeps a small LRU in each process in front of a
+    shared cache.
+
+    LOCATION names the shared cache alias (usually 'default'). Reads are
+    answered from the local LRU when possible and fall through to the
+    shared cache otherwise. Writes go to both. Local entries live for at
+    most LOCAL_TIMEOUT seconds, because deletes in one process cannot
+    reach the LRU of another. Only use this alias for data where that
+    much staleness is acceptable, or whose keys change when the data does
+    (see home_module.services.query_cache). Counters and locks belong in
+    the shared cache itself.
+
+    OPTIONS:
+        LOCAL_MAX_ENTRIES: size of the per-process LRU (default 1000).
+        LOCAL_TIMEOUT: seconds an entry may be served locally (default 5).
+    '''
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._shared_alias = location or 'default'
+        self._local_max_entries = int(options.get('LOCAL_MAX_ENTRIES', 1000))
+        self._local_timeout = float(options.get('LOCAL_TIMEOUT', 5))
+        self._local = _local_caches.setdefault(self._shared_alias, OrderedDict())
+        self._lock = _local_locks.setdefault(self._shared_alias, Lock())
+
+    @property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    def _timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    # The local LRU holds pickled values, so callers never share (and
+    # mutate) one object, and an expiry time for each key.
+
+    def _local_get(self, key):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires_at, pickled = entry
+            if expires_at <= time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+        return pickled
+
+    def _local_set(self, key, value, timeout):
+        local_timeout = self._local_timeout
+        if timeout is not None:
+            if timeout <= 0:
+                self._local_delete(key)
+                return
+            local_timeout = min(local_timeout, timeout)
+
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        with self._lock:
+            self._local[key] = (time.monotonic() + local_timeout, pickled)
+            self._local.move_to_end(key)
+            while len(self._local) > self._local_max_entries:
+                self._local.popitem(last=False)
+
+    def _local_delete(self, key):
+        with self._lock:
+            return self._local.pop(key, None) is not None
+
+    def get(self, key, default=None, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        pickled = self._local_get(local_key)
+        if pickled is not None:
+            return pickle.loads(pickled)
+
+        value = self.shared.get(key, _missing, version=version)
+        if value is _missing:
+            return default
+        self._local_set(local_key, value, None)
+        return value
+
+    def get_many(self, keys, version=None):
+        found = {}
+        remote_keys = []
+        for key in keys:
+            pickled = self._local_get(self.make_and_validate_key(key, version=version))
+            if pickled is not None:
+                found[key] = pickle.loads(pickled)
+            else:
+                remote_keys.append(key)
+
+        if remote_keys:
+            remote = self.shared.get_many(remote_keys, version=version)
+            for key, value in remote.items():
+                self._local_set(self.make_key(key, version=version), value, None)
+            found.update(remote)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        self.shared.set(key, value, timeout=timeout, version=version)
+        self._local_set(self.make_and_validate_key(key, version=version), value, timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        failed = self.shared.set_many(data, timeout=timeout, version=version)
+        for key, value in data.items():
+            if key not in failed:
+                self._local_set(self.make_and_validate_key(key, version=version), value, timeout)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        added = self.shared.add(key, value, timeout=timeout, version=version)
+        if added:
+            self._local_set(self.make_and_validate_key(key, version=version), value, timeout)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout=self._timeout(timeout), version=version)
+
+    def delete(self, key, version=None):
+        self._local_delete(self.make_and_validate_key(key, version=version))
+        return self.shared.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self._local_delete(self.make_and_validate_key(key, version=version))
+        self.shared.delete_many(keys, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self._local_delete(self.make_and_validate_key(key, version=version))
+        return self.shared.incr(key, delta, version=version)
+
+    def has_key(self, key, version=None):
+        return self.get(key, _missing, version=version) is not _missing
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+        self.shared.clear()
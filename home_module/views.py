@@ -1,16 +1,89 @@
+from django.http import Http404
 from django.shortcuts import render
+from django.urls import reverse
+
+from article_module.services.article_cache import ArticleCache
+from .services.article_feed import ArticleFeed
+from .services.page_cache import cache_anonymous_page
+from .services.sitemap import SITEMAP_SECTIONS, render_sitemap_index, render_urlset
+from .utils.cached_stream import cached_streaming_response
+
+
+SITEMAP_CONTENT_TYPE = 'application/xml; charset=utf-8'
 
 
 # Create your views here.
 
 
+@cache_anonymous_page
 def indexhome(request):
     return render(request, 'home_module/index.html')
 
 
-def site_header_component(request):
-    return render(request, 'site_header_component.html')
+def sitemap_index(request):
+    base_url = request.build_absolute_uri('/')[:-1]
+    last_modified = max(
+        filter(None, (section.last_modified() for section in SITEMAP_SECTIONS.values())),
+        default=None
+    )
+
+    def generate():
+        sitemaps = [
+            (
+                reverse('sitemap_section', kwargs={'section': name, 'chunk': chunk}),
+                chunk_last_modified
+            )
+            for name, section in SITEMAP_SECTIONS.items()
+            for chunk, chunk_last_modified in section.chunks()
+        ]
+        return render_sitemap_index(base_url, sitemaps)
+
+    # Deleted articles do not move max(updated_at); the article cache
+    # version does change, so it is part of the key.
+    return cached_streaming_response(
+        request,
+        'sitemap_index_{}_{}'.format(base_url, ArticleCache.version()),
+        last_modified,
+        SITEMAP_CONTENT_TYPE,
+        generate
+    )
+
+
+def sitemap_section(request, section, chunk):
+    sitemap = SITEMAP_SECTIONS.get(section)
+    if sitemap is None or chunk < 1:
+        raise Http404
+
+    last_modified = sitemap.last_modified(chunk)
+    if last_modified is None:
+        raise Http404
+
+    base_url = request.build_absolute_uri('/')[:-1]
+    version = ArticleCache.version() if section == 'articles' else 0
+    return cached_streaming_response(
+        request,
+        'sitemap_{}_{}_{}_{}'.format(base_url, section, chunk, version),
+        last_modified,
+        SITEMAP_CONTENT_TYPE,
+        lambda: render_urlset(base_url, sitemap.entries(chunk))
+    )
+
+
+def article_feed(request, feed_format):
+    last_modified = ArticleFeed.last_modified()
+    if last_modified is None:
+        raise Http404
 
+    base_url = request.build_absolute_uri('/')[:-1]
+    if feed_format == 'atom':
+        generate, content_type = ArticleFeed.atom, 'application/atom+xml; charset=utf-8'
+    else:
+        generate, content_type = ArticleFeed.rss, 'application/rss+xml; charset=utf-8'
 
-def site_footer_component(request):
-    return render(request, 'site_footer_component.html')
\ No newline at end of file
+    return cached_streaming_response(
+        request,
+        'article_feed_{}_{}_{}'.format(feed_format, base_url, ArticleCache.version()),
+        last_modified,
+        content_type,
+        lambda: generate(base_url, last_modified)
+    )
@@ -5,6 +5,7 @@ from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Row, Column, Div, Submit, Field
 
 from .models import Product, ProductCategory, CartItem, Order, ProductDiscount
+from .services.catalog import Catalog
 
 
 class AddToCartForm(forms.ModelForm):
@@ -109,8 +110,56 @@ class CheckoutForm(forms.ModelForm):
         )
 
 
+class CachedCategoryIterator(forms.models.ModelChoiceIterator):
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for category in self.field.categories():
+            yield self.choice(category)
+
+    def __len__(self):
+        return len(self.field.categories()) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self.field.categories())
+
+
+class CachedCategoryChoiceField(forms.ModelChoiceField):
+    '''
+    A category choice field whose choices and validation come from
+    Catalog.active_categories() instead of querying the queryset, so a
+    filtered listing costs no category queries while the list is cached.
+    '''
+    iterator = CachedCategoryIterator
+
+    def __deepcopy__(self, memo):
+        result = super().__deepcopy__(memo)
+        result._categories = None
+        return result
+
+    def categories(self):
+        # Fetched once per form, however often it is iterated.
+        if getattr(self, '_categories', None) is None:
+            self._categories = Catalog.active_categories()
+        return self._categories
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        if isinstance(value, ProductCategory):
+            value = value.pk
+        for category in self.categories():
+            if str(category.pk) == str(value):
+                return category
+        raise ValidationError(
+            self.error_messages['invalid_choice'],
+            code='invalid_choice',
+            params={'value': value},
+        )
+
+
 class ProductFilterForm(forms.Form):
-    category = forms.ModelChoiceField(
+    category = CachedCategoryChoiceField(
         queryset=ProductCategory.objects.filter(is_active=True, is_delete=False),
         empty_label=_('All Categories'),
         required=False,
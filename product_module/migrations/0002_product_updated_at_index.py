@@ -0,0 +1,17 @@
+# Generated by Django 5.1.2 on 2026-10-19 05:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product_module', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['updated_at'], name='product_mod_updated_4f9a5e_idx'),
+        ),
+    ]
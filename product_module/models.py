@@ -127,6 +127,10 @@ class Product(models.Model):
         ordering = [
             '-created_at',
         ]
+        indexes = [
+            # max(updated_at) for the sitemap's Last-Modified
+            models.Index(fields=['updated_at']),
+        ]
 
     def __str__(self):
         return f'{self.title} - ${self.price}'
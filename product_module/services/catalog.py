@@ -0,0 +1,68 @@
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from home_module.services.query_cache import QueryCache, cached_query
+
+from ..models import Product, ProductCategory, ProductDiscount
+
+
+class Catalog:
+    '''
+    Cached catalog queries. Results are lists, so they can be pickled, and
+    are dropped whenever a product or category changes (see
+    home_module.signals).
+    '''
+
+    @staticmethod
+    @cached_query(tags=[ProductCategory])
+    def active_categories():
+        # Category choices of ProductFilterForm and the sidebar both come
+        # from this one list.
+        return list(
+            ProductCategory.objects.filter(is_active=True, is_delete=False)
+        )
+
+    @staticmethod
+    def root_categories():
+        return [
+            category for category in Catalog.active_categories()
+            if category.parent_id is None
+        ]
+
+    @staticmethod
+    def related_products(product, category_ids=None, limit=4):
+        '''
+        Other active products sharing a category with `product`. Tagged
+        with those categories only, which product saves that can change
+        who is listed bump, so stock changes elsewhere keep the list.
+        '''
+        if category_ids is None:
+            category_ids = list(product.category.values_list('pk', flat=True))
+        return QueryCache.get_or_set(
+            'catalog_related_products_{}_{}'.format(product.pk, limit),
+            lambda: list(
+                Product.objects.filter(
+                    category__in=category_ids,
+                    is_active=True,
+                    is_delete=False
+                ).exclude(id=product.pk).distinct()[:limit]
+            ),
+            tags=[QueryCache.pk_tag(ProductCategory, pk) for pk in category_ids]
+        )
+
+    @staticmethod
+    def next_price_change(product_ids):
+        '''
+        When the next discount of any of the products starts or ends, or
+        None. Prices change then without any save.
+        '''
+        now = timezone.now()
+        changes = ProductDiscount.objects.filter(
+            product_id__in=product_ids,
+            is_active=True
+        ).aggregate(
+            start=Min('start_date', filter=Q(start_date__gt=now)),
+            end=Min('end_date', filter=Q(end_date__gte=now)),
+        )
+        times = [when for when in changes.values() if when is not None]
+        return min(times) if times else None
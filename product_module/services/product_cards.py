@@ -0,0 +1,74 @@
+import math
+
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+
+from home_module.services.page_cache import PageCache
+from home_module.services.query_cache import QueryCache
+from .catalog import Catalog
+
+
+class ProductCards:
+    '''
+    Rendered product cards, cached per product.
+
+    A card is keyed by the product's id and updated_at, the version of its
+    QueryCache tag (which discounts bump, see home_module.signals) and the
+    language, so a card whose product changes is never read again.
+    render() looks up all the cards of a grid with one get_many and only
+    renders the missing ones.
+
+    Discounts also start and end on a schedule, without any save, so cards
+    are kept no longer than PageCache entries, nor past the next discount
+    change of the products rendered with them.
+    '''
+    KEY_PREFIX = 'product_card_'
+    TIMEOUT = PageCache.TIMEOUT
+
+    TEMPLATES = {
+        'card': 'product_module/product_card.html',
+        'compact': 'product_module/product_card_compact.html',
+    }
+
+    @classmethod
+    def timeout(cls, product_ids):
+        change = Catalog.next_price_change(product_ids)
+        if change is None:
+            return cls.TIMEOUT
+        return max(1, min(cls.TIMEOUT, math.ceil((change - timezone.now()).total_seconds())))
+
+    @classmethod
+    def keys(cls, products, variant):
+        versions = QueryCache.tag_versions([QueryCache.instance_tag(product) for product in products])
+        language = get_language()
+        return [
+            '{}{}_{}_{}_{}_{}'.format(
+                cls.KEY_PREFIX, variant, product.pk, product.updated_at.timestamp(), version, language
+            )
+            for product, version in zip(products, versions)
+        ]
+
+    @classmethod
+    def render(cls, products, variant='card'):
+        '''
+        Returns the cards of `products`, in order, as one safe string.
+        '''
+        products = list(products)
+        keys = cls.keys(products, variant)
+        cached = QueryCache.tiered().get_many(keys)
+
+        cards = []
+        rendered = {}
+        for product, key in zip(products, keys):
+            card = cached.get(key)
+            if card is None:
+                card = rendered[key] = render_to_string(cls.TEMPLATES[variant], {'product': product})
+            cards.append(card)
+
+        if rendered:
+            QueryCache.tiered().set_many(rendered, timeout=cls.timeout(
+                [product.pk for product, key in zip(products, keys) if key in rendered]
+            ))
+        return mark_safe(''.join(cards))
@@ -0,0 +1,11 @@
+from django import template
+
+from ..services.product_cards import ProductCards
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def product_cards(products, variant='card'):
+    return ProductCards.render(products, variant)
@@ -1,3 +1,85 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache, caches
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Product, ProductCategory, ProductDiscount, ProductVisit
+
+
+class ProductDetailConditionalGetTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        caches['tiered'].clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            category = ProductCategory.objects.create(title='Ferns', url_title='ferns', is_active=True)
+            other_category = ProductCategory.objects.create(title='Cacti', url_title='cacti', is_active=True)
+            self.product = self.create_product('fern', category)
+            self.related = self.create_product('moss', category)
+            self.unrelated = self.create_product('cactus', other_category)
+        self.url = reverse('product_module:product_detail', kwargs={'slug': 'fern'})
+
+    @staticmethod
+    def create_product(slug, category):
+        product = Product.objects.create(
+            title=slug.title(),
+            slug=slug,
+            price=10,
+            description='A plant',
+            stock_quantity=5
+        )
+        product.category.add(category)
+        return product
+
+    def etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def revalidate(self, etag):
+        return self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code
+
+    def sell(self, product):
+        with self.captureOnCommitCallbacks(execute=True):
+            product.stock_quantity -= 1
+            product.save(update_fields=['stock_quantity', 'updated_at'])
+
+    def test_unchanged_page_is_not_modified(self):
+        etag = self.etag()
+        visits = ProductVisit.objects.count()
+
+        self.assertEqual(self.revalidate(etag), 304)
+        # The visit the skipped view would have recorded.
+        self.assertEqual(ProductVisit.objects.count(), visits + 1)
+
+    def test_unrelated_stock_change_keeps_not_modified(self):
+        etag = self.etag()
+        self.sell(self.unrelated)
+        self.assertEqual(self.revalidate(etag), 304)
+
+    def test_change_to_a_related_product_ends_not_modified(self):
+        etag = self.etag()
+        self.sell(self.related)
+        self.assertEqual(self.revalidate(etag), 200)
+
+    def test_discount_ends_not_modified_when_saved_and_when_it_starts(self):
+        etag = self.etag()
+        start = timezone.now() + timedelta(hours=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductDiscount.objects.create(
+                product=self.product,
+                title='Spring',
+                discount_type='fixed',
+                value=1,
+                start_date=start,
+                end_date=start + timedelta(days=1)
+            )
+        self.assertEqual(self.revalidate(etag), 200)
 
-# Create your tests here.
+        etag = self.etag()
+        self.assertEqual(self.revalidate(etag), 304)
+        with mock.patch('django.utils.timezone.now', return_value=start + timedelta(seconds=1)):
+            self.assertEqual(self.revalidate(etag), 200)
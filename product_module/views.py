@@ -13,6 +13,10 @@ from django.db.models import Q, Count, Avg
 from django.utils import timezone
 from django.db import transaction
 
+from account_module.utils.ip_retriever import get_client_ip
+from home_module.services.page_cache import PageCache, cache_anonymous_page
+from home_module.services.page_validators import PageValidators, conditional_page
+from home_module.services.query_cache import QueryCache
 from .models import (
     Product,
     ProductCategory,
@@ -30,11 +34,14 @@ from .forms import (
     ProductFilterForm,
     ProductDiscountForm,
 )
+from .services.catalog import Catalog
 
 
+@cache_anonymous_page
 def product_list(request):
+    PageCache.tag(request, QueryCache.model_tag(Product), QueryCache.model_tag(ProductCategory))
     products = Product.objects.filter(is_active=True, is_delete=False)
-    categories = ProductCategory.objects.filter(is_active=True, is_delete=False, parent=None)
+    categories = Catalog.root_categories()
 
     # Apply filters
     filter_form = ProductFilterForm(request.GET)
@@ -83,30 +90,65 @@ def product_list(request):
     return render(request, 'product_module/product_list.html', context)
 
 
-def product_detail(request, slug):
-    product = get_object_or_404(Product, slug=slug, is_active=True, is_delete=False)
-
-    # Track product visit for analytics
-    def get_client_ip(request):
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
-
+@PageCache.side_effect
+def track_product_visit(request, product_id):
     ProductVisit.objects.create(
-        product=product,
+        product_id=product_id,
         user=request.user if request.user.is_authenticated else None,
         ip_address=get_client_ip(request),
     )
 
-    # Get related products from same categories
-    related_products = Product.objects.filter(
-        category__in=product.category.all(),
+
+def product_detail_etag(request, slug):
+    rows = list(Product.objects.filter(
+        slug=slug,
         is_active=True,
         is_delete=False
-    ).exclude(id=product.id).distinct()[:4]
+    ).values_list('pk', 'updated_at', 'category'))
+    if not rows:
+        return None
+
+    pk, updated_at = rows[0][:2]
+    category_ids = [category_id for *_, category_id in rows if category_id is not None]
+    related_ids = [
+        related.pk for related in Catalog.related_products(Product(pk=pk), category_ids)
+    ]
+
+    PageValidators.on_not_modified(request, track_product_visit, pk)
+    # The tags the page is cached under: discounts and category changes
+    # bump the product's, listing changes its categories'.
+    return PageValidators.etag(
+        request,
+        [pk, updated_at, *related_ids, Catalog.next_price_change([pk, *related_ids])],
+        tags=[
+            QueryCache.pk_tag(Product, pk),
+            *(QueryCache.pk_tag(ProductCategory, category_id) for category_id in category_ids),
+            *(QueryCache.pk_tag(Product, related_id) for related_id in related_ids),
+        ]
+    )
+
+
+@conditional_page(product_detail_etag)
+@cache_anonymous_page
+def product_detail(request, slug):
+    product = get_object_or_404(Product, slug=slug, is_active=True, is_delete=False)
+
+    # Track product visit for analytics, also when the page is cached
+    PageCache.perform(request, track_product_visit, product.pk)
+
+    # Get related products from same categories
+    category_ids = list(product.category.values_list('pk', flat=True))
+    related_products = Catalog.related_products(product, category_ids)
+
+    PageCache.tag(
+        request,
+        QueryCache.instance_tag(product),
+        *(QueryCache.pk_tag(ProductCategory, pk) for pk in category_ids),
+        *(QueryCache.instance_tag(related) for related in related_products)
+    )
+    PageCache.expires(request, Catalog.next_price_change(
+        [product.pk, *(related.pk for related in related_products)]
+    ))
 
     add_to_cart_form = AddToCartForm(product=product)
 
@@ -118,18 +160,51 @@ def product_detail(request, slug):
     return render(request, 'product_module/product_detail.html', context)
 
 
-def category_products(request, slug):
-    category = get_object_or_404(ProductCategory, url_title=slug, is_active=True, is_delete=False)
+def category_page(request, category_id):
     products = Product.objects.filter(
-        category=category,
+        category=category_id,
+        is_active=True,
+        is_delete=False
+    )
+    return Paginator(products, 12).get_page(request.GET.get('page'))
+
+
+def category_products_etag(request, slug):
+    category = ProductCategory.objects.filter(
+        url_title=slug,
         is_active=True,
         is_delete=False
+    ).values('pk', 'updated_at').first()
+    if category is None:
+        return None
+
+    # Only the ids of the products on the requested page.
+    product_ids = list(category_page(request, category['pk']).object_list.values_list('pk', flat=True))
+    return PageValidators.etag(
+        request,
+        [category['pk'], category['updated_at'], *product_ids, Catalog.next_price_change(product_ids)],
+        tags=[
+            QueryCache.pk_tag(ProductCategory, category['pk']),
+            *(QueryCache.pk_tag(Product, product_id) for product_id in product_ids),
+        ]
     )
 
+
+@conditional_page(category_products_etag)
+@cache_anonymous_page
+def category_products(request, slug):
+    category = get_object_or_404(ProductCategory, url_title=slug, is_active=True, is_delete=False)
+
     # Pagination
-    paginator = Paginator(products, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = category_page(request, category.pk)
+
+    # Products joining or leaving the category bump its tag.
+    PageCache.tag(
+        request,
+        QueryCache.instance_tag(category),
+        *(QueryCache.instance_tag(product) for product in page_obj)
+    )
+    PageCache.expires(request, Catalog.next_price_change([product.pk for product in page_obj]))
 
     context = {
         'category': category,
@@ -258,7 +333,7 @@ def checkout(request):
                     # Update product stock
                     product = cart_item.product
                     product.stock_quantity -= cart_item.quantity
-                    product.save()
+                    product.save(update_fields=['stock_quantity', 'updated_at'])
 
                 # Clear cart after successful order
                 cart.items.all().delete()
@@ -0,0 +1,89 @@
+// Image attachments for the chat rooms.
+//
+// Files are streamed over the room socket instead of a form POST: the page
+// announces the file with 'attachment_start', the server answers
+// 'attachment_ready' with the chunk size to use, the file is sent slice by
+// slice as binary frames and closed with 'attachment_finish'. The resulting
+// message is broadcast like any other chat message.
+function createChatAttachmentUploader(chatSocket, onError) {
+    let pendingFile = null;
+
+    function send(file) {
+        pendingFile = file;
+        chatSocket.send(JSON.stringify({
+            'type': 'attachment_start',
+            'name': file.name,
+            'size': file.size,
+            'content_type': file.type,
+        }));
+    }
+
+    async function streamFile(file, chunkSize) {
+        for (let offset = 0; offset < file.size; offset += chunkSize) {
+            // Let the socket drain so a large file is not queued in memory
+            // all at once.
+            while (chatSocket.bufferedAmount > chunkSize * 16) {
+                await new Promise(resolve => setTimeout(resolve, 50));
+            }
+            const chunk = await file.slice(offset, offset + chunkSize).arrayBuffer();
+            chatSocket.send(chunk);
+        }
+
+        chatSocket.send(JSON.stringify({
+            'type': 'attachment_finish',
+        }));
+    }
+
+    // Returns true if the socket message was part of the attachment protocol.
+    function handleMessage(data) {
+        if (data.type === 'attachment_ready') {
+            if (pendingFile) {
+                const file = pendingFile;
+                pendingFile = null;
+                streamFile(file, data.chunk_size);
+            }
+            return true;
+        }
+
+        if (data.type === 'attachment_error') {
+            pendingFile = null;
+            onError(data.error);
+            return true;
+        }
+
+        if (data.type === 'attachment_thumbnail') {
+            document.querySelectorAll(`[data-attachment-id="${data.attachment_id}"] img`).forEach(img => {
+                img.src = data.thumbnail_url;
+            });
+            return true;
+        }
+
+        return false;
+    }
+
+    return {
+        send: send,
+        handleMessage: handleMessage,
+    };
+}
+
+function renderChatAttachment(attachment) {
+    if (!attachment) {
+        return '';
+    }
+
+    const link = document.createElement('a');
+    link.href = attachment.url;
+    link.target = '_blank';
+    link.rel = 'noopener';
+    link.className = 'block mb-1';
+    link.dataset.attachmentId = attachment.id;
+
+    const image = document.createElement('img');
+    image.src = attachment.thumbnail_url || attachment.url;
+    image.alt = attachment.name;
+    image.className = 'rounded-lg max-h-48 object-cover';
+    link.appendChild(image);
+
+    return link.outerHTML;
+}